@@ -172,6 +172,8 @@ class CountryUpdateTab(BackgroundTaskMixin, QWidget):
                     username=username,
                     logger=self.logger,
                     server_type=server_type,
+                    tuning=self.config.get('media_server'),
+                    cache_dir=self.config.cache_dir,
                 )
             )
             worker_thread = operator.update_countries(
@@ -142,7 +142,9 @@ class FolderToolsTab(BackgroundTaskMixin, QWidget):
             self.logger.info(f"目标文件夹: {folder}")
 
             if operation == "删除软链接":
-                deleter = self._track_worker(SymlinkDeleter(target_folder=folder, logger=self.logger))
+                deleter = self._track_worker(SymlinkDeleter(
+                    target_folder=folder, logger=self.logger, **self.config.dir_snapshot_options()
+                ))
                 _, message = deleter.run(lambda payload: self._task_signals.progress.emit(payload))
                 self.logger.info(message)
             elif operation == "删除所有视频文件":
@@ -159,6 +161,7 @@ class FolderToolsTab(BackgroundTaskMixin, QWidget):
                 worker_thread = client.check_metadata_integrity(
                     folder,
                     lambda payload: self._task_signals.progress.emit(payload),
+                    **self.config.dir_snapshot_options(),
                 )
                 if worker_thread:
                     worker_thread.join()
@@ -97,13 +97,24 @@ class GenreUpdateTab(BackgroundTaskMixin, QWidget):
         self.btn_update = QPushButton("开始更新流派")
         self.btn_update.clicked.connect(self.update_genres)
         btn_layout.addWidget(self.btn_update)
+        self.btn_update_metadata = QPushButton("同时更新流派和地区")
+        self.btn_update_metadata.clicked.connect(self.update_metadata)
+        btn_layout.addWidget(self.btn_update_metadata)
+        self.btn_plan_metadata = QPushButton("生成更新计划")
+        self.btn_plan_metadata.clicked.connect(self.plan_metadata)
+        btn_layout.addWidget(self.btn_plan_metadata)
+        self.btn_apply_plan = QPushButton("执行更新计划")
+        self.btn_apply_plan.clicked.connect(self.apply_plan)
+        btn_layout.addWidget(self.btn_apply_plan)
         self.btn_stop = QPushButton("停止")
         self.btn_stop.setEnabled(False)
         self.btn_stop.clicked.connect(self.stop_background_task)
         btn_layout.addWidget(self.btn_stop)
         btn_layout.addStretch()
         layout.addLayout(btn_layout)
-        self._register_task_buttons(self.btn_update)
+        self._register_task_buttons(
+            self.btn_update, self.btn_update_metadata, self.btn_plan_metadata, self.btn_apply_plan
+        )
 
         layout.addWidget(self._create_progress_group())
         layout.addWidget(self._create_log_group(), 1)
@@ -137,30 +148,84 @@ class GenreUpdateTab(BackgroundTaskMixin, QWidget):
         self.config.set('genre_update', 'scan_mode', 'full' if self.radio_full_scan.isChecked() else 'incremental')
         self.config.save()
 
-    def save_sync_state(self, state):
-        self.config.set('genre_update', 'sync_state', state)
+    def save_sync_state(self, state, state_key='sync_state'):
+        self.config.set('genre_update', state_key, state)
         self.config.save()
 
     def selected_server_type(self):
         return 'jellyfin' if self.radio_jellyfin.isChecked() else 'emby'
 
     def update_genres(self):
-        return run_with_error_dialog(self, self.logger, "更新流派", self._update_genres)
+        return run_with_error_dialog(
+            self, self.logger, "更新流派", lambda: self._start_update('update_genres', "流派", 'sync_state')
+        )
+
+    def update_metadata(self):
+        # 合并任务的翻译表哈希覆盖流派和地区两张表，增量基线单独保存
+        return run_with_error_dialog(
+            self,
+            self.logger,
+            "更新流派和地区",
+            lambda: self._start_update('update_metadata', "流派和地区", 'metadata_sync_state'),
+        )
+
+    def plan_metadata(self):
+        # 只预扫描并写入计划文件，不修改服务器；检查计划后再执行
+        plan_path = self.config.metadata_plan_options()['plan_path']
+        return run_with_error_dialog(
+            self,
+            self.logger,
+            "生成更新计划",
+            lambda: self._start_task(
+                "生成更新计划",
+                lambda operator, callback: operator.plan_metadata_update(plan_path, callback),
+            ),
+        )
+
+    def apply_plan(self):
+        # 已完成的条目记录在检查点文件中，中断后再次执行会从断点继续
+        options = self.config.metadata_plan_options()
+        return run_with_error_dialog(
+            self,
+            self.logger,
+            "执行更新计划",
+            lambda: self._start_task(
+                "执行更新计划",
+                lambda operator, callback: operator.apply_metadata_plan(
+                    options['plan_path'],
+                    callback,
+                    shard_index=options['shard_index'],
+                    shard_count=options['shard_count'],
+                ),
+            ),
+        )
+
+    def _start_update(self, task_method, task_label, state_key):
+        full_scan = self.radio_full_scan.isChecked()
+        sync_state = self.config.get('genre_update', state_key, {})
+        return self._start_task(
+            f"更新{task_label}",
+            lambda operator, callback: getattr(operator, task_method)(
+                callback,
+                full_scan=full_scan,
+                sync_state=sync_state,
+                state_callback=lambda state: self.save_sync_state(state, state_key),
+            ),
+        )
 
-    def _update_genres(self):
+    def _start_task(self, task_title, start):
+        """start(客户端, 进度回调) 启动客户端的后台任务并返回线程"""
         server_url = self.edit_url.text().strip()
         api_key = self.edit_api.text().strip()
         username = self.edit_user.text().strip()
         server_type = self.selected_server_type()
-        full_scan = self.radio_full_scan.isChecked()
-        sync_state = self.config.get('genre_update', 'sync_state', {})
 
         if not server_url or not api_key or not username:
             QMessageBox.warning(self, "警告", "请先填写服务器地址、API Key 和用户名")
             return
 
         def task():
-            self.logger.info(f"开始更新流派，服务器类型: {server_type}")
+            self.logger.info(f"开始{task_title}，服务器类型: {server_type}")
             operator = self._track_worker(
                 MediaServerClient(
                     server_url=server_url,
@@ -168,15 +233,12 @@ class GenreUpdateTab(BackgroundTaskMixin, QWidget):
                     username=username,
                     logger=self.logger,
                     server_type=server_type,
+                    tuning=self.config.get('media_server'),
+                    cache_dir=self.config.cache_dir,
                 )
             )
-            worker_thread = operator.update_genres(
-                lambda payload: self._task_signals.progress.emit(payload),
-                full_scan=full_scan,
-                sync_state=sync_state,
-                state_callback=self.save_sync_state,
-            )
+            worker_thread = start(operator, lambda payload: self._task_signals.progress.emit(payload))
             if worker_thread:
                 worker_thread.join()
 
-        return self._start_background_task("更新流派", task)
+        return self._start_background_task(task_title, task)
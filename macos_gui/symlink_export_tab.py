@@ -487,6 +487,7 @@ class SymlinkExportTab(BackgroundTaskMixin, QWidget):
             original_path=config["original_path"],
             replace_path=config["replace_path"],
             only_tvshow_nfo=config["only_tvshow_nfo"],
+            **self.config.dir_snapshot_options(),
             logger=self.logger,
         ))
         creator.run(lambda payload: self._task_signals.progress.emit(payload))
@@ -500,6 +501,7 @@ class SymlinkExportTab(BackgroundTaskMixin, QWidget):
             thread_count=config["thread_count"],
             only_tvshow_nfo=config["only_tvshow_nfo"],
             overwrite_existing=config["overwrite_metadata"],
+            **self.config.dir_snapshot_options(),
             logger=self.logger,
         ))
         thread = copier.run(lambda payload: self._task_signals.progress.emit(payload))
@@ -146,6 +146,8 @@ class VersionMergeTab(BackgroundTaskMixin, QWidget):
                     username=username,
                     logger=self.logger,
                     server_type=server_type,
+                    tuning=self.config.get('media_server'),
+                    cache_dir=self.config.cache_dir,
                 )
             )
             worker_thread = operator.merge_versions(lambda payload: self._task_signals.progress.emit(payload))
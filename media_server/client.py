@@ -1,22 +1,50 @@
 import hashlib
-import json
 import logging
 import os
 import re
 import shutil
+import sqlite3
 import threading
 import time
 import unicodedata
 import urllib.parse
-import xml.etree.ElementTree as ET
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
 import requests
 
-from media_server.country_maps import COUNTRY_TRANSLATIONS
-from media_server.genre_maps import MOVIE_GENRE_TRANSLATIONS, TV_GENRE_TRANSLATIONS
+from media_server.genre_table import BoundedMemo, compile_genre_map
+from media_server.integrity_index import StemIndex
+from media_server.library_snapshot import LIBRARY_FULL_REFRESH_INTERVAL, LibrarySnapshot
+from media_server.merge_clusters import cluster_movies, cluster_size_stats, parse_merge_providers, provider_label
+from media_server.merge_ledger import MergeLedger
+from media_server.metrics import RequestMetrics, format_report_lines, write_report
+from media_server.nfo_ids import extract_nfo_ids, tolerant_extract_ids
+from media_server.nfo_index import NfoIdIndex
+from media_server.nfo_scan import NfoScanPipeline
+from media_server.paging import DEFAULT_PAGE_SIZE, ItemListingError, ItemPager, ItemStream
+from media_server.provider_index import ProviderIdIndex
+from media_server.server_cache import DEFAULT_SERVER_CACHE_TTL, ServerInfoCache
+from media_server.snapshot import ItemSnapshot, field_hash, item_version
+from media_server.streaming import StreamingPayload, peak_rss_bytes
+from media_server.throttle import DEFAULT_BACKOFF_MAX, DEFAULT_MAX_RETRY_AFTER, AdaptiveLimiter
+from media_server.translation_maps import (
+    TranslationOverrideError,
+    builtin_map,
+    cached_derivative,
+    mapping_hash,
+    translation_map,
+)
+from media_server.transport import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    build_session,
+    connection_stats,
+    endpoint_key,
+)
+from media_server.update_plan import UpdatePlan, UpdatePlanError
+from utils.dir_snapshot import open_dir_snapshot
 
 # 定义视频文件扩展名
 VIDEO_EXTENSIONS = {
@@ -45,6 +73,27 @@ VIDEO_EXTENSIONS = {
     '.mts',
 }
 
+USER_SCOPED_ENDPOINT_PATTERN = re.compile(r' /Users/\{id\}(?:/Views|/Items)?$')
+
+# 列表查询默认关闭图片标签和用户数据等昂贵的默认字段，调用方只通过 Fields 声明需要的字段
+LIST_PROJECTION_PARAMS = {
+    'EnableImages': 'false',
+    'EnableUserData': 'false',
+    'ImageTypeLimit': 0,
+}
+# 按偏移分页时必须固定排序，否则服务器在页与页之间可能调整顺序，导致条目被跳过或重复；Id 保证排序唯一
+PAGED_SORT_PARAMS = {
+    'SortBy': 'SortName,Id',
+    'SortOrder': 'Ascending',
+}
+
+# 单个流派与流派列表翻译结果的缓存上限；大库的流派词汇量通常只有几百个、组合几千种
+GENRE_MEMO_SIZE = 4096
+GENRE_LIST_MEMO_SIZE = 16384
+GENRE_MERGE_CHANGE = ('重复或近似流派', '合并去重后的流派列表')
+COUNTRY_MERGE_CHANGE = ('重复或空白地区', '合并去重后的地区列表')
+METADATA_SNAPSHOT_FIELDS = ('Genres', 'ProductionLocations')
+
 GENRE_NORMALIZATION_TRANSLATION = str.maketrans(
     {
         '　': ' ',
@@ -159,6 +208,8 @@ class MediaServerClient:
         delete_nfo_folder=False,
         logger=None,
         server_type='emby',
+        tuning=None,
+        cache_dir=None,
     ):
         self.server_url = (server_url or "").rstrip("/")
         self.api_key = api_key
@@ -171,15 +222,85 @@ class MediaServerClient:
         self.detected_server_type = None
         self.api_prefix = self._configured_api_prefix()
         self.stop_flag = threading.Event()
-        self._genre_lookup_index_cache = {}
-        self._country_lookup_index = {
-            self._normalize_country_lookup_name(source): target
-            for source, target in COUNTRY_TRANSLATIONS.items()
-        }
+        # 翻译表首次使用时才加载，编译结果和索引在模块级共享
+        self._translation_maps = {}
         self._sync_min_date_last_saved = None
         self._sync_started_at = None
         self._sync_map_hash = None
         self._sync_had_errors = False
+        # 条目快照只在提供缓存目录时启用（Emby 增量扫描）
+        self.cache_dir = cache_dir
+        self._snapshot_store = None
+        self._item_snapshot = None
+        self._snapshot_records = None
+        self._nfo_index = None
+        self._nfo_index_failed = False
+        self._nfo_index_lock = threading.Lock()
+        # 合并版本期间使用的合并记录，未提供缓存目录时为 None
+        self._merge_ledger = None
+        self._apply_tuning(tuning)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._user_id_lock = threading.Lock()
+        # 正在运行的后台任务数，最后一个任务结束时才关闭共享的 Session 和 NFO 索引
+        self._active_tasks = 0
+        self._active_tasks_lock = threading.Lock()
+        self.metrics = RequestMetrics()
+        self.last_request_report = None
+        self._server_cache = (
+            ServerInfoCache(os.path.join(cache_dir, 'server_info.json'), ttl=self.server_cache_ttl)
+            if cache_dir
+            else None
+        )
+
+    def _apply_tuning(self, tuning):
+        """读取可调参数（来自配置文件 media_server 区段），未知键忽略。"""
+        tuning = tuning if isinstance(tuning, dict) else {}
+        self.pool_connections = self._positive_int(tuning.get('pool_connections'), DEFAULT_POOL_CONNECTIONS)
+        self.pool_maxsize = self._positive_int(tuning.get('pool_maxsize'), DEFAULT_POOL_MAXSIZE)
+        self.connect_timeout = self._positive_float(tuning.get('connect_timeout'))
+        self.read_timeout = self._positive_float(tuning.get('read_timeout'))
+        self.page_size = self._positive_int(tuning.get('page_size'), DEFAULT_PAGE_SIZE)
+        self.concurrency = self._positive_int(tuning.get('concurrency'), 1)
+        # 非空时每个后台任务结束后把请求统计报告写入该 JSON 文件
+        self.metrics_report_file = str(tuning.get('metrics_report_file') or '').strip() or None
+        self.server_cache_ttl = self._positive_int(tuning.get('server_cache_ttl'), DEFAULT_SERVER_CACHE_TTL)
+        # 开启后条目列表边下载边解析，不再整页 response.json()
+        self.stream_json = bool(tuning.get('stream_json', False))
+        # 查重时并发读取 NFO 的线程数，云盘挂载目录上每次打开文件都有明显延迟
+        self.nfo_scan_workers = self._positive_int(tuning.get('nfo_scan_workers'), 1)
+        # 合并版本时用于关联影片的 provider，共享其中任一 ID 的影片归为同一组
+        self.merge_providers = parse_merge_providers(tuning.get('merge_providers'))
+        # 本地媒体库快照在该秒数内视为最新，查重时不访问服务器；0 表示每次都先刷新
+        self.library_snapshot_ttl = self._positive_int(tuning.get('library_snapshot_ttl'), 0)
+        # 查重默认每次从服务器读取完整列表；开启后对比本地媒体库快照（需要缓存目录）
+        self.use_library_snapshot = bool(tuning.get('use_library_snapshot', False))
+        # YAML/JSON 翻译覆盖文件，区段 movies/series/countries 中的条目覆盖内置翻译表
+        self.translation_overrides = str(tuning.get('translation_overrides') or '').strip() or None
+        # rate_limit 为每秒请求数，0 表示不限速；并发上限随 429/503 自适应收缩
+        self.limiter = AdaptiveLimiter(
+            rate=self._positive_float(tuning.get('rate_limit'), 0),
+            burst=self._positive_float(tuning.get('rate_burst')),
+            max_concurrency=self.concurrency,
+            max_retry_after=self._positive_float(tuning.get('max_retry_after'), DEFAULT_MAX_RETRY_AFTER),
+            backoff_max=self._positive_float(tuning.get('backoff_max'), DEFAULT_BACKOFF_MAX),
+        )
+
+    @staticmethod
+    def _positive_int(value, default):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    @staticmethod
+    def _positive_float(value, default=None):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
 
     def _normalize_server_type(self, server_type):
         value = str(server_type or 'emby').strip().lower()
@@ -190,8 +311,21 @@ class MediaServerClient:
 
     @staticmethod
     def _stable_mapping_hash(mapping):
-        serialized = json.dumps(mapping, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+        return mapping_hash(mapping)
+
+    def _translation_map(self, section):
+        """按需加载翻译表（movies/series/countries）；覆盖文件有误时记录错误并改用内置翻译表。"""
+        mapping = self._translation_maps.get(section)
+        if mapping is not None:
+            return mapping
+        try:
+            mapping = translation_map(section, self.translation_overrides)
+        except TranslationOverrideError as err:
+            self.logger.error(f"{err}，改用内置翻译表")
+            self.translation_overrides = None
+            mapping = builtin_map(section)
+        self._translation_maps[section] = mapping
+        return mapping
 
     def _sync_server_key(self):
         identity = '|'.join(
@@ -221,7 +355,23 @@ class MediaServerClient:
             '+00:00', 'Z'
         )
 
-    def _begin_metadata_sync(self, mapping, full_scan=False, sync_state=None):
+    def _prepare_item_snapshot(self, snapshot_kind, load):
+        """Emby 任务开始时准备条目快照；load=True 且快照可用时返回 True，表示按快照增量扫描。"""
+        self._snapshot_store = None
+        self._item_snapshot = None
+        self._snapshot_records = None
+        if self.server_type == 'jellyfin' or not self.cache_dir or not snapshot_kind:
+            return False
+
+        store = ItemSnapshot.for_server(self.cache_dir, snapshot_kind, self._sync_server_key(), self._sync_map_hash)
+        self._snapshot_store = store
+        self._snapshot_records = {}
+        if load and store.load():
+            self._item_snapshot = store
+            return True
+        return False
+
+    def _begin_metadata_sync(self, mapping, full_scan=False, sync_state=None, snapshot_kind=None):
         self._sync_started_at = self._iso_utc_now()
         self._sync_map_hash = self._stable_mapping_hash(mapping)
         self._sync_min_date_last_saved = None
@@ -229,10 +379,18 @@ class MediaServerClient:
         sync_state = sync_state if isinstance(sync_state, dict) else {}
 
         if full_scan:
+            self._prepare_item_snapshot(snapshot_kind, load=False)
             self.logger.info("扫描模式：完整扫描")
             return
         if self.server_type != 'jellyfin':
-            self.logger.info("当前服务器不是 Jellyfin，快速增量模式自动改为完整扫描")
+            if self._prepare_item_snapshot(snapshot_kind, load=True):
+                self.logger.info(
+                    f"扫描模式：快照增量，对比 {len(self._item_snapshot.entries)} 个条目的版本，只读取变化的条目"
+                )
+            elif self._snapshot_store is not None:
+                self.logger.info("未找到当前服务器和翻译表对应的条目快照，本次执行完整扫描并建立快照")
+            else:
+                self.logger.info("当前服务器不是 Jellyfin，快速增量模式自动改为完整扫描")
             return
         if sync_state.get('server_key') != self._sync_server_key():
             self.logger.info("未找到当前服务器的增量基线，本次执行完整扫描")
@@ -259,6 +417,13 @@ class MediaServerClient:
         if not self._sync_started_at or not self._sync_map_hash:
             return
 
+        if self._snapshot_store is not None:
+            try:
+                self._snapshot_store.save(self._snapshot_records)
+                self.logger.info(f"条目快照已保存，共 {len(self._snapshot_records)} 个条目")
+            except OSError as err:
+                self.logger.warning(f"条目快照保存失败，下次将执行完整扫描: {err}")
+
         state = {
             'server_key': self._sync_server_key(),
             'map_hash': self._sync_map_hash,
@@ -271,23 +436,279 @@ class MediaServerClient:
     def _mark_sync_error(self):
         self._sync_had_errors = True
 
+    def _record_snapshot_item(self, item, field, keep_version=True):
+        """把条目写入本次快照；提交更新后服务器版本会变化，此时不记录版本，下次读取后按字段哈希确认。"""
+        if self._snapshot_records is None or not item.get('Id'):
+            return
+        self._snapshot_records[item['Id']] = {
+            'version': item_version(item) if keep_version else None,
+            'hash': field_hash(self._snapshot_field_value(item, field)),
+        }
+
+    def _forget_snapshot_items(self, items):
+        """候选条目在实际处理后才写入快照；未处理的候选（停止、重扫中止）下次增量扫描时仍会被读取。"""
+        if self._snapshot_records is None:
+            return
+        for item in items:
+            self._snapshot_records.pop(item.get('Id'), None)
+
+    @staticmethod
+    def _snapshot_field_value(item, field):
+        """field 为元组时快照哈希覆盖多个字段（如合并任务同时比较流派和地区）。"""
+        if isinstance(field, tuple):
+            return [item.get(name) for name in field]
+        return item.get(field)
+
+    def _snapshot_listing_params(self, params):
+        """快照增量模式下列表只取版本字段，变化的条目再按 Ids 读取完整字段。"""
+        if self._item_snapshot is None:
+            return params
+        listing_params = dict(params)
+        listing_params['Fields'] = 'DateLastSaved,Etag'
+        return listing_params
+
+    def _snapshot_changed_items(self, listing, params, field, item_label):
+        if self._item_snapshot is None:
+            return listing
+        return self._iter_snapshot_changed_items(listing, params, field, item_label)
+
+    def _iter_snapshot_changed_items(self, listing, params, field, item_label):
+        entries = self._item_snapshot.entries
+        label = f"读取{item_label}变化条目"
+        listed_count = 0
+        skipped_count = 0
+        confirmed_count = 0
+
+        def fetch_changed(item_ids):
+            nonlocal confirmed_count
+            payload = self._fetch_item_page('/Items', {**params, 'Ids': ','.join(item_ids)}, 0, len(item_ids), label)
+            for item in payload.get('Items') or []:
+                previous = entries.get(item.get('Id'))
+                if previous and previous.get('hash') == field_hash(self._snapshot_field_value(item, field)):
+                    # 版本变化但字段与上次处理结果一致（例如上次提交的更新），只刷新版本
+                    confirmed_count += 1
+                    self._record_snapshot_item(item, field)
+                    continue
+                yield item
+
+        pending_ids = []
+        for item in listing:
+            item_id = item.get('Id')
+            if not item_id:
+                continue
+            listed_count += 1
+            previous = entries.get(item_id)
+            version = item_version(item)
+            if previous and version is not None and previous.get('version') == version:
+                self._snapshot_records[item_id] = previous
+                skipped_count += 1
+                continue
+            pending_ids.append(item_id)
+            if len(pending_ids) >= self.page_size:
+                yield from fetch_changed(pending_ids)
+                pending_ids = []
+        if pending_ids:
+            yield from fetch_changed(pending_ids)
+
+        self.logger.info(
+            f"{item_label}快照增量：列表 {listed_count} 部，未变化跳过 {skipped_count} 部，"
+            f"读取变化 {listed_count - skipped_count} 部，其中 {confirmed_count} 部已是处理后的结果"
+        )
+
     def request_stop(self):
         self.stop_flag.set()
         self.logger.info("已请求停止当前媒体服务器任务")
 
     def _start_background_task(self, target, task_name):
         self.stop_flag.clear()
+        self.metrics = RequestMetrics()
+        self.limiter.reset_stats()
+        with self._active_tasks_lock:
+            self._active_tasks += 1
 
         def safe_target():
             try:
                 target()
             except Exception as e:
                 self.logger.exception(f"{task_name}执行异常: {e}")
+            finally:
+                self._log_connection_stats(task_name)
+                self._log_throttle_stats(task_name)
+                self._finish_request_report(task_name)
+                self._release_task_resources()
 
         thread = threading.Thread(target=safe_target, daemon=True)
         thread.start()
         return thread
 
+    def _iter_pipelined(self, candidates, worker, abort_event):
+        """按候选顺序产出 (序号, 候选, worker 结果)，最多 concurrency 个候选同时执行。
+
+        停止或 abort_event 置位后不再派发新候选，但已派发的候选仍会产出结果，
+        调用方必须把迭代消费完，才能让已提交的更新计入统计。
+        """
+        if self.concurrency <= 1:
+            for index, candidate in enumerate(candidates, start=1):
+                if self.stop_flag.is_set() or abort_event.is_set():
+                    return
+                yield index, candidate, worker(candidate)
+            return
+
+        pending = deque()
+        candidate_iter = enumerate(candidates, start=1)
+        window = self.concurrency * 2
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='media-update') as executor:
+            try:
+                while True:
+                    while len(pending) < window and not (self.stop_flag.is_set() or abort_event.is_set()):
+                        next_candidate = next(candidate_iter, None)
+                        if next_candidate is None:
+                            break
+                        index, candidate = next_candidate
+                        pending.append((index, candidate, executor.submit(worker, candidate)))
+                    if not pending:
+                        return
+                    index, candidate, future = pending.popleft()
+                    yield index, candidate, future.result()
+            finally:
+                for _index, _candidate, future in pending:
+                    future.cancel()
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                self._session = build_session(
+                    headers=self._auth_headers(),
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+            return self._session
+
+    def _release_task_resources(self):
+        """后台任务结束时调用；同一客户端上还有其他任务在运行时不关闭它们共用的资源。"""
+        with self._active_tasks_lock:
+            self._active_tasks = max(0, self._active_tasks - 1)
+            if self._active_tasks == 0:
+                self.close()
+
+    def close(self):
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+        self._close_nfo_index()
+
+    def connection_stats(self):
+        return connection_stats(self._session)
+
+    def _log_connection_stats(self, task_name):
+        stats = self.connection_stats()
+        if not stats['requests']:
+            return
+        self.logger.info(
+            f"{task_name}连接复用统计: 请求 {stats['requests']} 次，新建连接 {stats['new_connections']} 个，"
+            f"复用 {stats['reused_connections']} 次，复用率 {stats['reuse_rate']:.1%}"
+        )
+
+    def _endpoint_key(self, method, url):
+        return endpoint_key(method, url, urllib.parse.urlsplit(self.server_url).path.rstrip('/'))
+
+    def response_bytes_by_endpoint(self):
+        """按端点汇总的响应体字节数和响应次数。"""
+        return {
+            key: {'bytes': entry['bytes'], 'responses': entry['requests']}
+            for key, entry in self.request_report()['endpoints'].items()
+        }
+
+    def request_report(self):
+        """当前任务的按端点请求统计（延迟分位数、字节、状态码、重试、回读确认）。"""
+        return self.metrics.report()
+
+    def _finish_request_report(self, task_name):
+        report = self.request_report()
+        report['task'] = task_name
+        report['finished_at'] = self._iso_utc_now()
+        self.last_request_report = report
+        totals = report['totals']
+        if not totals['requests']:
+            return report
+
+        self.logger.info(
+            f"{task_name}请求统计: 共 {totals['requests']} 次请求，累计耗时 {totals['total_seconds']:.1f} 秒，"
+            f"{totals['bytes'] / 1024:.0f} KB，重试 {totals['retries']} 次"
+            f"（等待 {totals['retry_sleep_seconds']:.1f} 秒），回读确认 {totals['readback_confirmed']} 次"
+        )
+        for line in format_report_lines(report):
+            self.logger.info(f"  {line}")
+        if self.metrics_report_file:
+            try:
+                write_report(self.metrics_report_file, report)
+                self.logger.info(f"请求统计报告已写入: {self.metrics_report_file}")
+            except OSError as err:
+                self.logger.warning(f"请求统计报告写入失败: {err}")
+        return report
+
+    def throttle_metrics(self):
+        return self.limiter.metrics()
+
+    def _log_throttle_stats(self, task_name):
+        metrics = self.throttle_metrics()
+        if not metrics['requests']:
+            return
+        self.logger.info(
+            f"{task_name}限流统计: 请求 {metrics['requests']} 次，近期速率 {metrics['rate']:.1f} 次/秒，"
+            f"当前并发上限 {metrics['concurrency_limit']}，被服务器限流 {metrics['throttle_events']} 次"
+        )
+
+    @staticmethod
+    def _retry_after_header(response):
+        headers = getattr(response, 'headers', None) or {}
+        return headers.get('Retry-After')
+
+    def _resolve_timeout(self, timeout):
+        if self.connect_timeout is None and self.read_timeout is None:
+            return timeout
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+        return (self.connect_timeout or connect_timeout, self.read_timeout or read_timeout)
+
+    def _send(self, method, url, *, params=None, data=None, json_body=None, timeout=30, stream=False):
+        self.limiter.acquire(self.stop_flag)
+        response = None
+        stats_key = self._endpoint_key(method, url)
+        started_at = time.monotonic()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                json=json_body,
+                timeout=self._resolve_timeout(timeout),
+                stream=stream,
+            )
+            # 流式响应的字节数在读取响应体时统计
+            content = None if stream else getattr(response, 'content', None)
+            self.metrics.record_response(
+                stats_key,
+                time.monotonic() - started_at,
+                response.status_code,
+                len(content) if isinstance(content, (bytes, str)) else 0,
+            )
+            self._check_server_cache_validity(stats_key, response.status_code)
+            return response
+        except requests.exceptions.RequestException as err:
+            self.metrics.record_response(stats_key, time.monotonic() - started_at, type(err).__name__)
+            raise
+        finally:
+            status_code = getattr(response, 'status_code', None)
+            pause = self.limiter.release(status_code, self._retry_after_header(response))
+            if pause:
+                self.logger.warning(f"服务器要求限流（HTTP {status_code}），暂停发送新请求 {pause:.1f} 秒")
+
     def _auth_headers(self):
         return {
             'X-Emby-Token': self.api_key or '',
@@ -302,6 +723,29 @@ class MediaServerClient:
             prefix = self.api_prefix or ''
         return f'{self.server_url}{prefix}{path}'
 
+    def _server_cache_key(self):
+        return ServerInfoCache.cache_key(self.server_url, self.username)
+
+    def _cached_server_info(self):
+        if self._server_cache is None:
+            return {}
+        return self._server_cache.get(self._server_cache_key())
+
+    def _update_server_cache(self, **values):
+        if self._server_cache is not None:
+            self._server_cache.update(self._server_cache_key(), **values)
+
+    def _check_server_cache_validity(self, stats_key, status_code):
+        """401 说明 API Key 或服务器已变化，用户视图/列表接口 404 说明缓存的用户 ID 已失效。
+
+        单个条目详情 404 通常只是条目已删除，不清除缓存。
+        """
+        if self._server_cache is None:
+            return
+        if status_code == 401 or (status_code == 404 and USER_SCOPED_ENDPOINT_PATTERN.search(stats_key)):
+            if self._server_cache.invalidate(self._server_cache_key()):
+                self.logger.warning(f"服务器返回 {status_code}，已清除本地缓存的服务器信息，下次将重新检测")
+
     def _server_label(self):
         return 'Jellyfin' if self.server_type == 'jellyfin' else 'Emby'
 
@@ -316,10 +760,13 @@ class MediaServerClient:
             ('', '/System/Info/Public'),
             ('/emby', '/System/Info/Public'),
         ]
+        # 上次可用的前缀优先探测
+        cached_prefix = self._cached_server_info().get('info_prefix')
+        info_paths.sort(key=lambda entry: entry[0] != cached_prefix)
         for prefix, path in info_paths:
             url = self._api_url(path, prefix)
             try:
-                response = requests.get(url, timeout=10)
+                response = self._send('get', url, timeout=10)
             except requests.exceptions.RequestException as err:
                 self.logger.warning(f"服务器识别请求失败: {url} - {err}")
                 continue
@@ -340,18 +787,27 @@ class MediaServerClient:
             if 'jellyfin' in product_text:
                 self.detected_server_type = 'jellyfin'
                 self.logger.info("已检测到服务器类型: Jellyfin")
+                self._update_server_cache(server_type='jellyfin', info_prefix=prefix)
                 return self.detected_server_type
 
             if 'emby' in product_text:
                 self.detected_server_type = 'emby'
                 self.logger.info("已检测到服务器类型: Emby")
+                self._update_server_cache(server_type='emby', info_prefix=prefix)
                 return self.detected_server_type
 
         self.logger.error("无法检测服务器类型，请检查服务器地址和 API Key")
         return None
 
     def validate_server_type(self):
-        detected_type = self.detect_server_type(force=True)
+        cached_type = self._cached_server_info().get('server_type')
+        # 缓存与当前选择不一致时重新检测，避免用过期缓存误报
+        if cached_type == self.server_type:
+            self.detected_server_type = cached_type
+            detected_type = cached_type
+            self.logger.info("使用本地缓存的服务器类型，跳过检测请求")
+        else:
+            detected_type = self.detect_server_type(force=True)
         expected_label = self._server_label()
 
         if not detected_type:
@@ -366,10 +822,12 @@ class MediaServerClient:
         self.logger.info(f"服务器类型校验通过: {expected_label}")
         return True
 
-    def _request(self, method, path, *, params=None, data=None, json_body=None, timeout=30):
-        headers = self._auth_headers()
-        url = self._api_url(path)
-        return requests.request(method, url, headers=headers, params=params, data=data, json=json_body, timeout=timeout)
+    def _request(
+        self, method, path, *, params=None, data=None, json_body=None, timeout=30, prefix=None, stream=False
+    ):
+        url = self._api_url(path, prefix)
+        kwargs = {'stream': True} if stream else {}
+        return self._send(method, url, params=params, data=data, json_body=json_body, timeout=timeout, **kwargs)
 
     def _request_with_retries(
         self,
@@ -384,44 +842,152 @@ class MediaServerClient:
         retry_delay=1,
         retry_status_codes=None,
         retry_label=None,
+        stream=False,
     ):
         retry_status_codes = retry_status_codes or set()
+        stats_key = self._endpoint_key(method, self._api_url(path))
+        # 只有流式请求才传 stream，保持普通调用与测试替身的签名兼容
+        stream_kwargs = {'stream': True} if stream else {}
         for attempt in range(retries + 1):
             try:
-                response = self._request(method, path, params=params, data=data, json_body=json_body, timeout=timeout)
+                response = self._request(
+                    method, path, params=params, data=data, json_body=json_body, timeout=timeout, **stream_kwargs
+                )
                 if response.status_code not in retry_status_codes or attempt >= retries:
                     return response
+                delay = self.limiter.backoff_delay(attempt, retry_delay, self._retry_after_header(response))
                 self.logger.warning(
                     f"{retry_label or path} 请求返回 {response.status_code}，"
-                    f"{retry_delay} 秒后重试 {attempt + 1}/{retries}"
+                    f"{delay:.1f} 秒后重试 {attempt + 1}/{retries}"
                 )
             except requests.exceptions.RequestException as err:
                 if attempt >= retries:
                     raise
+                delay = self.limiter.backoff_delay(attempt, retry_delay)
                 self.logger.warning(
-                    f"{retry_label or path} 请求异常，{retry_delay} 秒后重试 {attempt + 1}/{retries}: {err}"
+                    f"{retry_label or path} 请求异常，{delay:.1f} 秒后重试 {attempt + 1}/{retries}: {err}"
                 )
-            time.sleep(retry_delay)
+            self.metrics.record_retry(stats_key, delay)
+            time.sleep(delay)
+
+    def _fetch_item_page(self, path, params, start_index, limit, retry_label, timeout=(5, 120)):
+        page_params = {**LIST_PROJECTION_PARAMS, **PAGED_SORT_PARAMS, **params}
+        page_params['StartIndex'] = start_index
+        page_params['Limit'] = limit
+        label = f"{retry_label}（第 {start_index + 1} 条起）"
+        try:
+            response = self._request_with_retries(
+                'get',
+                path,
+                params=page_params,
+                timeout=timeout,
+                retries=2,
+                retry_delay=1,
+                retry_status_codes={408, 429, 500, 502, 503, 504},
+                retry_label=label,
+                stream=self.stream_json,
+            )
+        except requests.exceptions.RequestException as err:
+            self.logger.error(f"{label}失败: {err}")
+            self._mark_sync_error()
+            raise ItemListingError(label) from err
+        if response.status_code != 200:
+            self.logger.error(f"{label}失败，状态码: {response.status_code}")
+            self.logger.error(response.text)
+            self._mark_sync_error()
+            raise ItemListingError(label)
+        if self.stream_json:
+            return self._streaming_payload(response, label, self._endpoint_key('get', self._api_url(path)))
+        try:
+            return response.json()
+        except ValueError as err:
+            self.logger.error(f"{label}失败: 响应不是有效的 JSON")
+            self._mark_sync_error()
+            raise ItemListingError(label) from err
 
-    def _get_items(self, include_item_types, fields):
+    def _streaming_payload(self, response, label, stats_key=None):
+        """把流式响应包装成逐条产出 Items 的负载；中途断流或 JSON 损坏都按本页读取失败处理。"""
+
+        def fail(err):
+            self.logger.error(f"{label}失败: {err}")
+            self._mark_sync_error()
+            raise ItemListingError(label) from err
+
+        def chunks():
+            try:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if stats_key:
+                        self.metrics.add_bytes(stats_key, len(chunk))
+                    yield chunk
+            except requests.exceptions.RequestException as err:
+                fail(err)
+            finally:
+                response.close()
+
+        return StreamingPayload(chunks(), on_error=fail)
+
+    def _log_listing_stats(self, retry_label, pager):
+        if not pager.bytes_read:
+            return
+        rate = pager.bytes_read / pager.elapsed if pager.elapsed > 0 else 0
+        peak_rss = peak_rss_bytes()
+        peak_rss_text = f"{peak_rss / 1024 / 1024:.1f} MB" if peak_rss is not None else "未知"
+        self.logger.info(
+            f"{retry_label}读取统计: {pager.item_count} 条，{pager.page_count} 页，"
+            f"{pager.bytes_read / 1024:.0f} KB，{rate / 1024:.0f} KB/s，进程峰值内存 {peak_rss_text}"
+        )
+
+    def _item_pager(self, path, params, retry_label, on_finish=None):
+        def finish(pager):
+            self._log_listing_stats(retry_label, pager)
+            if on_finish:
+                on_finish(pager)
+
+        return ItemPager(
+            lambda start_index, limit: self._fetch_item_page(path, params, start_index, limit, retry_label),
+            page_size=self.page_size,
+            stop_flag=self.stop_flag,
+            on_finish=finish,
+        )
+
+    @staticmethod
+    def _item_total_hint(items):
+        total = getattr(items, 'total_record_count', None)
+        if total is None and isinstance(items, (list, tuple)):
+            return len(items)
+        return total
+
+    def _iter_items(self, include_item_types, fields, extra_params=None):
         params = {
             "api_key": self.api_key,
             "IncludeItemTypes": include_item_types,
             "Recursive": True,
             "Fields": fields,
-            "Limit": "1000000",
         }
+        params.update(extra_params or {})
+        return self._item_pager('/Items', params, f"读取 {include_item_types} 条目列表")
+
+    def _iter_items_created_since(self, include_item_types, since_utc):
+        """与流派/地区增量扫描一致，不依赖 Emby 的 MinDateLastSaved 过滤：按 DateCreated 降序分页，读到早于
+        since_utc 的条目即停止，不再请求后面的页。
+
+        DateCreated 与 since_utc 都是 UTC 时间，只比较到秒的前缀，不解析 Emby 的 7 位小数。
+        """
+        items = self._iter_items(
+            include_item_types,
+            "ProviderIds,DateCreated",
+            {'SortBy': 'DateCreated,Id', 'SortOrder': 'Descending'},
+        )
+        for item in items:
+            if str(item.get('DateCreated') or '')[:19] < since_utc[:19]:
+                return
+            yield item
+
+    def _get_items(self, include_item_types, fields):
         try:
-            response = self._request('get', '/Items', params=params)
-            response.raise_for_status()
-            return response.json().get("Items", [])
-        except requests.exceptions.HTTPError as http_err:
-            self.logger.error(f"HTTP error occurred: {http_err}")
-        except requests.exceptions.RequestException as err:
-            self.logger.error(f"Other error occurred: {err}")
-        except ValueError:
-            self.logger.error("Error parsing JSON response")
-        return []
+            return list(self._iter_items(include_item_types, fields))
+        except ItemListingError:
+            return []
 
     def _prepare_item_update_payload(self, item):
         payload = dict(item)
@@ -445,9 +1011,11 @@ class MediaServerClient:
         payload = self._prepare_item_update_payload(item)
         path = f"/Items/{urllib.parse.quote(str(item_id), safe='')}"
         retry_status_codes = {408, 429, 500, 502, 503, 504}
+        stats_key = self._endpoint_key('post', self._api_url(path))
         last_error = None
 
         for attempt in range(2):
+            retry_after = None
             try:
                 response = self._request(
                     'post',
@@ -459,10 +1027,13 @@ class MediaServerClient:
                 if response.status_code not in retry_status_codes:
                     return response
                 last_error = RuntimeError(f"HTTP {response.status_code}: {response.text}")
+                retry_after = self._retry_after_header(response)
             except requests.exceptions.RequestException as err:
                 last_error = err
 
-            if self._item_update_was_applied(item_id, payload):
+            applied = self._item_update_was_applied(item_id, payload)
+            self.metrics.record_readback(stats_key, applied)
+            if applied:
                 self.logger.info(
                     f"更新条目 {item.get('Name', item_id)}({item_id}) 响应异常，"
                     "但回读确认服务器已保存"
@@ -470,11 +1041,13 @@ class MediaServerClient:
                 return RequestFailureResponse(last_error, status_code=204)
 
             if attempt == 0:
+                delay = self.limiter.backoff_delay(attempt, 1, retry_after)
                 self.logger.warning(
                     f"更新条目 {item.get('Name', item_id)}({item_id}) 请求异常，"
-                    f"1 秒后重试 1/1: {last_error}"
+                    f"{delay:.1f} 秒后重试 1/1: {last_error}"
                 )
-                time.sleep(1)
+                self.metrics.record_retry(stats_key, delay)
+                time.sleep(delay)
 
         return RequestFailureResponse(last_error)
 
@@ -495,67 +1068,103 @@ class MediaServerClient:
         text = text.translate(GENRE_NORMALIZATION_TRANSLATION)
         return re.sub(r'\s+', ' ', text).strip()
 
-    def _genre_lookup_key(self, genre, genres_map, allow_normalized_index=True):
-        if genre in genres_map:
-            return genre
+    def _genre_translation_state(self, genres_map, verify_hash=False):
+        """返回翻译表的预编译结果和翻译缓存（按内容哈希在客户端之间共享）；
+        verify_hash=True 时重新确认翻译表内容，被修改过则重新编译并使用新的翻译缓存。"""
 
-        normalized_genre = self._normalize_genre_lookup_name(genre)
-        if normalized_genre in genres_map:
-            return normalized_genre
-        if not allow_normalized_index:
-            return None
+        def build(map_hash):
+            table = compile_genre_map(
+                genres_map,
+                self._clean_genre_name,
+                self._normalize_genre_name,
+                self._normalize_genre_lookup_name,
+            )
+            report = table.report
+            self.logger.info(
+                f"流派翻译表已编译: {report['keys']} 个键，展开翻译链 {report['collapsed_chains']} 条，"
+                f"循环 {len(report['cycles'])} 个，冲突写法 {len(report['conflicts'])} 个"
+            )
+            for cycle in report['cycles']:
+                self.logger.warning(f"流派翻译表存在循环: {' -> '.join(cycle)}")
+            for source, effective_key, own_target, folded_target in report['conflicts']:
+                self.logger.warning(
+                    f"流派翻译表存在冲突写法: {source} -> {own_target}，"
+                    f"与 {effective_key} -> {folded_target} 规范化后相同，模糊匹配时采用后者"
+                )
+            return {
+                'map_hash': map_hash,
+                'table': table,
+                'genre_memo': BoundedMemo(GENRE_MEMO_SIZE),
+                'list_memo': BoundedMemo(GENRE_LIST_MEMO_SIZE),
+            }
 
-        map_id = id(genres_map)
-        cached_map, cached_index = self._genre_lookup_index_cache.get(map_id, (None, None))
-        if cached_map is not genres_map:
-            cached_index = {}
-            for key in genres_map:
-                cached_index.setdefault(self._normalize_genre_lookup_name(key), key)
-            self._genre_lookup_index_cache[map_id] = (genres_map, cached_index)
+        return cached_derivative('genre_table', genres_map, build, verify=verify_hash)
 
-        return cached_index.get(normalized_genre)
+    def _compiled_genre_table(self, genres_map):
+        return self._genre_translation_state(genres_map)['table']
 
     def _resolve_genre_translation(self, genre, genres_map):
-        current = self._clean_genre_name(genre)
-        seen = set()
-        allow_normalized_index = True
-        while True:
-            lookup_key = self._genre_lookup_key(
-                current,
-                genres_map,
-                allow_normalized_index=allow_normalized_index,
-            )
-            if not lookup_key:
-                return self._normalize_genre_name(current)
-            if lookup_key in seen:
-                return self._normalize_genre_name(current)
-
-            seen.add(lookup_key)
-            translated = self._normalize_genre_name(genres_map[lookup_key])
-            if translated == current:
-                return translated
-            current = translated
-            allow_normalized_index = False
+        state = self._genre_translation_state(genres_map)
+        if not isinstance(genre, str):
+            return state['table'].resolve(genre)
+        return state['genre_memo'].get_or_compute(genre, lambda: state['table'].resolve(genre))
+
+    def _genre_list_translation(self, genres, genres_map):
+        """返回 (翻译去重后的流派元组, 变更项元组)；同一流派组合只计算一次。"""
+        genres = tuple(genres or ())
+
+        def compute():
+            translated_genres = []
+            changes = []
+            seen = set()
+            for genre in genres:
+                translated = self._resolve_genre_translation(genre, genres_map)
+                if genre != translated:
+                    changes.append((genre, translated))
+                if translated not in seen:
+                    translated_genres.append(translated)
+                    seen.add(translated)
+            if len(genres) != len(translated_genres):
+                changes.append(GENRE_MERGE_CHANGE)
+            return tuple(translated_genres), tuple(changes)
+
+        try:
+            hash(genres)
+        except TypeError:
+            return compute()
+        return self._genre_translation_state(genres_map)['list_memo'].get_or_compute(genres, compute)
 
     def _translate_genres(self, genres, genres_map):
-        translated_genres = []
-        seen = set()
-        for genre in genres:
-            translated = self._resolve_genre_translation(genre, genres_map)
-            if translated not in seen:
-                translated_genres.append(translated)
-                seen.add(translated)
-        return translated_genres
+        return list(self._genre_list_translation(genres, genres_map)[0])
+
+    def _genre_memo_stats(self, genres_map):
+        state = self._genre_translation_state(genres_map)
+        return {
+            'genre_hit_rate': state['genre_memo'].hit_rate,
+            'genre_entries': len(state['genre_memo']),
+            'list_hit_rate': state['list_memo'].hit_rate,
+            'list_entries': len(state['list_memo']),
+        }
 
     @staticmethod
     def _normalize_country_lookup_name(country):
         text = unicodedata.normalize('NFKC', str(country or '').strip())
         return re.sub(r'\s+', ' ', text).strip().casefold()
 
+    def _country_lookup_index(self):
+        countries_map = self._translation_map('countries')
+        return cached_derivative(
+            'country_lookup',
+            countries_map,
+            lambda _map_hash: {
+                self._normalize_country_lookup_name(source): target for source, target in countries_map.items()
+            },
+        )
+
     def _resolve_country_translation(self, country):
         text = unicodedata.normalize('NFKC', str(country or '').strip())
         text = re.sub(r'\s+', ' ', text).strip()
-        return self._country_lookup_index.get(self._normalize_country_lookup_name(text), text)
+        return self._country_lookup_index().get(self._normalize_country_lookup_name(text), text)
 
     def _translate_production_locations(self, locations):
         locations = self._production_locations_list(locations)
@@ -578,8 +1187,17 @@ class MediaServerClient:
             return [locations]
         return list(locations or [])
 
-    def _unique_items_by_id(self, items, item_label):
-        unique_items = []
+    def _country_list_changes(self, original_locations, translated_locations):
+        changes = []
+        for location in original_locations:
+            translated = self._resolve_country_translation(location)
+            if location != translated:
+                changes.append((location, translated))
+        if len(original_locations) != len(translated_locations):
+            changes.append(COUNTRY_MERGE_CHANGE)
+        return changes
+
+    def _iter_unique_items_by_id(self, items, item_label):
         seen_ids = set()
         duplicate_count = 0
         for item in items:
@@ -589,10 +1207,12 @@ class MediaServerClient:
                 continue
             if item_id:
                 seen_ids.add(item_id)
-            unique_items.append(item)
+            yield item
         if duplicate_count:
             self.logger.info(f"{item_label}列表中跳过重复条目 {duplicate_count} 个")
-        return unique_items
+
+    def _unique_items_by_id(self, items, item_label):
+        return list(self._iter_unique_items_by_id(items, item_label))
 
     @staticmethod
     def _should_report_progress(current, total, interval=500):
@@ -647,6 +1267,16 @@ class MediaServerClient:
             f"{updated_items_info}{omitted_message}\n"
         )
 
+    @staticmethod
+    def _add_to_genre_item_index(item, all_genres, all_genreitems, genre_item_ids):
+        all_genres.update(item.get('Genres', []))
+        for genre_item in item.get('GenreItems', []):
+            name = genre_item.get('Name')
+            gid = genre_item.get('Id')
+            if name and gid:
+                all_genreitems.add((name, gid))
+                genre_item_ids.setdefault(name, gid)
+
     @staticmethod
     def _build_genre_item_index(items):
         all_genreitems = set()
@@ -654,13 +1284,7 @@ class MediaServerClient:
         all_genres = set()
 
         for item in items:
-            all_genres.update(item.get('Genres', []))
-            for genre_item in item.get('GenreItems', []):
-                name = genre_item.get('Name')
-                gid = genre_item.get('Id')
-                if name and gid:
-                    all_genreitems.add((name, gid))
-                    genre_item_ids.setdefault(name, gid)
+            MediaServerClient._add_to_genre_item_index(item, all_genres, all_genreitems, genre_item_ids)
 
         return all_genres, all_genreitems, genre_item_ids
 
@@ -669,30 +1293,11 @@ class MediaServerClient:
         return [{'Name': genre, 'Id': genre_item_ids.get(genre, '')} for genre in translated_genres]
 
     def _get_genre_update_items(self, include_item_types, params):
+        """返回按页读取的条目流；Jellyfin 按用户媒体库视图逐个分页。读取媒体库视图失败时返回 None。"""
         if self.server_type != 'jellyfin':
-            try:
-                response = self._request_with_retries(
-                    'get',
-                    '/Items',
-                    params=params,
-                    timeout=(5, 120),
-                    retries=2,
-                    retry_delay=1,
-                    retry_status_codes={408, 429, 500, 502, 503, 504},
-                    retry_label=f"读取 Emby {include_item_types} 条目列表",
-                )
-            except requests.exceptions.RequestException as err:
-                self.logger.error(f"读取 Emby {include_item_types} 条目列表失败: {err}")
-                self._mark_sync_error()
-                return None
-            if response.status_code != 200:
-                self.logger.error(f"请求失败，状态码: {response.status_code}")
-                self.logger.error(response.text)
-                self._mark_sync_error()
-                return None
-            return response.json().get('Items', [])
+            return self._item_pager('/Items', params, f"读取 Emby {include_item_types} 条目列表")
 
-        self.user_id = self.user_id or self.emby_get_user_id()
+        self._ensure_user_id()
         if not self.user_id:
             self.logger.error("Failed to retrieve user ID.")
             self._mark_sync_error()
@@ -740,77 +1345,96 @@ class MediaServerClient:
             return []
 
         path = f"/Users/{quoted_user_id}/Items"
-        all_items = []
+        pagers = []
         for view in views:
-            if self.stop_flag.is_set():
-                break
-
             library_params = dict(params)
             library_params['ParentId'] = view['Id']
             library_name = view.get('Name', view['Id'])
-            try:
-                response = self._request_with_retries(
-                    'get',
-                    path,
-                    params=library_params,
-                    timeout=(5, 120),
-                    retries=2,
-                    retry_delay=1,
-                    retry_status_codes={408, 429, 500, 502, 503, 504},
-                    retry_label=f"读取 Jellyfin 媒体库“{library_name}”",
+
+            def log_library_finished(pager, library_name=library_name):
+                self.logger.info(
+                    f"Jellyfin 媒体库“{library_name}”读取到 {pager.item_count} 个 {include_item_types} 条目"
                 )
-            except requests.exceptions.RequestException as err:
-                self.logger.error(f"读取 Jellyfin 媒体库“{library_name}”失败: {err}")
-                self._mark_sync_error()
-                return None
-            if response.status_code != 200:
-                self.logger.error(
-                    f"读取 Jellyfin 媒体库“{library_name}”失败，状态码: {response.status_code}"
+
+            pagers.append(
+                self._item_pager(
+                    path,
+                    library_params,
+                    f"读取 Jellyfin 媒体库“{library_name}”",
+                    on_finish=log_library_finished,
                 )
-                self.logger.error(response.text)
-                self._mark_sync_error()
-                return None
+            )
 
-            library_items = response.json().get('Items', [])
-            all_items.extend(library_items)
-            self.logger.info(
-                f"Jellyfin 媒体库“{view.get('Name', view['Id'])}”读取到 "
-                f"{len(library_items)} 个 {include_item_types} 条目"
+        return ItemStream(pagers)
+
+    def _report_scan_progress(self, progress_callback, checked_count, total_items, message_prefix, candidate_count):
+        if total_items and checked_count <= total_items:
+            if not self._should_report_progress(checked_count, total_items):
+                return
+            self._report_progress(
+                progress_callback,
+                checked_count,
+                total_items,
+                f"{message_prefix}: {checked_count}/{total_items}，待更新 {candidate_count} 部",
+                percent=self._progress_percent(checked_count, total_items, 0, 50),
+            )
+        elif checked_count == 1 or checked_count % 500 == 0:
+            self._report_progress(
+                progress_callback,
+                checked_count,
+                None,
+                f"{message_prefix}: 已扫描 {checked_count}，待更新 {candidate_count} 部",
             )
 
-        return all_items
+    def _report_scan_finished(self, progress_callback, checked_count, total_items, message_prefix, candidate_count):
+        # 分页流式扫描时总数只是服务器的估计值，结束时以实际扫描数补发一次完成进度
+        if total_items == checked_count and self._should_report_progress(checked_count, total_items):
+            return
+        self._report_progress(
+            progress_callback,
+            checked_count,
+            checked_count,
+            f"{message_prefix}: {checked_count}/{checked_count}，待更新 {candidate_count} 部",
+            percent=50,
+        )
 
-    def _collect_country_update_candidates(self, items, item_label, progress_callback=None):
+    def _collect_country_update_candidates(self, items, item_label, progress_callback=None, item_observer=None):
+        """流式扫描条目，只保留需要更新地区的候选；item_observer 可顺带统计每个去重后的条目。"""
         candidates = []
         country_changes = Counter()
-        total_items = len(items)
         checked_count = 0
+        message_prefix = f"扫描{item_label}地区进度"
 
-        for item in items:
+        for item in self._iter_unique_items_by_id(items, item_label):
             if self.stop_flag.is_set():
                 return candidates, country_changes, checked_count, True
 
             checked_count += 1
+            if item_observer:
+                item_observer(item)
             original_locations = self._production_locations_list(item.get('ProductionLocations'))
             translated_locations = self._translate_production_locations(original_locations)
             if original_locations != translated_locations:
                 candidates.append(item)
-                for location in original_locations:
-                    translated = self._resolve_country_translation(location)
-                    if location != translated:
-                        country_changes[(location, translated)] += 1
-                if len(original_locations) != len(translated_locations):
-                    country_changes[('重复或空白地区', '合并去重后的地区列表')] += 1
-
-            if self._should_report_progress(checked_count, total_items):
-                self._report_progress(
-                    progress_callback,
-                    checked_count,
-                    total_items,
-                    f"扫描{item_label}地区进度: {checked_count}/{total_items}，待更新 {len(candidates)} 部",
-                    percent=self._progress_percent(checked_count, total_items, 0, 50),
-                )
+                country_changes.update(self._country_list_changes(original_locations, translated_locations))
+
+            self._report_scan_progress(
+                progress_callback,
+                checked_count,
+                self._item_total_hint(items),
+                message_prefix,
+                len(candidates),
+            )
 
+        if self.stop_flag.is_set():
+            return candidates, country_changes, checked_count, True
+        self._report_scan_finished(
+            progress_callback,
+            checked_count,
+            self._item_total_hint(items),
+            message_prefix,
+            len(candidates),
+        )
         return candidates, country_changes, checked_count, False
 
     def _log_country_change_summary(self, item_label, country_changes, max_items=80):
@@ -832,38 +1456,46 @@ class MediaServerClient:
         params = {
             'Recursive': 'true',
             'IncludeItemTypes': include_item_types,
-            'Fields': 'ProductionLocations,DateLastSaved',
-            'Limit': '1000000',
+            'Fields': 'ProductionLocations,DateLastSaved,Etag',
         }
         if self._sync_min_date_last_saved:
             params['MinDateLastSaved'] = self._sync_min_date_last_saved
 
-        items = self._get_genre_update_items(include_item_types, params)
+        items = self._get_genre_update_items(include_item_types, self._snapshot_listing_params(params))
         if items is None:
             return updated_items
+        items = self._snapshot_changed_items(items, params, 'ProductionLocations', item_label)
+
+        all_locations = set()
+
+        def collect_locations(item):
+            self._record_snapshot_item(item, 'ProductionLocations')
+            all_locations.update(
+                str(location).strip()
+                for location in self._production_locations_list(item.get('ProductionLocations'))
+                if str(location).strip()
+            )
+
+        try:
+            candidates, country_changes, checked_count, stopped = self._collect_country_update_candidates(
+                items,
+                item_label,
+                progress_callback,
+                item_observer=collect_locations,
+            )
+        except ItemListingError:
+            self.logger.error(f"{item_label}条目列表读取中断，本次不更新{item_label}地区")
+            return updated_items
+        total_items = checked_count
+        if stopped:
+            self.logger.info(f"{item_label}地区更新已停止，已扫描 {checked_count} 部，已更新 0 部")
+            return updated_items
 
-        items = self._unique_items_by_id(items, item_label)
-        total_items = len(items)
-        all_locations = {
-            str(location).strip()
-            for item in items
-            for location in self._production_locations_list(item.get('ProductionLocations'))
-            if str(location).strip()
-        }
         self.logger.info(
             f"{item_label}所有去重后的ProductionLocations（{len(all_locations)} 个）: "
             f"{self._format_limited_values(all_locations)}"
         )
 
-        candidates, country_changes, checked_count, stopped = self._collect_country_update_candidates(
-            items,
-            item_label,
-            progress_callback,
-        )
-        if stopped:
-            self.logger.info(f"{item_label}地区更新已停止，已扫描 {checked_count}/{total_items} 部，已更新 0 部")
-            return updated_items
-
         self.logger.info(f"{item_label}共 {total_items} 部，预扫描后需要更新 {len(candidates)} 部")
         self._log_country_change_summary(item_label, country_changes)
         if not candidates:
@@ -881,18 +1513,44 @@ class MediaServerClient:
         processed_count = 0
         stopped = False
         last_update_heartbeat = 0
+        abort_event = threading.Event()
         self._report_progress(
             progress_callback,
             0,
             len(candidates),
-            f"开始更新{item_label}地区，候选 {len(candidates)} 部",
+            f"开始更新{item_label}地区，候选 {len(candidates)} 部（并发 {self.concurrency}）",
             percent=50,
         )
 
-        for candidate_index, candidate in enumerate(candidates, start=1):
-            if self.stop_flag.is_set():
-                stopped = True
-                break
+        def fetch_and_update(candidate):
+            item_id = candidate['Id']
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', None, None
+            item = self.get_item_info(item_id)
+            if not item:
+                return 'read_failed', None, None
+
+            original_locations = self._production_locations_list(item.get('ProductionLocations'))
+            translated_locations = self._translate_production_locations(original_locations)
+            if original_locations == translated_locations:
+                return 'unchanged', item, None
+
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', item, None
+
+            item['ProductionLocations'] = translated_locations
+            return 'posted', item, self._post_item_update(item_id, item)
+
+        for candidate_index, candidate, (status, item, update_response) in self._iter_pipelined(
+            candidates,
+            fetch_and_update,
+            abort_event,
+        ):
+            if status == 'skipped':
+                if self.stop_flag.is_set():
+                    stopped = True
+                continue
+            processed_count = max(processed_count, candidate_index)
 
             item_id = candidate['Id']
             item_name = candidate.get('Name', item_id)
@@ -913,27 +1571,17 @@ class MediaServerClient:
                 )
                 last_update_heartbeat = now
 
-            item = self.get_item_info(item_id)
-            processed_count = candidate_index
-            if not item:
+            if status == 'read_failed':
                 self.logger.error(f"{item_label}ID '{item_id}' 的信息读取失败.(Total updates: {update_count})")
                 self._mark_sync_error()
                 continue
-
-            original_locations = self._production_locations_list(item.get('ProductionLocations'))
-            translated_locations = self._translate_production_locations(original_locations)
-            if original_locations == translated_locations:
+            if status == 'unchanged':
                 continue
 
-            if self.stop_flag.is_set():
-                stopped = True
-                break
-
-            item['ProductionLocations'] = translated_locations
-            update_response = self._post_item_update(item_id, item)
             if update_response.status_code in [200, 204]:
                 update_count += 1
                 updated_items.append(item)
+                self._record_snapshot_item(item, 'ProductionLocations', keep_version=False)
                 if self._should_log_item_update(update_count):
                     self.logger.info(f"{item_label}: {item['Name']} 地区信息已更新。(Total updates: {update_count})")
             else:
@@ -953,6 +1601,7 @@ class MediaServerClient:
                     percent=self._progress_percent(candidate_index, len(candidates), 50, 50),
                 )
 
+        stopped = stopped or self.stop_flag.is_set()
         if stopped:
             self.logger.info(
                 f"{item_label}地区更新已停止，候选 {len(candidates)} 部，"
@@ -962,37 +1611,58 @@ class MediaServerClient:
             self.logger.info(f"{item_label}地区更新完成，候选 {len(candidates)} 部，已成功 {update_count} 部")
         return updated_items
 
-    def _collect_genre_update_candidates(self, items, genres_map, item_label, progress_callback=None):
+    def _collect_genre_update_candidates(
+        self,
+        items,
+        genres_map,
+        item_label,
+        progress_callback=None,
+        item_observer=None,
+    ):
+        """流式扫描条目，只保留需要更新流派的候选；item_observer 可顺带统计每个去重后的条目。"""
         candidates = []
         genre_changes = Counter()
-        total_items = len(items)
         checked_count = 0
+        message_prefix = f"扫描{item_label}流派进度"
+        # 每轮扫描前确认翻译表内容未变，变化时自动丢弃旧的翻译缓存
+        self._genre_translation_state(genres_map, verify_hash=True)
 
-        for item in items:
+        for item in self._iter_unique_items_by_id(items, item_label):
             if self.stop_flag.is_set():
                 return candidates, genre_changes, checked_count, True
 
             checked_count += 1
+            if item_observer:
+                item_observer(item)
             original_genres = item.get('Genres', [])
-            translated_genres = self._translate_genres(original_genres, genres_map)
-            if original_genres != translated_genres:
+            translated_genres, changes = self._genre_list_translation(original_genres, genres_map)
+            if list(original_genres) != list(translated_genres):
                 candidates.append(item)
-                for genre in original_genres:
-                    translated_genre = self._resolve_genre_translation(genre, genres_map)
-                    if genre != translated_genre:
-                        genre_changes[(genre, translated_genre)] += 1
-                if len(original_genres) != len(translated_genres):
-                    genre_changes[('重复或近似流派', '合并去重后的流派列表')] += 1
-
-            if self._should_report_progress(checked_count, total_items):
-                self._report_progress(
-                    progress_callback,
-                    checked_count,
-                    total_items,
-                    f"扫描{item_label}流派进度: {checked_count}/{total_items}，待更新 {len(candidates)} 部",
-                    percent=self._progress_percent(checked_count, total_items, 0, 50),
-                )
+                genre_changes.update(changes)
+
+            self._report_scan_progress(
+                progress_callback,
+                checked_count,
+                self._item_total_hint(items),
+                message_prefix,
+                len(candidates),
+            )
 
+        if self.stop_flag.is_set():
+            return candidates, genre_changes, checked_count, True
+        self._report_scan_finished(
+            progress_callback,
+            checked_count,
+            self._item_total_hint(items),
+            message_prefix,
+            len(candidates),
+        )
+        memo_stats = self._genre_memo_stats(genres_map)
+        self.logger.info(
+            f"{item_label}流派翻译缓存: 单个流派命中率 {memo_stats['genre_hit_rate']:.1%}"
+            f"（{memo_stats['genre_entries']} 项），流派组合命中率 {memo_stats['list_hit_rate']:.1%}"
+            f"（{memo_stats['list_entries']} 项）"
+        )
         return candidates, genre_changes, checked_count, False
 
     def _log_genre_change_summary(self, item_label, genre_changes, max_items=80):
@@ -1022,19 +1692,38 @@ class MediaServerClient:
         params = {
             'Recursive': 'true',
             'IncludeItemTypes': include_item_types,
-            'Fields': 'Genres,GenreItems,DateLastSaved',
-            'Limit': '1000000',
+            'Fields': 'Genres,GenreItems,DateLastSaved,Etag',
         }
         if self._sync_min_date_last_saved:
             params['MinDateLastSaved'] = self._sync_min_date_last_saved
 
-        items = self._get_genre_update_items(include_item_types, params)
+        items = self._get_genre_update_items(include_item_types, self._snapshot_listing_params(params))
         if items is None:
             return updated_items
+        items = self._snapshot_changed_items(items, params, 'Genres', item_label)
+
+        all_genres, all_genreitems, genre_item_ids = set(), set(), {}
+
+        def index_genres(item):
+            self._record_snapshot_item(item, 'Genres')
+            self._add_to_genre_item_index(item, all_genres, all_genreitems, genre_item_ids)
+
+        try:
+            candidates, genre_changes, checked_count, stopped = self._collect_genre_update_candidates(
+                items,
+                genres_map,
+                item_label,
+                progress_callback,
+                item_observer=index_genres,
+            )
+        except ItemListingError:
+            self.logger.error(f"{item_label}条目列表读取中断，本次不更新{item_label}流派")
+            return updated_items
+        total_items = checked_count
+        if stopped:
+            self.logger.info(f"{item_label}流派更新已停止，已扫描 {checked_count} 部，已更新 0 部")
+            return updated_items
 
-        items = self._unique_items_by_id(items, item_label)
-        total_items = len(items)
-        all_genres, all_genreitems, genre_item_ids = self._build_genre_item_index(items)
         self.logger.info(
             f"{item_label}所有去重后的Genres（{len(all_genres)} 个）: "
             f"{self._format_limited_values(all_genres)}"
@@ -1044,18 +1733,9 @@ class MediaServerClient:
             f"{self._format_limited_values(all_genreitems)}"
         )
 
-        candidates, genre_changes, checked_count, stopped = self._collect_genre_update_candidates(
-            items,
-            genres_map,
-            item_label,
-            progress_callback,
-        )
-        if stopped:
-            self.logger.info(f"{item_label}流派更新已停止，已扫描 {checked_count}/{total_items} 部，已更新 0 部")
-            return updated_items
-
         self.logger.info(f"{item_label}共 {total_items} 部，预扫描后需要更新 {len(candidates)} 部")
         self._log_genre_change_summary(item_label, genre_changes)
+        self._forget_snapshot_items(candidates)
 
         if not candidates:
             self._report_progress(
@@ -1069,19 +1749,49 @@ class MediaServerClient:
             return updated_items
 
         stopped = False
+        rescan = False
+        processed_count = 0
         last_update_heartbeat = 0
         unchanged_detail_count = 0
+        abort_event = threading.Event()
         self._report_progress(
             progress_callback,
             0,
             len(candidates),
-            f"开始更新{item_label}流派，候选 {len(candidates)} 部",
+            f"开始更新{item_label}流派，候选 {len(candidates)} 部（并发 {self.concurrency}）",
             percent=50,
         )
-        for candidate_index, each_item in enumerate(candidates, start=1):
-            if self.stop_flag.is_set():
-                stopped = True
-                break
+
+        def fetch_and_update(candidate):
+            item_id = candidate['Id']
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', None, None
+            item = self.get_item_info(item_id)
+            if not item:
+                return 'read_failed', None, None
+
+            original_genres = item.get('Genres', [])
+            translated_genres = self._translate_genres(original_genres, genres_map)
+            if original_genres == translated_genres:
+                return 'unchanged', item, None
+
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', item, None
+
+            item['Genres'] = translated_genres
+            item['GenreItems'] = self._build_genre_items(translated_genres, genre_item_ids)
+            return 'posted', item, self._post_item_update(item_id, item)
+
+        for candidate_index, each_item, (status, item, update_response) in self._iter_pipelined(
+            candidates,
+            fetch_and_update,
+            abort_event,
+        ):
+            if status == 'skipped':
+                if self.stop_flag.is_set():
+                    stopped = True
+                continue
+            processed_count = max(processed_count, candidate_index)
 
             item_id = each_item['Id']
             item_name = each_item.get('Name', item_id)
@@ -1105,15 +1815,15 @@ class MediaServerClient:
                 )
                 last_update_heartbeat = now
 
-            item = self.get_item_info(item_id)
-            if not item:
+            if status == 'read_failed':
                 self.logger.error(f"{item_label}ID '{item_id}' 的信息读取失败.(Total updates: {update_count})")
                 self._mark_sync_error()
                 continue
 
-            original_genres = item.get('Genres', [])
-            translated_genres = self._translate_genres(original_genres, genres_map)
-            if original_genres == translated_genres:
+            if status == 'unchanged':
+                self._record_snapshot_item(item, 'Genres')
+                if abort_event.is_set():
+                    continue
                 unchanged_detail_count += 1
                 if unchanged_detail_count in {50, 100, 200} or unchanged_detail_count % 500 == 0:
                     self.logger.info(
@@ -1124,32 +1834,19 @@ class MediaServerClient:
                     self.logger.warning(
                         f"{item_label}候选快照疑似已过期：连续 {unchanged_detail_count} 个候选详情均无需更新。"
                     )
+                    # 停止派发新的候选，已在执行中的请求仍然收尾并计入统计
+                    abort_event.set()
                     if rescan_attempts < 1 and not self.stop_flag.is_set():
-                        self.logger.info(f"重新扫描{item_label}流派候选后继续")
-                        return self._translate_items_genres_and_update(
-                            item_label,
-                            include_item_types,
-                            genres_map,
-                            progress_callback=progress_callback,
-                            rescan_attempts=rescan_attempts + 1,
-                        )
-                    self.logger.warning(f"{item_label}流派更新停止：重扫后仍未发现可提交的更新")
-                    break
+                        rescan = True
+                    else:
+                        self.logger.warning(f"{item_label}流派更新停止：重扫后仍未发现可提交的更新")
                 continue
             unchanged_detail_count = 0
 
-            if self.stop_flag.is_set():
-                stopped = True
-                break
-
-            item['Genres'] = translated_genres
-            item['GenreItems'] = self._build_genre_items(translated_genres, genre_item_ids)
-
-            update_response = self._post_item_update(item_id, item)
-
             if update_response.status_code in [200, 204]:
                 update_count += 1
                 updated_items.append(item)
+                self._record_snapshot_item(item, 'Genres', keep_version=False)
                 if self._should_log_item_update(update_count):
                     self.logger.info(f"{item_label}: {item['Name']} 流派信息已更新。(Total updates: {update_count})")
             else:
@@ -1169,9 +1866,20 @@ class MediaServerClient:
                     percent=self._progress_percent(candidate_index, len(candidates), 50, 50),
                 )
 
+        if rescan and not self.stop_flag.is_set():
+            self.logger.info(f"重新扫描{item_label}流派候选后继续")
+            return updated_items + self._translate_items_genres_and_update(
+                item_label,
+                include_item_types,
+                genres_map,
+                progress_callback=progress_callback,
+                rescan_attempts=rescan_attempts + 1,
+            )
+
+        stopped = stopped or self.stop_flag.is_set()
         if stopped:
             self.logger.info(
-                f"{item_label}流派更新已停止，候选 {len(candidates)} 部，已处理 {candidate_index - 1} 部，"
+                f"{item_label}流派更新已停止，候选 {len(candidates)} 部，已处理 {processed_count} 部，"
                 f"已更新 {update_count} 部"
             )
         else:
@@ -1182,7 +1890,479 @@ class MediaServerClient:
 
         return updated_items
 
-    def check_duplicates(self, target_folder, callback):
+    def _collect_metadata_update_candidates(
+        self,
+        items,
+        genres_map,
+        item_label,
+        progress_callback=None,
+        item_observer=None,
+    ):
+        """一次扫描同时评估流派和地区，保留任一字段需要更新的候选。"""
+        candidates = []
+        genre_changes = Counter()
+        country_changes = Counter()
+        field_counts = Counter()
+        checked_count = 0
+        message_prefix = f"扫描{item_label}流派和地区进度"
+        self._genre_translation_state(genres_map, verify_hash=True)
+
+        for item in self._iter_unique_items_by_id(items, item_label):
+            if self.stop_flag.is_set():
+                return candidates, genre_changes, country_changes, field_counts, checked_count, True
+
+            checked_count += 1
+            if item_observer:
+                item_observer(item)
+            original_genres = item.get('Genres', [])
+            translated_genres, changes = self._genre_list_translation(original_genres, genres_map)
+            genres_changed = list(original_genres) != list(translated_genres)
+            original_locations = self._production_locations_list(item.get('ProductionLocations'))
+            translated_locations = self._translate_production_locations(original_locations)
+            countries_changed = original_locations != translated_locations
+
+            if genres_changed or countries_changed:
+                candidates.append(item)
+            if genres_changed:
+                genre_changes.update(changes)
+            if countries_changed:
+                country_changes.update(self._country_list_changes(original_locations, translated_locations))
+            if genres_changed and countries_changed:
+                field_counts['both'] += 1
+            elif genres_changed:
+                field_counts['genres'] += 1
+            elif countries_changed:
+                field_counts['countries'] += 1
+
+            self._report_scan_progress(
+                progress_callback,
+                checked_count,
+                self._item_total_hint(items),
+                message_prefix,
+                len(candidates),
+            )
+
+        if self.stop_flag.is_set():
+            return candidates, genre_changes, country_changes, field_counts, checked_count, True
+        self._report_scan_finished(
+            progress_callback,
+            checked_count,
+            self._item_total_hint(items),
+            message_prefix,
+            len(candidates),
+        )
+        return candidates, genre_changes, country_changes, field_counts, checked_count, False
+
+    def _apply_metadata_translation(self, item, genres_map, genre_item_ids):
+        """就地翻译条目的流派和地区，返回发生变化的字段名列表。"""
+        changed_fields = []
+        original_genres = item.get('Genres', [])
+        translated_genres = self._translate_genres(original_genres, genres_map)
+        if original_genres != translated_genres:
+            item['Genres'] = translated_genres
+            item['GenreItems'] = self._build_genre_items(translated_genres, genre_item_ids)
+            changed_fields.append('Genres')
+
+        original_locations = self._production_locations_list(item.get('ProductionLocations'))
+        translated_locations = self._translate_production_locations(original_locations)
+        if original_locations != translated_locations:
+            item['ProductionLocations'] = translated_locations
+            changed_fields.append('ProductionLocations')
+        return changed_fields
+
+    def _translate_items_metadata_and_update(self, item_label, include_item_types, genres_map, progress_callback=None):
+        """流派和地区合并处理：列表只读取一次，每个候选只读取一次详情、提交一次更新。"""
+        updated_items = []
+        params = {
+            'Recursive': 'true',
+            'IncludeItemTypes': include_item_types,
+            'Fields': 'Genres,GenreItems,ProductionLocations,DateLastSaved,Etag',
+        }
+        if self._sync_min_date_last_saved:
+            params['MinDateLastSaved'] = self._sync_min_date_last_saved
+
+        items = self._get_genre_update_items(include_item_types, self._snapshot_listing_params(params))
+        if items is None:
+            return updated_items
+        items = self._snapshot_changed_items(items, params, METADATA_SNAPSHOT_FIELDS, item_label)
+
+        all_genres, all_genreitems, genre_item_ids = set(), set(), {}
+
+        def index_item(item):
+            self._record_snapshot_item(item, METADATA_SNAPSHOT_FIELDS)
+            self._add_to_genre_item_index(item, all_genres, all_genreitems, genre_item_ids)
+
+        try:
+            (
+                candidates,
+                genre_changes,
+                country_changes,
+                field_counts,
+                checked_count,
+                stopped,
+            ) = self._collect_metadata_update_candidates(
+                items,
+                genres_map,
+                item_label,
+                progress_callback,
+                item_observer=index_item,
+            )
+        except ItemListingError:
+            self.logger.error(f"{item_label}条目列表读取中断，本次不更新{item_label}流派和地区")
+            return updated_items
+        if stopped:
+            self.logger.info(f"{item_label}流派和地区更新已停止，已扫描 {checked_count} 部，已更新 0 部")
+            return updated_items
+
+        self.logger.info(
+            f"{item_label}共 {checked_count} 部，预扫描后需要更新 {len(candidates)} 部"
+            f"（仅流派 {field_counts['genres']} 部，仅地区 {field_counts['countries']} 部，"
+            f"两者都需要 {field_counts['both']} 部）"
+        )
+        self._log_genre_change_summary(item_label, genre_changes)
+        self._log_country_change_summary(item_label, country_changes)
+        if not candidates:
+            self._report_progress(
+                progress_callback,
+                1,
+                1,
+                f"{item_label}流派和地区预扫描完成，没有需要更新的条目",
+                percent=100,
+            )
+            self.logger.info(f"没有需要更新的{item_label}流派和地区信息。")
+            return updated_items
+
+        update_count = 0
+        processed_count = 0
+        stopped = False
+        last_update_heartbeat = 0
+        abort_event = threading.Event()
+        self._report_progress(
+            progress_callback,
+            0,
+            len(candidates),
+            f"开始更新{item_label}流派和地区，候选 {len(candidates)} 部（并发 {self.concurrency}）",
+            percent=50,
+        )
+
+        def fetch_and_update(candidate):
+            item_id = candidate['Id']
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', None, None
+            item = self.get_item_info(item_id)
+            if not item:
+                return 'read_failed', None, None
+
+            if not self._apply_metadata_translation(item, genres_map, genre_item_ids):
+                return 'unchanged', item, None
+
+            if self.stop_flag.is_set() or abort_event.is_set():
+                return 'skipped', item, None
+            return 'posted', item, self._post_item_update(item_id, item)
+
+        for candidate_index, candidate, (status, item, update_response) in self._iter_pipelined(
+            candidates,
+            fetch_and_update,
+            abort_event,
+        ):
+            if status == 'skipped':
+                if self.stop_flag.is_set():
+                    stopped = True
+                continue
+            processed_count = max(processed_count, candidate_index)
+
+            item_id = candidate['Id']
+            item_name = candidate.get('Name', item_id)
+            now = time.monotonic()
+            should_log_heartbeat = (
+                candidate_index <= 50
+                or candidate_index % 100 == 0
+                or now - last_update_heartbeat >= 30
+            )
+            if should_log_heartbeat:
+                self._report_progress(
+                    progress_callback,
+                    candidate_index - 1,
+                    len(candidates),
+                    f"正在更新{item_label}流派和地区: {candidate_index}/{len(candidates)}，"
+                    f"已成功 {update_count} 部，当前: {item_name}",
+                    percent=self._progress_percent(candidate_index - 1, len(candidates), 50, 50),
+                )
+                last_update_heartbeat = now
+
+            if status == 'read_failed':
+                self.logger.error(f"{item_label}ID '{item_id}' 的信息读取失败.(Total updates: {update_count})")
+                self._mark_sync_error()
+                continue
+            if status == 'unchanged':
+                continue
+
+            if update_response.status_code in [200, 204]:
+                update_count += 1
+                updated_items.append(item)
+                self._record_snapshot_item(item, METADATA_SNAPSHOT_FIELDS, keep_version=False)
+                if self._should_log_item_update(update_count):
+                    self.logger.info(
+                        f"{item_label}: {item['Name']} 流派和地区信息已更新。(Total updates: {update_count})"
+                    )
+            else:
+                self._mark_sync_error()
+                self.logger.error(
+                    f"{item_label} '{item.get('Name', item_id)}'({item_id}) 更新失败，"
+                    f"状态码: {update_response.status_code}(Total updates: {update_count})"
+                )
+                self.logger.error(update_response.text)
+
+            if self._should_report_progress(candidate_index, len(candidates)):
+                self._report_progress(
+                    progress_callback,
+                    candidate_index,
+                    len(candidates),
+                    f"更新{item_label}流派和地区进度: {candidate_index}/{len(candidates)}，已成功 {update_count} 部",
+                    percent=self._progress_percent(candidate_index, len(candidates), 50, 50),
+                )
+
+        stopped = stopped or self.stop_flag.is_set()
+        if stopped:
+            self.logger.info(
+                f"{item_label}流派和地区更新已停止，候选 {len(candidates)} 部，"
+                f"已处理 {processed_count} 部，已成功 {update_count} 部"
+            )
+        else:
+            self.logger.info(f"{item_label}流派和地区更新完成，候选 {len(candidates)} 部，已成功 {update_count} 部")
+        return updated_items
+
+    def _plan_field_value(self, item, field):
+        if field == 'ProductionLocations':
+            return self._production_locations_list(item.get(field))
+        return list(item.get(field) or [])
+
+    def _plan_metadata_entries(self, item_label, include_item_types, genres_map, progress_callback=None):
+        """完整扫描一种条目类型，返回计划条目列表；列表读取失败或任务停止时返回 None。"""
+        params = {
+            'Recursive': 'true',
+            'IncludeItemTypes': include_item_types,
+            'Fields': 'Genres,GenreItems,ProductionLocations,DateLastSaved,Etag',
+        }
+        items = self._get_genre_update_items(include_item_types, params)
+        if items is None:
+            return None
+
+        all_genres, all_genreitems, genre_item_ids = set(), set(), {}
+
+        def index_item(item):
+            self._add_to_genre_item_index(item, all_genres, all_genreitems, genre_item_ids)
+
+        try:
+            (
+                candidates,
+                genre_changes,
+                country_changes,
+                _field_counts,
+                checked_count,
+                stopped,
+            ) = self._collect_metadata_update_candidates(
+                items,
+                genres_map,
+                item_label,
+                progress_callback,
+                item_observer=index_item,
+            )
+        except ItemListingError:
+            self.logger.error(f"{item_label}条目列表读取中断，本次不生成更新计划")
+            return None
+        if stopped:
+            return None
+
+        self.logger.info(f"{item_label}共 {checked_count} 部，计划更新 {len(candidates)} 部")
+        self._log_genre_change_summary(item_label, genre_changes)
+        self._log_country_change_summary(item_label, country_changes)
+
+        entries = []
+        for item in candidates:
+            planned = dict(item)
+            changed_fields = self._apply_metadata_translation(planned, genres_map, genre_item_ids)
+            entries.append(
+                {
+                    'Id': item['Id'],
+                    'Name': item.get('Name', item['Id']),
+                    'Type': include_item_types,
+                    'Version': item_version(item),
+                    'Changes': {
+                        field: {
+                            'old': self._plan_field_value(item, field),
+                            'new': self._plan_field_value(planned, field),
+                        }
+                        for field in changed_fields
+                    },
+                    'GenreItems': planned.get('GenreItems') if 'Genres' in changed_fields else None,
+                }
+            )
+        return entries
+
+    def _apply_plan_changes(self, item, entry):
+        """把计划中的变更写入最新详情；返回 'already'（已是目标值）、'conflict'（字段已被其他途径修改）或 'changed'。"""
+        changes = entry.get('Changes') or {}
+        current = {field: self._plan_field_value(item, field) for field in changes}
+        if all(current[field] == change.get('new') for field, change in changes.items()):
+            return 'already'
+        if any(current[field] not in (change.get('old'), change.get('new')) for field, change in changes.items()):
+            return 'conflict'
+        for field, change in changes.items():
+            item[field] = change.get('new')
+        if 'Genres' in changes and entry.get('GenreItems') is not None:
+            item['GenreItems'] = entry['GenreItems']
+        return 'changed'
+
+    def _apply_plan_entries(self, plan, entries, progress_callback=None):
+        """按计划顺序读取详情并提交；成功、已是目标值和冲突的条目写入检查点，失败的留到下次重试。"""
+        counts = Counter()
+        abort_event = threading.Event()
+
+        def fetch_and_update(entry):
+            item_id = entry['Id']
+            if self.stop_flag.is_set():
+                return 'skipped', None, None
+            item = self.get_item_info(item_id)
+            if not item:
+                return 'read_failed', None, None
+            status = self._apply_plan_changes(item, entry)
+            if status != 'changed':
+                return status, item, None
+            if self.stop_flag.is_set():
+                return 'skipped', item, None
+            return 'posted', item, self._post_item_update(item_id, item)
+
+        for index, entry, (status, item, update_response) in self._iter_pipelined(
+            entries,
+            fetch_and_update,
+            abort_event,
+        ):
+            item_id = entry['Id']
+            item_name = entry.get('Name', item_id)
+            if status == 'skipped':
+                continue
+            if status == 'read_failed':
+                counts['failed'] += 1
+                self.logger.error(f"计划条目 '{item_name}'({item_id}) 的信息读取失败")
+            elif status == 'conflict':
+                counts['conflict'] += 1
+                plan.mark_done(item_id, status)
+                self.logger.warning(f"计划条目 '{item_name}'({item_id}) 生成计划后已被修改，跳过")
+            elif status == 'already':
+                counts['already'] += 1
+                plan.mark_done(item_id, status)
+            elif update_response.status_code in [200, 204]:
+                counts['applied'] += 1
+                plan.mark_done(item_id, 'applied')
+                if self._should_log_item_update(counts['applied']):
+                    self.logger.info(f"{item_name} 已按计划更新。(Total updates: {counts['applied']})")
+            else:
+                counts['failed'] += 1
+                self.logger.error(
+                    f"计划条目 '{item_name}'({item_id}) 更新失败，状态码: {update_response.status_code}"
+                )
+                self.logger.error(update_response.text)
+
+            if self._should_report_progress(index, len(entries)):
+                self._report_progress(
+                    progress_callback,
+                    index,
+                    len(entries),
+                    f"执行更新计划: {index}/{len(entries)}，已更新 {counts['applied']} 部",
+                )
+        return counts
+
+    def _report_nfo_scan_progress(self, progress_callback, pipeline, total_items, duplicate_items, final=False):
+        processed = pipeline.processed
+        total = pipeline.discovered if pipeline.walk_finished else None
+        if not final and not (processed <= 20 or processed % 200 == 0):
+            return
+        total_label = total if total is not None else f"{pipeline.discovered}+"
+        message = f"查重进度: 已读取 NFO {processed}/{total_label}，有效 {total_items} 个，重复 {duplicate_items} 个"
+        if final or processed % 1000 == 0:
+            self.logger.info(message)
+        self._report_progress(
+            progress_callback,
+            processed,
+            total,
+            message,
+            percent=self._progress_percent(processed, total) if total else None,
+        )
+
+    def _log_nfo_index_stats(self, target_folder, seen_nfo_paths, prune=True):
+        index = self._nfo_index
+        if index is None:
+            return
+        # 只有完整遍历后才能判断哪些记录已失效
+        removed = index.prune(target_folder, seen_nfo_paths) if prune else 0
+        stats = index.stats()
+        self.logger.info(
+            f"NFO ID 索引: 命中 {stats['hits']} 个，重新解析 {stats['misses']} 个，"
+            f"命中率 {stats['hit_rate']:.1%}，清理失效记录 {removed} 条，现有 {stats['rows']} 条"
+        )
+
+    def _library_media_for_duplicates(self):
+        """查重用的媒体库列表：优先使用本地快照并按 DateLastSaved 增量刷新，刷新失败时退回本地快照。"""
+        snapshot = LibrarySnapshot.for_server(self.cache_dir, self._sync_server_key())
+        loaded = snapshot.load()
+        now = time.time()
+        if loaded and now - snapshot.synced_at < self.library_snapshot_ttl:
+            self.logger.info(
+                f"使用本地媒体库快照: {len(snapshot.items)} 部影剧，{now - snapshot.synced_at:.0f} 秒前同步"
+            )
+            return snapshot.media()
+
+        started_utc = self._iso_utc_now()
+        incremental_since = None
+        # 删除的条目增量刷新发现不了，靠定期完整刷新清理
+        if (
+            loaded
+            and snapshot.full_synced_at is not None
+            and now - snapshot.full_synced_at < LIBRARY_FULL_REFRESH_INTERVAL
+        ):
+            incremental_since = self._incremental_since(snapshot.synced_utc)
+        try:
+            if incremental_since and self.server_type == 'jellyfin':
+                changed = snapshot.upsert(
+                    self._iter_items("Movie,Series", "ProviderIds", {'MinDateLastSaved': incremental_since})
+                )
+                self.logger.info(
+                    f"媒体库快照增量刷新: 自 {incremental_since} 起变化 {changed} 部，共 {len(snapshot.items)} 部"
+                )
+            elif incremental_since:
+                changed = snapshot.upsert(self._iter_items_created_since("Movie,Series", incremental_since))
+                self.logger.info(
+                    f"媒体库快照增量刷新: 自 {incremental_since} 起新增 {changed} 部，共 {len(snapshot.items)} 部"
+                    "（Emby 只补充新增条目，已有条目的 ID 变化在下次完整刷新时更新）"
+                )
+            else:
+                count = snapshot.replace(self._iter_items("Movie,Series", "ProviderIds"))
+                self.logger.info(f"媒体库快照完整刷新: 共 {count} 部")
+        except (ItemListingError, requests.exceptions.RequestException) as err:
+            if not loaded:
+                self.logger.error(f"读取媒体库失败，且没有可用的本地快照: {err}")
+                return []
+            self.logger.warning(
+                f"刷新媒体库快照失败，使用 {now - snapshot.synced_at:.0f} 秒前同步的本地快照"
+                f"（{len(snapshot.items)} 部）: {err}"
+            )
+            return snapshot.media()
+
+        try:
+            snapshot.save(now, started_utc, full=not incremental_since)
+        except OSError as err:
+            self.logger.warning(f"媒体库快照保存失败: {err}")
+        return snapshot.media()
+
+    def check_duplicates(self, target_folder, callback, progress_callback=None, use_library_snapshot=None):
+        """查重；use_library_snapshot=True 且提供缓存目录时对比本地媒体库快照，不必每次下载完整列表。
+
+        use_library_snapshot 为 None 时取配置 media_server.use_library_snapshot。
+        """
+        if use_library_snapshot is None:
+            use_library_snapshot = self.use_library_snapshot
+
         def run_check():
             total_items = 0
             duplicate_items = 0
@@ -1190,51 +2370,74 @@ class MediaServerClient:
             new_items_info = []
             duplicate_items_info = []
             self.logger.info(f"连接emby服务器 : {self.server_url} ......")
-            all_movies = self.get_all_media()
+            if use_library_snapshot and self.cache_dir:
+                all_movies = self._library_media_for_duplicates()
+            else:
+                if use_library_snapshot:
+                    self.logger.warning("未配置缓存目录，无法使用本地媒体库快照，改为从服务器读取")
+                all_movies = self.get_all_media()
             if not all_movies:
                 self.logger.info("Emby库里没有影剧")
                 return
             self.logger.info(f"已连接服务器数据库，数据库共 {len(all_movies)} 部影剧")
+            provider_index = ProviderIdIndex.build(all_movies)
+            self.logger.info(
+                "Provider ID 索引: "
+                + "，".join(f"{provider} {count} 个" for provider, count in provider_index.counts().items())
+            )
 
-            self.logger.info("开始查询...")
-            # 遍历指定路径下的所有子目录和文件
-            for root, dirs, files in os.walk(target_folder):
-                for file in files:
-                    if file.endswith('.nfo'):
-                        nfo_path = os.path.join(root, file)
-                        query_emdb_value, is_demaged_nfo = self.extract_tmdbid_from_nfo(nfo_path)
-                        if query_emdb_value is not None:
-                            total_items += 1
-
-                            if is_demaged_nfo:
-                                nfo_log = "NFO文件破损"
-                            else:
-                                nfo_log = "NFO校验通过"
-
-                            if not self.query_movies_by_tmdbid(all_movies, query_emdb_value):
-                                self.logger.info(f"{nfo_log}, 发现新影剧 : {nfo_path} ")
-                                self.logger.info(f"{nfo_log}, 新影剧路径 : {os.path.dirname(nfo_path)}")
-                                self.logger.info(f"{nfo_log}, 新影剧名 :   {os.path.basename(nfo_path)}")
-                                new_items_info.append(f"{nfo_log}, 新影剧  : {nfo_path}")
-                            else:
-                                duplicate_items += 1
-                                self.logger.info(f"{nfo_log}, 发现重复影剧:  {nfo_path}")
-                                self.logger.info(f"{nfo_log}, 重复影剧路径 : {os.path.dirname(nfo_path)}")
-                                self.logger.info(f"{nfo_log}, 重复影剧名 :   {os.path.basename(nfo_path)}")
-                                duplicate_items_info.append(f"{nfo_log}, 重复影剧 : {nfo_path}")
-                                if self.delete_nfo:
-                                    os.remove(nfo_path)
-                                    self.logger.info(f"{nfo_log}, 删除重复影剧nfo : {nfo_path}")
-                                if self.delete_nfo_folder:
-                                    folder_path = os.path.dirname(nfo_path)
-                                    shutil.rmtree(folder_path)
-                                    self.logger.info(f"{nfo_log}, 删除重复影剧所在的文件夹 : {folder_path}")
+            self.logger.info(f"开始查询...（NFO 读取线程 {self.nfo_scan_workers} 个）")
+            pipeline = NfoScanPipeline(
+                target_folder,
+                self.extract_nfo_ids,
+                workers=self.nfo_scan_workers,
+                stop_flag=self.stop_flag,
+            )
+            # 读取线程仍在读取同目录的其他 NFO，删除推迟到全部读取完成后执行
+            pending_deletions = []
+            seen_nfo_paths = set()
+            for nfo_path, (query_ids, is_demaged_nfo, media_type) in pipeline:
+                seen_nfo_paths.add(os.path.abspath(nfo_path))
+                self._report_nfo_scan_progress(progress_callback, pipeline, total_items, duplicate_items)
+                if not query_ids:
+                    continue
+                total_items += 1
 
+                if is_demaged_nfo:
+                    nfo_log = "NFO文件破损"
+                else:
+                    nfo_log = "NFO校验通过"
+
+                # 按 NFO 根元素限定类型，避免影片与剧集（或单集）因编号相同而误判为重复
+                match = provider_index.match(query_ids, media_type)
+                if not match:
+                    self.logger.info(f"{nfo_log}, 发现新影剧 : {nfo_path} ")
+                    self.logger.info(f"{nfo_log}, 新影剧路径 : {os.path.dirname(nfo_path)}")
+                    self.logger.info(f"{nfo_log}, 新影剧名 :   {os.path.basename(nfo_path)}")
+                    new_items_info.append(f"{nfo_log}, 新影剧  : {nfo_path}")
+                    continue
+
+                duplicate_items += 1
+                matched_provider, matched_value, _matched_items = match
+                self.logger.info(f"{nfo_log}, 发现重复影剧:  {nfo_path}（{matched_provider} 匹配 {matched_value}）")
+                self.logger.info(f"{nfo_log}, 重复影剧路径 : {os.path.dirname(nfo_path)}")
+                self.logger.info(f"{nfo_log}, 重复影剧名 :   {os.path.basename(nfo_path)}")
+                duplicate_items_info.append(f"{nfo_log}, 重复影剧 : {nfo_path}（{matched_provider} 匹配）")
+                if self.delete_nfo or self.delete_nfo_folder:
+                    pending_deletions.append((nfo_log, nfo_path))
+
+            stopped = self.stop_flag.is_set()
+            self._delete_duplicate_items(pending_deletions)
+            self._report_nfo_scan_progress(progress_callback, pipeline, total_items, duplicate_items, final=True)
+            self._log_nfo_index_stats(target_folder, seen_nfo_paths, prune=not stopped)
+            # 并发读取按完成顺序返回，汇总按路径排序保证结果稳定
+            new_items_info.sort()
+            duplicate_items_info.sort()
             end_time = time.time()
             total_time = end_time - start_time
             message = (
                 "\n"
-                "====================完成影剧查重==================\n"
+                f"===================={'已停止影剧查重' if stopped else '完成影剧查重'}==================\n"
                 "====================查重结果汇总==================\n"
                 "====================新影剧==================\n" + "\n".join(new_items_info) + "\n"
                 "====================重复影剧==================\n" + "\n".join(duplicate_items_info) + "\n"
@@ -1248,13 +2451,41 @@ class MediaServerClient:
 
         return self._start_background_task(run_check, "影剧查重")
 
+    def _delete_duplicate_items(self, duplicates):
+        """按路径顺序删除重复影剧的 NFO 或所在目录；同一目录只删除一次。"""
+        removed_folders = set()
+        for nfo_log, nfo_path in sorted(duplicates, key=lambda duplicate: duplicate[1]):
+            folder_path = os.path.dirname(nfo_path)
+            # 同一目录下的其他 NFO 已随目录一起删除
+            if folder_path in removed_folders:
+                continue
+            try:
+                if self.delete_nfo:
+                    os.remove(nfo_path)
+                    self.logger.info(f"{nfo_log}, 删除重复影剧nfo : {nfo_path}")
+                if self.delete_nfo_folder:
+                    shutil.rmtree(folder_path)
+                    removed_folders.add(folder_path)
+                    self.logger.info(f"{nfo_log}, 删除重复影剧所在的文件夹 : {folder_path}")
+            except OSError as e:
+                self.logger.error(f"删除重复影剧失败: {nfo_path}，错误信息: {e}")
+
     # 获取所有影剧的信息
     def get_all_media(self):
-        return self._get_items("Movie,Series", "ProviderIds,Path")
+        # 查重只比对 ProviderIds
+        return self._get_items("Movie,Series", "ProviderIds")
 
     # 获取所有影剧的信息
     def get_movie_media(self):
-        fields = "ProviderIds,Path,MediaSourceCount"
+        try:
+            return list(self.iter_movie_media())
+        except ItemListingError:
+            return []
+
+    def iter_movie_media(self):
+        """按页流式产出去重后的影片，供分组等单遍扫描使用。"""
+        # 合并分组只需要 ProviderIds，Jellyfin 还要用 MediaSourceCount 判断是否已合并
+        fields = "ProviderIds,MediaSourceCount"
         if self.server_type == 'jellyfin' and self.username:
             items = self._get_genre_update_items(
                 'Movie',
@@ -1262,15 +2493,14 @@ class MediaServerClient:
                     'Recursive': 'true',
                     'IncludeItemTypes': 'Movie',
                     'Fields': fields,
-                    'Limit': '1000000',
                 },
             )
-            return self._unique_items_by_id(items or [], '影片')
+            return self._iter_unique_items_by_id(items or [], '影片')
         if self.server_type == 'jellyfin':
             self.logger.warning("未配置 Jellyfin 用户名，合并版本只能使用全局条目列表")
-        return self._get_items("Movie", fields)
+        return self._iter_items("Movie", fields)
 
-    # 查询TMDb ID
+    # 查询TMDb ID；批量查重请用 ProviderIdIndex，避免每次线性扫描整个媒体库
     def query_movies_by_tmdbid(self, movies, tmdb_value):
         for movie in movies:
             tmdb_id = movie.get("ProviderIds", {}).get("Tmdb", "")
@@ -1280,43 +2510,69 @@ class MediaServerClient:
         # self.logger.info(f"没有找到与 TMDB 值 {tmdb_value} 相同的影剧。")
         return False
 
-    def extract_tmdbid_from_nfo(self, nfo_path):
+    def _nfo_id_index(self):
+        """提供缓存目录时按需打开 NFO ID 索引；打开失败时本次运行不使用索引。"""
+        if not self.cache_dir:
+            return None
+        with self._nfo_index_lock:
+            if self._nfo_index is None and not self._nfo_index_failed:
+                try:
+                    self._nfo_index = NfoIdIndex(os.path.join(self.cache_dir, 'nfo_index.sqlite3'))
+                except (OSError, sqlite3.Error) as err:
+                    self._nfo_index_failed = True
+                    self.logger.warning(f"NFO ID 索引不可用，本次逐个解析 NFO: {err}")
+            return self._nfo_index
+
+    def _close_nfo_index(self):
+        with self._nfo_index_lock:
+            index, self._nfo_index = self._nfo_index, None
+        if index is not None:
+            index.close()
+
+    def extract_nfo_ids(self, nfo_path):
+        """返回 ({provider: 值}, 是否为破损 NFO, 条目类型)；破损且没有匹配到任何 ID 时视为未破损的空结果。
+
+        条目类型取自 NFO 根元素（Movie/Series/Episode），无法判断时为 None。
+        启用 NFO ID 索引时，大小和修改时间未变的文件直接使用上次的解析结果。
+        """
+        index = self._nfo_id_index()
         try:
-            # 解析 .nfo 文件
-            tree = ET.parse(nfo_path)
-            root = tree.getroot()
-
-            # 查找名为 movie 的根元素下的一级子元素 tmdbid
-            tmdbid_element = root.find('tmdbid')
-
-            if tmdbid_element is not None:
-                query_tmdbid = tmdbid_element.text.strip()
-                # self.logger.info(f"在 '{nfo_path}' 中找到 tmdbid: {query_tmdbid}")
-                return query_tmdbid, False
-            else:
-                return None, False
-
-        except ET.ParseError as e:
-            self.logger.error(f"解析错误: 无法解析文件 '{nfo_path}'，错误信息: {e}")
-            # 异常的原因可能是xml不完整,再次尝试强制解析
-            query_tmdbid = self.force_extract_tmdbid_from_file(nfo_path)  # 修改这里，添加 self
-            if query_tmdbid is not None:
-                return query_tmdbid, True
+            if index is None:
+                ids, damaged, parse_error, media_type = extract_nfo_ids(nfo_path)
             else:
-                return None, False  # 修改这里，返回两个值
-        except Exception as e:
+                index_path = os.path.abspath(nfo_path)
+                stat_result = os.stat(index_path)
+                cached = index.get(index_path, stat_result)
+                if cached is not None:
+                    ids, damaged, media_type = cached
+                    return ids, bool(damaged and ids), media_type
+                ids, damaged, parse_error, media_type = extract_nfo_ids(nfo_path)
+                index.put(index_path, stat_result, ids, damaged, media_type)
+        except OSError as e:
             self.logger.error(f"发生错误: 在处理文件 '{nfo_path}' 时出错，错误信息: {e}")
-            return None, False  # 确保总是返回两个值
+            return {}, False, None
+        if not damaged:
+            return ids, False, media_type
+        self.logger.error(f"解析错误: 无法解析文件 '{nfo_path}'，错误信息: {parse_error}")
+        if not ids:
+            self.logger.error("No matching tmdbid found.")
+            return {}, False, media_type
+        self.logger.info(f"{os.path.basename(nfo_path)} Found ids: {ids}")
+        return ids, True, media_type
 
-    def force_extract_tmdbid_from_file(self, file_path):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
+    def extract_tmdbid_from_nfo(self, nfo_path):
+        ids, is_damaged, _media_type = self.extract_nfo_ids(nfo_path)
+        tmdbid = ids.get('Tmdb')
+        if tmdbid is None:
+            return None, False
+        return tmdbid, is_damaged
 
-        for i, line in enumerate(lines):
-            match = re.search(r'^  <tmdbid>(\d+)<', line)  # <tmdbid>前面要有两个空格
-            if match:
-                self.logger.info(f"{os.path.basename(file_path)} Found tmdbid: {match.group(1)}")
-                return match.group(1)  # or do whatever you need with the extracted value
+    def force_extract_tmdbid_from_file(self, file_path):
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+            tmdbid = tolerant_extract_ids(file.read()).get('Tmdb')
+        if tmdbid is not None:
+            self.logger.info(f"{os.path.basename(file_path)} Found tmdbid: {tmdbid}")
+            return tmdbid
 
         self.logger.error("No matching tmdbid found.")
         return None
@@ -1333,6 +2589,7 @@ class MediaServerClient:
         return ""
 
     def group_movies_by_provider_id(self, movies, provider_key):
+        """单遍分组；movies 可以是分页条目流，只保留带该 provider 值的影片。"""
         grouped_movies = {}
         for movie in movies:
             provider_value = self._get_provider_id(movie, provider_key)
@@ -1350,15 +2607,26 @@ class MediaServerClient:
         media_source_count = movie.get('MediaSourceCount')
         return media_source_count in (None, 0, 1, '0', '1')
 
-    def _select_actionable_merge_groups(self, grouped_movies, successfully_merged_ids=None):
+    @staticmethod
+    def _merge_identity(identity_label, identity_value):
+        # identity_label 为 None 时分组键本身就是完整标识（聚类结果形如 'TMDB:603'）
+        if identity_label is None:
+            return identity_value
+        return MergeLedger.identity(identity_label, identity_value)
+
+    def _select_actionable_merge_groups(self, grouped_movies, successfully_merged_ids=None, identity_label="TMDB"):
         successfully_merged_ids = successfully_merged_ids or set()
         actionable_groups = {}
+        ledger = self._merge_ledger
 
         for identity_value, movies in grouped_movies.items():
             if len(movies) <= 1:
                 continue
 
             movie_ids = {movie.get('Id') for movie in movies if movie.get('Id')}
+            # 以前运行已合并且成员没有增加的分组直接跳过
+            if ledger is not None and ledger.is_merged(self._merge_identity(identity_label, identity_value), movie_ids):
+                continue
             if self.server_type != 'jellyfin':
                 if not movie_ids or movie_ids.issubset(successfully_merged_ids):
                     continue
@@ -1432,12 +2700,25 @@ class MediaServerClient:
     def group_movies_by_tmdbid(self, movies):
         return self.group_movies_by_provider_id(movies, "tmdb")
 
+    def _ensure_user_id(self):
+        # 并发读取详情时只查询一次用户 ID
+        if self.user_id:
+            return self.user_id
+        with self._user_id_lock:
+            if not self.user_id:
+                cached_user_id = self._cached_server_info().get('user_id') if self.username else None
+                if cached_user_id:
+                    self.user_id = cached_user_id
+                else:
+                    self.user_id = self.emby_get_user_id()
+                    if self.user_id and self.username:
+                        self._update_server_cache(user_id=self.user_id)
+        return self.user_id
+
     def emby_get_user_id(self):
         params = {"api_key": self.api_key}
         if self.server_type == 'emby':
-            response = requests.get(
-                f'{self.server_url}/Users/Public', headers=self._auth_headers(), params=params, timeout=30
-            )
+            response = self._request('get', '/Users/Public', params=params, prefix='')
         else:
             response = self._request('get', '/Users', params=params)
         if response.status_code == 200:
@@ -1533,43 +2814,53 @@ class MediaServerClient:
         merged_movies = []
         if progress_total is None:
             progress_total = self._count_mergeable_groups(grouped_movies)
+        candidates = [(identity_value, movies) for identity_value, movies in grouped_movies.items() if len(movies) > 1]
+        label = identity_label or "关联 ID"
+
+        def post_merge(candidate):
+            _identity_value, movies = candidate
+            payload = {
+                ids_key: ",".join(movie["Id"] for movie in movies),
+                "api_key": self.api_key,
+            }
+            # 单个分组的请求异常只记为该组失败，其余分组继续合并，已成功的分组仍写入合并记录
+            try:
+                return self._request('post', '/Videos/MergeVersions', params=payload)
+            except requests.exceptions.RequestException as err:
+                return RequestFailureResponse(err)
 
+        # 合并请求由线程池并发提交（上限为 concurrency），结果按分组顺序在当前线程记录
         processed = 0
-        for identity_value, movies in grouped_movies.items():
-            if self.stop_flag.is_set():
-                self.logger.info("合并版本操作已停止")
-                break
-
-            if len(movies) > 1:
-                name = movies[0]["Name"]
-                self.logger.info("")
-                self.logger.info(f"发现相同 {identity_label} 影片：{identity_value}")
-                self.logger.info(f"已发现相同版本的影片::: {name}")
-
-                item_ids = ",".join(movie["Id"] for movie in movies)
-                payload = {
-                    ids_key: item_ids,
-                    "api_key": self.api_key,
-                }
-                response = self._request('post', '/Videos/MergeVersions', params=payload)
-                if response.status_code == 204:
-                    self.logger.info(f"{server_label} 合并版本成功:::         {name}")
-                    merged_movies.append(movies[0])
-                    if successfully_merged_ids is not None:
-                        successfully_merged_ids.update(
-                            movie.get('Id') for movie in movies if movie.get('Id')
-                        )
-                else:
-                    self.logger.error(f"{server_label} 合并版本失败:::         {name}")
-                    self.logger.error(response.text)
-                processed += 1
-                if progress_total > 0:
-                    self._report_progress(
-                        progress_callback,
-                        progress_base + processed,
-                        progress_base + progress_total,
-                        f"{identity_label} 已合并: {processed}/{progress_total}（{server_label}）",
+        for _index, (identity_value, movies), response in self._iter_pipelined(
+            candidates, post_merge, threading.Event()
+        ):
+            name = movies[0]["Name"]
+            self.logger.info("")
+            self.logger.info(f"发现相同 {label} 影片：{identity_value}")
+            self.logger.info(f"已发现相同版本的影片::: {name}")
+            movie_ids = [movie.get('Id') for movie in movies if movie.get('Id')]
+            if response.status_code == 204:
+                self.logger.info(f"{server_label} 合并版本成功:::         {name}")
+                merged_movies.append(movies[0])
+                if successfully_merged_ids is not None:
+                    successfully_merged_ids.update(movie_ids)
+                if self._merge_ledger is not None:
+                    self._merge_ledger.record(
+                        self._merge_identity(identity_label, identity_value), movie_ids, time.time()
                     )
+            else:
+                self.logger.error(f"{server_label} 合并版本失败:::         {name}")
+                self.logger.error(response.text)
+            processed += 1
+            if progress_total > 0:
+                self._report_progress(
+                    progress_callback,
+                    progress_base + processed,
+                    progress_base + progress_total,
+                    f"{label} 已合并: {processed}/{progress_total}（{server_label}）",
+                )
+        if self.stop_flag.is_set():
+            self.logger.info("合并版本操作已停止")
         return merged_movies
 
     def merge_versions(self, callback):
@@ -1584,8 +2875,32 @@ class MediaServerClient:
     def jellyfin_merge_versions(self, callback):
         return self._merge_versions(callback, "Jellyfin")
 
+    def _load_merge_ledger(self):
+        if not self.cache_dir:
+            return None
+        ledger = MergeLedger.for_server(self.cache_dir, self._sync_server_key())
+        if ledger.load():
+            self.logger.info(f"已读取合并记录，共 {len(ledger.entries)} 个已合并分组")
+        return ledger
+
+    def _save_merge_ledger(self):
+        ledger, self._merge_ledger = self._merge_ledger, None
+        if ledger is None:
+            return
+        try:
+            ledger.save()
+        except OSError as e:
+            self.logger.warning(f"保存合并记录失败: {e}")
+
     def _merge_versions(self, callback, server_label):
         def run_merge_versions_check():
+            self._merge_ledger = self._load_merge_ledger()
+            try:
+                return merge_versions_with_ledger()
+            finally:
+                self._save_merge_ledger()
+
+        def merge_versions_with_ledger():
             self.logger.info(f"开始使用 {server_label} 流程合并版本")
             all_movies = self.get_movie_media()  # 只需要合并电影，TV Emby会自动合并
             if not all_movies:
@@ -1593,58 +2908,33 @@ class MediaServerClient:
                 return
             self.logger.info(f"已连接服务器数据库，数据库共 {len(all_movies)} 部影片")
 
-            self.logger.info("开始按 TMDB 合并标准影片版本")
-            all_tmdb_groups = self.group_movies_by_tmdbid(all_movies)
-            tmdb_repeated_count = self._count_mergeable_groups(all_tmdb_groups)
-            successfully_merged_ids = set()
-            tmdb_grouped_movies = self._select_actionable_merge_groups(all_tmdb_groups)
-            tmdb_mergeable_count = self._count_mergeable_groups(tmdb_grouped_movies)
-            self.logger.info(f"已分组影片，共 {len(all_tmdb_groups)} 个TMDb ID")
+            providers_text = "/".join(provider_label(provider) for provider in self.merge_providers)
+            self.logger.info(f"开始按 {providers_text} 关联聚类影片版本")
+            all_clusters = cluster_movies(all_movies, self.merge_providers)
+            grouped_movies = self._select_actionable_merge_groups(all_clusters, identity_label=None)
+            mergeable_count = len(grouped_movies)
+            size_stats = cluster_size_stats(all_clusters)
             self.logger.info(
-                f"TMDB 重复分组：{tmdb_repeated_count} 组，"
-                f"排除已合并历史组后待处理：{tmdb_mergeable_count} 组"
+                f"重复分组：{len(all_clusters)} 组，"
+                f"排除已合并历史组后待处理：{mergeable_count} 组"
             )
+            if size_stats:
+                stats_text = "，".join(f"{size} 部 × {count}" for size, count in size_stats.items())
+                self.logger.info(f"分组大小分布：{stats_text}（最大 {max(size_stats)} 部）")
+
             merged_movies = self.merge_movie_versions(
-                tmdb_grouped_movies,
-                identity_label="TMDB",
+                grouped_movies,
+                identity_label=None,
                 progress_callback=callback,
                 progress_base=0,
-                progress_total=tmdb_mergeable_count,
-                successfully_merged_ids=successfully_merged_ids,
+                progress_total=mergeable_count,
             )
             if self.stop_flag.is_set():
                 self.logger.info("已停止合并版本")
                 if callback:
                     callback(merged_movies)
                 return merged_movies
-            self.logger.info(f"TMDB 已合并版本，共 {len(merged_movies)} 部影片")
-
-            self.logger.info("开始检查 AV 番号版本")
-            all_av_groups = self.group_movies_by_provider_id(all_movies, "num")
-            if not all_av_groups:
-                self.logger.info("未发现 AV 番号数据，跳过 AV 合并")
-            else:
-                av_repeated_count = self._count_mergeable_groups(all_av_groups)
-                av_grouped_movies = self._select_actionable_merge_groups(
-                    all_av_groups,
-                    successfully_merged_ids=successfully_merged_ids,
-                )
-                av_mergeable_count = self._count_mergeable_groups(av_grouped_movies)
-                self.logger.info(f"已分组影片，共 {len(all_av_groups)} 个 AV 番号")
-                self.logger.info(
-                    f"AV 番号重复分组：{av_repeated_count} 组，"
-                    f"排除已合并历史组和本轮已处理条目后待处理：{av_mergeable_count} 组"
-                )
-                av_merged_movies = self.merge_movie_versions(
-                    av_grouped_movies,
-                    identity_label="AV 番号",
-                    progress_callback=callback,
-                    progress_base=tmdb_mergeable_count,
-                    progress_total=av_mergeable_count,
-                    successfully_merged_ids=successfully_merged_ids,
-                )
-                self.logger.info(f"AV 番号已合并版本，共 {len(av_merged_movies)} 部影片")
-                merged_movies.extend(av_merged_movies)
+            self.logger.info(f"已合并版本，共 {len(merged_movies)} 组影片")
 
             self._report_progress(callback, 1, 1, "合并版本处理完成")
             if callback:
@@ -1660,17 +2950,17 @@ class MediaServerClient:
         return self.emby_get_item_info(movie_id)
 
     def emby_get_item_info(self, movie_id):
-        headers = {'X-Emby-Token': self.api_key, 'Content-Type': 'application/json'}
-
-        self.user_id = self.user_id or self.emby_get_user_id()
+        self._ensure_user_id()
         if not self.user_id:
             self.logger.error("Failed to retrieve user ID.")
             return None
 
-        detail_item_endpoint = self._api_url(
-            f"/Users/{self.user_id}/Items/{urllib.parse.quote(str(movie_id), safe='')}", ''
+        detail_item_response = self._request(
+            'get',
+            f"/Users/{self.user_id}/Items/{urllib.parse.quote(str(movie_id), safe='')}",
+            timeout=(5, 30),
+            prefix='',
         )
-        detail_item_response = requests.get(detail_item_endpoint, headers=headers, timeout=(5, 30))
 
         if detail_item_response.status_code == 200:
             return detail_item_response.json()
@@ -1682,7 +2972,7 @@ class MediaServerClient:
             return None
 
     def jellyfin_get_item_info(self, movie_id):
-        self.user_id = self.user_id or self.emby_get_user_id()
+        self._ensure_user_id()
         if not self.user_id:
             self.logger.error("Failed to retrieve user ID.")
             return None
@@ -1722,7 +3012,7 @@ class MediaServerClient:
         return self._translate_items_genres_and_update(
             "剧集",
             'Series',
-            TV_GENRE_TRANSLATIONS,
+            self._translation_map('series'),
             progress_callback=progress_callback,
         )
 
@@ -1735,7 +3025,7 @@ class MediaServerClient:
         return self._translate_items_genres_and_update(
             "影片",
             'Movie',
-            MOVIE_GENRE_TRANSLATIONS,
+            self._translation_map('movies'),
             progress_callback=progress_callback,
         )
 
@@ -1755,76 +3045,47 @@ class MediaServerClient:
 
     # 列出库中所有的影片流派
     def emby_get_all_movie_genres(self):
-        # Set query parameters
-        params = {
-            'Recursive': 'true',
-            'IncludeItemTypes': 'Movie',
-            'Fields': 'Genres',  # Request to include the Genres field
-            'Limit': '1000000',  # Adjust the limit according to your needs
-        }
-
-        # Send request to get the list of movies
-        response = self._request('get', '/Items', params=params)
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            movies = response.json()['Items']
-            # Use a set to remove duplicate genres
-            all_genres = set()
-
-            for movie in movies:
-                movie_name = movie['Name']
+        all_genres = set()
+        try:
+            for movie in self._item_pager(
+                '/Items',
+                {'Recursive': 'true', 'IncludeItemTypes': 'Movie', 'Fields': 'Genres'},
+                "读取影片流派列表",
+            ):
                 genres = movie.get('Genres', [])
                 if genres:
-                    # Add genres to the set
                     all_genres.update(genres)
                 else:
-                    self.logger.info(f"Movie '{movie_name}' has no specified genres.")
+                    self.logger.info(f"Movie '{movie.get('Name')}' has no specified genres.")
+        except ItemListingError:
+            return
 
-            # debug_function all unique genres
-            self.logger.info("All unique genres:")
-            self.logger.info(', '.join(sorted(all_genres)))
-        else:
-            self.logger.info(f"Request failed, status code: {response.status_code}")
-            self.logger.info(response.text)
+        self.logger.info("All unique genres:")
+        self.logger.info(', '.join(sorted(all_genres)))
 
     # 列出库中所有的电视剧集流派
     def emby_get_all_tv_genres(self):
-        # Set query parameters
-        params = {
-            'Recursive': 'true',
-            'IncludeItemTypes': 'Series',
-            'Fields': 'Genres',  # Request to include the Genres field
-            'Limit': '1000000',  # Adjust the limit according to your needs 后续解析"TotalRecordCount":1812字段
-        }
-
-        # Send request to get the list of movies
-        response = self._request('get', '/Items', params=params)
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            tvs = response.json()['Items']
-            # Use a set to remove duplicate genres
-            all_genres = set()
-
-            for tv in tvs:
-                tv_name = tv['Name']
+        all_genres = set()
+        try:
+            for tv in self._item_pager(
+                '/Items',
+                {'Recursive': 'true', 'IncludeItemTypes': 'Series', 'Fields': 'Genres'},
+                "读取剧集流派列表",
+            ):
+                tv_name = tv.get('Name')
                 genres = tv.get('Genres', [])
                 if genres:
-                    # Add genres to the set
                     all_genres.update(genres)
                     self.logger.info(f"tv: {tv_name}")
                     self.logger.info(f"tv: {', '.join(genres)}")
                     self.logger.info('-' * 30)
                 else:
                     self.logger.info(f"tv '{tv_name}' has no specified genres.")
+        except ItemListingError:
+            return
 
-            # self.logger.info all unique genres
-            self.logger.info("All unique genres:")
-            self.logger.info(', '.join(sorted(all_genres)))
-        else:
-            self.logger.error(f"Request failed, status code: {response.status_code}")
-            self.logger.error(response.text)
+        self.logger.info("All unique genres:")
+        self.logger.info(', '.join(sorted(all_genres)))
 
     def update_genres(self, callback=None, full_scan=False, sync_state=None, state_callback=None):
         self.validate_server_type()
@@ -1832,11 +3093,12 @@ class MediaServerClient:
         def run_update_genres_check():
             self._begin_metadata_sync(
                 {
-                    'movies': MOVIE_GENRE_TRANSLATIONS,
-                    'series': TV_GENRE_TRANSLATIONS,
+                    'movies': self._translation_map('movies'),
+                    'series': self._translation_map('series'),
                 },
                 full_scan=full_scan,
                 sync_state=sync_state,
+                snapshot_kind='genre',
             )
             self.logger.info(f"开始使用 {self._server_label()} 流程更新流派")
             self.logger.info("开始更新影片流派信息...")
@@ -1885,9 +3147,10 @@ class MediaServerClient:
 
         def run_update_countries_check():
             self._begin_metadata_sync(
-                COUNTRY_TRANSLATIONS,
+                self._translation_map('countries'),
                 full_scan=full_scan,
                 sync_state=sync_state,
+                snapshot_kind='country',
             )
             self.logger.info(f"开始使用 {self._server_label()} 流程更新地区")
             self.logger.info("开始更新影片地区信息...")
@@ -1931,6 +3194,161 @@ class MediaServerClient:
 
         return self._start_background_task(run_update_countries_check, "更新地区")
 
+    def _metadata_translation_maps(self):
+        return {
+            'movies': self._translation_map('movies'),
+            'series': self._translation_map('series'),
+            'countries': self._translation_map('countries'),
+        }
+
+    def update_metadata(self, callback=None, full_scan=False, sync_state=None, state_callback=None):
+        """流派和地区合并更新；增量基线同时覆盖两张翻译表，任一表变化都会触发完整扫描。"""
+        self.validate_server_type()
+
+        def run_update_metadata_check():
+            self._begin_metadata_sync(
+                self._metadata_translation_maps(),
+                full_scan=full_scan,
+                sync_state=sync_state,
+                snapshot_kind='metadata',
+            )
+            self.logger.info(f"开始使用 {self._server_label()} 流程更新流派和地区")
+            self.logger.info("开始更新影片流派和地区信息...")
+            movie_callback = self._scale_progress_callback(callback, 0, 50)
+            series_callback = self._scale_progress_callback(callback, 50, 50)
+
+            updated_movies = self._translate_items_metadata_and_update(
+                "影片",
+                'Movie',
+                self._translation_map('movies'),
+                progress_callback=movie_callback,
+            )
+            stopped = self.stop_flag.is_set()
+            if stopped:
+                self.logger.info("已停止更新影片流派和地区信息")
+                updated_series = []
+            else:
+                self.logger.info("完成更新影片流派和地区信息")
+                self.logger.info("开始更新剧集流派和地区信息...")
+                updated_series = self._translate_items_metadata_and_update(
+                    "剧集",
+                    'Series',
+                    self._translation_map('series'),
+                    progress_callback=series_callback,
+                )
+                stopped = self.stop_flag.is_set()
+                if stopped:
+                    self.logger.info("已停止更新剧集流派和地区信息")
+                else:
+                    self.logger.info("完成更新剧集流派和地区信息")
+
+            movies_message = self._format_updated_items_message("影片", updated_movies)
+            series_message = self._format_updated_items_message("剧集", updated_series)
+            title = "已停止更新流派和地区" if stopped else "完成更新所有影剧流派和地区"
+            message = (
+                f"\n"
+                f"----------------------------------------\n"
+                f"{title}\n"
+                f"{movies_message}"
+                f"{series_message}"
+                f"----------------------------------------\n"
+            )
+            self.logger.info(message)
+            self._report_progress(callback, 1, 1, title, percent=100)
+            self._finish_metadata_sync(state_callback)
+            return message
+
+        return self._start_background_task(run_update_metadata_check, "更新流派和地区")
+
+    def plan_metadata_update(self, plan_path, callback=None):
+        """只预扫描不提交：把流派和地区的变更写入计划文件，稍后由 apply_metadata_plan 执行。"""
+        self.validate_server_type()
+
+        def run_plan_metadata_update():
+            self._sync_had_errors = False
+            self.logger.info(f"开始生成流派和地区更新计划: {plan_path}")
+            entries = []
+            for item_label, include_item_types, genres_map, start_percent in (
+                ("影片", 'Movie', self._translation_map('movies'), 0),
+                ("剧集", 'Series', self._translation_map('series'), 50),
+            ):
+                type_entries = self._plan_metadata_entries(
+                    item_label,
+                    include_item_types,
+                    genres_map,
+                    progress_callback=self._scale_progress_callback(callback, start_percent, 50),
+                )
+                if type_entries is None or self._sync_had_errors:
+                    title = "已停止生成更新计划" if self.stop_flag.is_set() else "生成更新计划失败"
+                    self.logger.info(f"{title}，保留原有计划文件")
+                    self._report_progress(callback, 1, 1, title, percent=100)
+                    return None
+                entries.extend(type_entries)
+
+            header = {
+                'kind': 'metadata',
+                'server_key': self._sync_server_key(),
+                'map_hash': self._stable_mapping_hash(self._metadata_translation_maps()),
+                'created_utc': self._iso_utc_now(),
+            }
+            try:
+                count = UpdatePlan(plan_path).write(header, entries)
+            except OSError as err:
+                self.logger.error(f"写入更新计划失败: {err}")
+                return None
+            title = f"更新计划已生成，共 {count} 个条目"
+            self.logger.info(f"{title}: {plan_path}")
+            self._report_progress(callback, 1, 1, title, percent=100)
+            return count
+
+        return self._start_background_task(run_plan_metadata_update, "生成更新计划")
+
+    def apply_metadata_plan(self, plan_path, callback=None, shard_index=0, shard_count=1):
+        """执行更新计划；检查点中已完成的条目会跳过，shard_count > 1 时只执行第 shard_index 个分片。"""
+        self.validate_server_type()
+        shard_count = max(1, int(shard_count))
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"分片序号 {shard_index} 超出范围 0..{shard_count - 1}")
+
+        def run_apply_metadata_plan():
+            plan = UpdatePlan(plan_path)
+            try:
+                header = plan.read_header()
+                if header.get('server_key') != self._sync_server_key():
+                    self.logger.error("更新计划不是为当前服务器和用户生成的，拒绝执行")
+                    return None
+                if header.get('map_hash') != self._stable_mapping_hash(self._metadata_translation_maps()):
+                    self.logger.warning("翻译表在生成计划后已变化，仍按计划中的结果执行")
+                done = plan.completed()
+                entries = [
+                    entry
+                    for entry in plan.iter_entries(shard_index, shard_count)
+                    if entry.get('Id') and entry['Id'] not in done
+                ]
+            except UpdatePlanError as err:
+                self.logger.error(str(err))
+                return None
+
+            shard_label = f"分片 {shard_index + 1}/{shard_count}，" if shard_count > 1 else ""
+            self.logger.info(
+                f"开始执行更新计划: {shard_label}检查点已完成 {len(done)} 个，本次待处理 {len(entries)} 个"
+            )
+            try:
+                counts = self._apply_plan_entries(plan, entries, callback)
+            finally:
+                plan.close()
+
+            remaining = len(entries) - counts['applied'] - counts['already'] - counts['conflict']
+            title = "已停止执行更新计划" if self.stop_flag.is_set() else "更新计划执行结束"
+            self.logger.info(
+                f"{title}: 已更新 {counts['applied']} 个，已是目标值 {counts['already']} 个，"
+                f"冲突跳过 {counts['conflict']} 个，失败 {counts['failed']} 个，剩余 {remaining} 个"
+            )
+            self._report_progress(callback, 1, 1, title, percent=100)
+            return counts
+
+        return self._start_background_task(run_apply_metadata_plan, "执行更新计划")
+
     def clear_files_by_type(self, folder_path, file_type='VIDEO', callback=None):
         def run_clear_files_by_type_check():
             video_files = []
@@ -1980,10 +3398,14 @@ class MediaServerClient:
 
         return self._start_background_task(run_clear_files_by_type_check, "删除视频文件")
 
-    def check_metadata_integrity(self, folder_path, callback=None):
+    def check_metadata_integrity(self, folder_path, callback=None, dir_snapshot=None, force_full_rescan=False):
+        """dir_snapshot 为目录快照文件路径，只重新读取修改时间变化的目录；force_full_rescan 时全部重新读取。"""
         def run_check_metadata_integrity_check():
+            # 只遍历一次目录，视频检查和 NFO 检查共用同一份索引
+            index = self._integrity_index(folder_path, dir_snapshot=dir_snapshot, force_full_rescan=force_full_rescan)
             video_check_result = self.check_video_files(
                 folder_path,
+                index=index,
                 progress_callback=(
                     lambda payload: callback(
                         {'stage': '视频检查', **payload, 'message': f"[视频检查] {payload.get('message', payload)}"}
@@ -2000,6 +3422,7 @@ class MediaServerClient:
 
             nfo_check_result = self.check_nfo_files(
                 folder_path,
+                index=index,
                 progress_callback=(
                     lambda payload: callback(
                         {'stage': 'NFO检查', **payload, 'message': f"[NFO检查] {payload.get('message', payload)}"}
@@ -2051,43 +3474,56 @@ class MediaServerClient:
 
         return None
 
-    def check_nfo_files(self, folder_path, progress_callback=None):
+    def _integrity_index(self, folder_path, index=None, dir_snapshot=None, force_full_rescan=False):
+        if index is not None:
+            return index
+        snapshot = open_dir_snapshot(dir_snapshot, self.logger.warning)
+        try:
+            # 目录读取与查重读取 NFO 一样受云盘延迟影响，共用 nfo_scan_workers
+            index = StemIndex.scan(
+                folder_path,
+                self.stop_flag,
+                workers=self.nfo_scan_workers,
+                snapshot=snapshot,
+                force_full=force_full_rescan,
+            )
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        self.logger.info(f"已索引 {index.scanned_dirs} 个目录")
+        if index.snapshot_report:
+            self.logger.info(index.snapshot_report)
+        return index
+
+    def check_nfo_files(self, folder_path, progress_callback=None, index=None):
         """
         遍历给定文件夹中的所有 .nfo 文件，并检查对应的同名视频文件。
 
         :param folder_path: 要检查的文件夹路径
+        :param index: 已建立的目录索引（StemIndex），为 None 时重新扫描
         :return: 汇总查询结果的字典
         """
         # 初始化结果汇总
         results = {'total_nfo': 0, 'no_video_nfo': [], 'found_video_nfo': []}
 
-        nfo_files = [path for path in Path(folder_path).rglob('*.nfo')]
-        filtered_nfo_files = [
-            path
-            for path in nfo_files
-            if os.path.basename(str(path)) not in ('tvshow.nfo', 'season.nfo') and os.path.isfile(str(path))
-        ]
+        nfo_files = list(self._integrity_index(folder_path, index).nfo_files(VIDEO_EXTENSIONS))
 
         if progress_callback:
             self._report_progress(
                 progress_callback,
                 0,
-                len(filtered_nfo_files),
-                f"开始扫描 NFO 文件：共 {len(filtered_nfo_files)} 个",
+                len(nfo_files),
+                f"开始扫描 NFO 文件：共 {len(nfo_files)} 个",
             )
 
-        # 使用 glob 递归查找所有的 .nfo 文件
-        for nfo_path in filtered_nfo_files:
+        # 同名视频是否存在已在索引中确定，这里不再访问文件系统
+        for nfo_str_path, has_video in nfo_files:
             if self.stop_flag.is_set():
                 self.logger.info("NFO 文件检查已停止")
                 break
 
-            nfo_str_path = str(nfo_path)
             results['total_nfo'] += 1
-
-            video_path = self.find_related_videos(nfo_str_path)
-
-            if video_path:
+            if has_video:
                 results['found_video_nfo'].append(nfo_str_path)
             else:
                 results['no_video_nfo'].append(nfo_str_path)
@@ -2095,24 +3531,17 @@ class MediaServerClient:
                 self._report_progress(
                     progress_callback,
                     results['total_nfo'],
-                    len(filtered_nfo_files),
-                    f"扫描 NFO: {results['total_nfo']}/{len(filtered_nfo_files)}",
+                    len(nfo_files),
+                    f"扫描 NFO: {results['total_nfo']}/{len(nfo_files)}",
                 )
 
         return results
 
-    def check_video_files(self, folder_path, progress_callback=None):
+    def check_video_files(self, folder_path, progress_callback=None, index=None):
         # 初始化结果汇总
         results = {'total_videos': 0, 'no_nfo_videos': [], 'found_nfo_videos': []}
 
-        all_video_files = []
-        for root, _, files in os.walk(folder_path):
-            if self.stop_flag.is_set():
-                self.logger.info("视频文件检查已停止")
-                break
-
-            video_files = [f for f in files if os.path.splitext(f)[1].lower() in VIDEO_EXTENSIONS]
-            all_video_files.extend([os.path.join(root, video_file) for video_file in video_files if os.path.isfile(os.path.join(root, video_file))])
+        all_video_files = list(self._integrity_index(folder_path, index).videos(VIDEO_EXTENSIONS))
 
         if progress_callback:
             self._report_progress(
@@ -2122,21 +3551,16 @@ class MediaServerClient:
                 f"开始扫描视频文件：共 {len(all_video_files)} 个",
             )
 
-        # 遍历指定文件夹及其子文件夹
-        for video_full_path in all_video_files:
+        for video_full_path, has_nfo in all_video_files:
             if self.stop_flag.is_set():
                 self.logger.info("视频文件检查已停止")
                 break
 
             results['total_videos'] += 1
-            base_name, _ = os.path.splitext(os.path.basename(video_full_path))
-            nfo_file = base_name + '.nfo'
-            nfo_full_path = os.path.join(os.path.dirname(video_full_path), nfo_file)
-
-            if not os.path.exists(nfo_full_path):
-                results['no_nfo_videos'].append(video_full_path)
-            else:
+            if has_nfo:
                 results['found_nfo_videos'].append(video_full_path)
+            else:
+                results['no_nfo_videos'].append(video_full_path)
 
             if progress_callback:
                 self._report_progress(
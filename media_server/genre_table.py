@@ -0,0 +1,147 @@
+"""
+流派翻译表预编译：把翻译链（如 纪录 -> 纪录片）展开成一张扁平的解析结果表，
+并把规范化后的键折叠进去，运行时每个流派只需一次字典查询。
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CompiledGenreTable:
+    """预编译后的流派翻译表。
+
+    resolved 以清理后的原始流派为键（翻译表的键和所有目标值都会预先解析）；
+    folded 以规范化查找名为键，用于大小写、全半角、空白不同的写法。
+    report 记录编译过程中发现的循环和冲突条目。
+    """
+
+    def __init__(self, resolved, folded, report, clean, normalize_name, normalize_lookup):
+        self.resolved = resolved
+        self.folded = folded
+        self.report = report
+        self._clean = clean
+        self._normalize_name = normalize_name
+        self._normalize_lookup = normalize_lookup
+
+    def resolve(self, genre):
+        # resolved 的键都是清理后的写法，原样命中说明无需再清理
+        translated = self.resolved.get(genre) if isinstance(genre, str) else None
+        if translated is not None:
+            return translated
+        cleaned = self._clean(genre)
+        translated = self.resolved.get(cleaned)
+        if translated is not None:
+            return translated
+        translated = self.folded.get(self._normalize_lookup(cleaned))
+        if translated is not None:
+            return translated
+        return self._normalize_name(cleaned)
+
+
+def compile_genre_map(genres_map, clean, normalize_name, normalize_lookup):
+    """按运行时同样的规则解析翻译表中每个键和目标值，生成 CompiledGenreTable。
+
+    解析规则：第一步允许精确、规范化名或规范化索引匹配，之后沿链只做精确或规范化名匹配；
+    链回到已访问过的键即视为循环，停在当前值。
+    """
+    lookup_index = {}
+    for key in genres_map:
+        lookup_index.setdefault(normalize_lookup(key), key)
+
+    def lookup_key(current, allow_normalized_index):
+        if current in genres_map:
+            return current
+        normalized = normalize_lookup(current)
+        if normalized in genres_map:
+            return normalized
+        if not allow_normalized_index:
+            return None
+        return lookup_index.get(normalized)
+
+    cycles = {}
+    chain_lengths = {}
+
+    def resolve(genre):
+        current = clean(genre)
+        seen = []
+        allow_normalized_index = True
+        while True:
+            key = lookup_key(current, allow_normalized_index)
+            if not key:
+                break
+            if key in seen:
+                cycle = seen[seen.index(key) :]
+                # 同一个环从不同入口进入时只记录一次
+                start = cycle.index(min(cycle))
+                cycles.setdefault(tuple(cycle[start:] + cycle[:start]), current)
+                break
+            seen.append(key)
+            translated = normalize_name(genres_map[key])
+            if translated == current:
+                chain_lengths[genre] = len(seen)
+                return translated
+            current = translated
+            allow_normalized_index = False
+        chain_lengths[genre] = len(seen)
+        return normalize_name(current)
+
+    resolved = {}
+    for source in list(genres_map) + [str(value) for value in genres_map.values()]:
+        cleaned = clean(source)
+        if cleaned not in resolved:
+            resolved[cleaned] = resolve(cleaned)
+
+    folded = {}
+    conflicts = []
+    for key in genres_map:
+        normalized = normalize_lookup(key)
+        target_key = normalized if normalized in genres_map else lookup_index[normalized]
+        translated = resolved[clean(target_key)]
+        if key != target_key and resolved[clean(key)] != translated:
+            conflicts.append((key, target_key, resolved[clean(key)], translated))
+        folded.setdefault(normalized, translated)
+
+    report = {
+        'keys': len(genres_map),
+        'resolved_entries': len(resolved),
+        'folded_entries': len(folded),
+        'collapsed_chains': sum(1 for length in chain_lengths.values() if length > 1),
+        'cycles': [list(cycle) for cycle in cycles],
+        # (写法, 生效的写法, 该写法自身的翻译, 规范化查找时采用的翻译)
+        'conflicts': conflicts,
+    }
+    return CompiledGenreTable(resolved, folded, report, clean, normalize_name, normalize_lookup)
+
+
+class BoundedMemo:
+    """线程安全的定长 LRU 缓存，记录命中率。"""
+
+    def __init__(self, maxsize):
+        self.maxsize = max(1, int(maxsize))
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,71 @@
+"""
+刮削完整性检查的目录索引：单遍并发遍历记录每个目录中 文件名主干 -> 扩展名集合，
+“视频缺 NFO”和“NFO 缺视频”都在内存中判断，不再对每个文件做 exists/isfile。
+"""
+
+import os
+
+from utils.parallel_walk import ParallelWalker
+
+NFO_EXTENSION = '.nfo'
+# 剧集和季的 NFO 不对应单个视频文件
+SHOW_NFO_NAMES = frozenset({'tvshow.nfo', 'season.nfo'})
+
+
+class StemIndex:
+    """directories 形如 {目录: {主干: {扩展名: 文件名}}}，目录按路径排序。
+
+    文件类型取自并发遍历的目录项，与 os.path.isfile 相同跟随符号链接：指向文件的链接按文件计入，
+    目录符号链接不计为文件也不进入，失效链接不计入，对应的视频或 NFO 按缺失报告。
+    """
+
+    def __init__(self, root_folder):
+        self.root_folder = root_folder
+        self.directories = {}
+        self.stopped = False
+        self.scanned_dirs = 0
+        self.snapshot_report = None
+
+    @classmethod
+    def scan(cls, root_folder, stop_flag=None, workers=1, snapshot=None, force_full=False):
+        index = cls(root_folder)
+        walker = ParallelWalker(
+            root_folder,
+            workers=workers,
+            stop_flag=stop_flag,
+            include_dirs=False,
+            snapshot=snapshot,
+            force_full=force_full,
+        )
+        directories = {}
+        for entry in walker:
+            if not entry.is_file():
+                continue
+            stem, extension = os.path.splitext(entry.name)
+            directories.setdefault(entry.parent, {}).setdefault(stem, {})[extension] = entry.name
+        index.stopped = not walker.completed
+        index.scanned_dirs = walker.dirs_scanned
+        if snapshot is not None:
+            index.snapshot_report = walker.snapshot_report()
+        # 并发遍历的产出顺序不固定，按目录排序保证结果稳定
+        index.directories = {directory: directories[directory] for directory in sorted(directories)}
+        return index
+
+    def videos(self, video_extensions):
+        """产出 (视频路径, 是否有同名 .nfo)。扩展名不区分大小写。"""
+        for directory, stems in self.directories.items():
+            for extensions in stems.values():
+                has_nfo = NFO_EXTENSION in extensions
+                for extension, name in extensions.items():
+                    if extension.lower() in video_extensions:
+                        yield os.path.join(directory, name), has_nfo
+
+    def nfo_files(self, video_extensions):
+        """产出 (NFO 路径, 是否有同名视频)，跳过 tvshow.nfo 和 season.nfo。"""
+        for directory, stems in self.directories.items():
+            for extensions in stems.values():
+                name = extensions.get(NFO_EXTENSION)
+                if name is None or name in SHOW_NFO_NAMES:
+                    continue
+                has_video = any(extension in video_extensions for extension in extensions)
+                yield os.path.join(directory, name), has_video
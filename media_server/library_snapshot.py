@@ -0,0 +1,88 @@
+"""
+媒体库快照：按服务器在本地保存全部影剧的 ProviderIds，供查重离线比对。
+快照按 DateLastSaved 增量刷新（新建条目的 DateLastSaved 不早于 DateCreated），Emby 按 DateCreated 只补充新增条目；
+服务器暂时不可用时仍可使用。
+"""
+
+import json
+import os
+
+# 增量刷新发现不了服务器上删除的条目，超过该时间后改为完整刷新
+LIBRARY_FULL_REFRESH_INTERVAL = 24 * 60 * 60
+
+
+class LibrarySnapshot:
+    """单个服务器的媒体库快照文件，items 形如 {item_id: {'Name': ..., 'Type': ..., 'ProviderIds': {...}}}。"""
+
+    def __init__(self, path, server_key):
+        self.path = path
+        self.server_key = server_key
+        self.items = {}
+        self.synced_at = None
+        self.synced_utc = None
+        self.full_synced_at = None
+
+    @classmethod
+    def for_server(cls, cache_dir, server_key):
+        return cls(os.path.join(cache_dir, f"library_snapshot_{server_key[:16]}.json"), server_key)
+
+    def load(self):
+        """读取快照；文件不存在、损坏或不属于当前服务器时返回 False。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('server_key') != self.server_key:
+            return False
+        items = data.get('items')
+        synced_at = data.get('synced_at')
+        full_synced_at = data.get('full_synced_at')
+        if not isinstance(items, dict) or not isinstance(synced_at, (int, float)):
+            return False
+        self.items = items
+        self.synced_at = synced_at
+        self.synced_utc = data.get('synced_utc')
+        self.full_synced_at = full_synced_at if isinstance(full_synced_at, (int, float)) else None
+        return True
+
+    @staticmethod
+    def _entry(item):
+        return {'Name': item.get('Name', ''), 'Type': item.get('Type'), 'ProviderIds': item.get('ProviderIds') or {}}
+
+    def replace(self, items):
+        """完整刷新：用服务器的完整列表替换快照内容。"""
+        self.items = {item['Id']: self._entry(item) for item in items if item.get('Id')}
+        return len(self.items)
+
+    def upsert(self, items):
+        """增量刷新：合并新建或修改过的条目，返回合并的条目数。"""
+        count = 0
+        for item in items:
+            if item.get('Id'):
+                self.items[item['Id']] = self._entry(item)
+                count += 1
+        return count
+
+    def media(self):
+        """返回与服务器列表相同结构的条目列表，可直接用于建立 Provider ID 索引。"""
+        return [{'Id': item_id, **entry} for item_id, entry in self.items.items()]
+
+    def save(self, synced_at, synced_utc, full=False):
+        """原子替换快照文件，避免中途退出留下半个文件。"""
+        self.synced_at = synced_at
+        self.synced_utc = synced_utc
+        if full or self.full_synced_at is None:
+            self.full_synced_at = synced_at
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        data = {
+            'server_key': self.server_key,
+            'synced_at': self.synced_at,
+            'synced_utc': self.synced_utc,
+            'full_synced_at': self.full_synced_at,
+            'items': self.items,
+        }
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
@@ -0,0 +1,116 @@
+"""
+合并版本聚类：用并查集把共享任一 provider ID（Tmdb/Imdb/num 等）的影片连成连通分量，
+每个分量只需一次 MergeVersions，不会因为通过不同 provider 关联而被分多次合并。
+"""
+
+from media_server.provider_index import canonical_provider, normalize_provider_value
+
+DEFAULT_MERGE_PROVIDERS = ('Tmdb', 'num')
+# 日志和合并记录中使用的分组标识前缀，与按单个 provider 分组时保持一致
+PROVIDER_LABELS = {
+    'Tmdb': 'TMDB',
+    'Imdb': 'IMDB',
+    'Tvdb': 'TVDB',
+    'num': 'AV 番号',
+}
+
+
+def parse_merge_providers(value, default=DEFAULT_MERGE_PROVIDERS):
+    """接受列表或逗号分隔字符串，返回去重后的 provider 元组；为空时返回 default。"""
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)):
+        return tuple(default)
+    providers = []
+    for provider in value:
+        provider = str(provider or '').strip()
+        provider = canonical_provider(provider) or provider
+        if provider and provider not in providers:
+            providers.append(provider)
+    return tuple(providers) or tuple(default)
+
+
+def provider_label(provider):
+    return PROVIDER_LABELS.get(provider, provider)
+
+
+class DisjointSet:
+    """按下标的并查集，路径减半 + 按大小合并。"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, index):
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, left, right):
+        left, right = self.find(left), self.find(right)
+        if left == right:
+            return left
+        if self.size[left] < self.size[right]:
+            left, right = right, left
+        self.parent[right] = left
+        self.size[left] += self.size[right]
+        return left
+
+
+def _movie_provider_keys(movie, providers):
+    provider_ids = {
+        str(key).strip().lower(): value for key, value in (movie.get('ProviderIds') or {}).items() if value
+    }
+    keys = []
+    for provider in providers:
+        value = normalize_provider_value(provider, provider_ids.get(provider.lower()))
+        if value:
+            keys.append((provider, value))
+    return keys
+
+
+def cluster_movies(movies, providers=DEFAULT_MERGE_PROVIDERS):
+    """单遍聚类，返回 {分组标识: 影片列表}，只包含两部及以上影片的分量，按首个成员出现顺序排列。
+
+    分组标识取分量内优先级最高的 provider（providers 中靠前者）的最小值，形如 'TMDB:603'。
+    """
+    movies = list(movies)
+    providers = tuple(providers)
+    priority = {provider: position for position, provider in enumerate(providers)}
+    disjoint_set = DisjointSet(len(movies))
+    owners = {}
+    movie_keys = []
+    for index, movie in enumerate(movies):
+        keys = _movie_provider_keys(movie, providers)
+        movie_keys.append(keys)
+        for key in keys:
+            owner = owners.setdefault(key, index)
+            if owner != index:
+                disjoint_set.union(owner, index)
+
+    components = {}
+    for index, movie in enumerate(movies):
+        if not movie_keys[index]:
+            continue
+        components.setdefault(disjoint_set.find(index), []).append(index)
+
+    clusters = {}
+    for members in components.values():
+        if len(members) < 2:
+            continue
+        provider, value = min(
+            (key for index in members for key in movie_keys[index]),
+            key=lambda key: (priority[key[0]], key[1]),
+        )
+        clusters[f"{provider_label(provider)}:{value}"] = [movies[index] for index in members]
+    return clusters
+
+
+def cluster_size_stats(clusters):
+    """返回 {分量大小: 分量数}，按大小升序。"""
+    stats = {}
+    for movies in clusters.values():
+        stats[len(movies)] = stats.get(len(movies), 0) + 1
+    return dict(sorted(stats.items()))
@@ -0,0 +1,69 @@
+"""
+合并版本记录：按服务器在本地保存已成功合并的分组（分组标识 -> 成员 ID -> 合并时间），
+后续运行直接跳过成员未增加的分组，不再重复提交 MergeVersions。
+"""
+
+import json
+import os
+
+
+class MergeLedger:
+    """单个服务器的合并记录文件，entries 形如 {'TMDB:603': {'ids': [...], 'merged_at': 时间戳}}。"""
+
+    def __init__(self, path, server_key):
+        self.path = path
+        self.server_key = server_key
+        self.entries = {}
+        self._member_sets = {}
+        self.dirty = False
+
+    @classmethod
+    def for_server(cls, cache_dir, server_key):
+        return cls(os.path.join(cache_dir, f"merge_ledger_{server_key[:16]}.json"), server_key)
+
+    @staticmethod
+    def identity(label, value):
+        return f"{label}:{value}"
+
+    def load(self):
+        """读取记录；文件不存在、损坏或不属于当前服务器时返回 False，记录保持为空。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('server_key') != self.server_key:
+            return False
+        entries = data.get('entries')
+        if not isinstance(entries, dict):
+            return False
+        self.entries = {
+            identity: entry
+            for identity, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get('ids'), list)
+        }
+        self._member_sets = {identity: frozenset(entry['ids']) for identity, entry in self.entries.items()}
+        return True
+
+    def is_merged(self, identity, item_ids):
+        """分组已合并且没有新增成员时返回 True（成员减少不需要重新合并）。"""
+        merged_ids = self._member_sets.get(identity)
+        return merged_ids is not None and bool(item_ids) and set(item_ids) <= merged_ids
+
+    def record(self, identity, item_ids, merged_at):
+        item_ids = sorted(set(item_ids))
+        self.entries[identity] = {'ids': item_ids, 'merged_at': merged_at}
+        self._member_sets[identity] = frozenset(item_ids)
+        self.dirty = True
+
+    def save(self):
+        """有新记录时原子替换记录文件。"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        data = {'server_key': self.server_key, 'entries': self.entries}
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+        self.dirty = False
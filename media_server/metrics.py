@@ -0,0 +1,136 @@
+"""
+请求统计：按端点汇总请求次数、延迟分位数、响应字节、状态码、重试与回读确认，
+每个后台任务结束时生成结构化报告。
+"""
+
+import json
+import math
+import os
+import threading
+from collections import Counter
+
+
+def percentile(sorted_values, fraction):
+    """最近秩法分位数；sorted_values 必须已排序。"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _EndpointStats:
+    __slots__ = ('latencies', 'bytes', 'status_codes', 'retries', 'retry_sleep', 'readback_confirmed', 'readback_failed')
+
+    def __init__(self):
+        self.latencies = []
+        self.bytes = 0
+        self.status_codes = Counter()
+        self.retries = 0
+        self.retry_sleep = 0.0
+        self.readback_confirmed = 0
+        self.readback_failed = 0
+
+
+class RequestMetrics:
+    """线程安全的按端点请求统计。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _stats(self, key):
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats()
+        return stats
+
+    def record_response(self, key, latency, status, size=0):
+        """记录一次请求结果；status 为 HTTP 状态码，网络异常时为异常类名。"""
+        with self._lock:
+            stats = self._stats(key)
+            stats.latencies.append(latency)
+            stats.status_codes[str(status)] += 1
+            stats.bytes += size
+
+    def add_bytes(self, key, size):
+        with self._lock:
+            self._stats(key).bytes += size
+
+    def record_retry(self, key, sleep_seconds=0.0):
+        with self._lock:
+            stats = self._stats(key)
+            stats.retries += 1
+            stats.retry_sleep += sleep_seconds
+
+    def record_readback(self, key, confirmed):
+        with self._lock:
+            stats = self._stats(key)
+            if confirmed:
+                stats.readback_confirmed += 1
+            else:
+                stats.readback_failed += 1
+
+    def report(self):
+        """返回可直接序列化为 JSON 的报告。"""
+        with self._lock:
+            endpoints = {}
+            for key, stats in sorted(self._endpoints.items()):
+                latencies = sorted(stats.latencies)
+                endpoints[key] = {
+                    'requests': len(latencies),
+                    'latency_ms': {
+                        name: round(value * 1000, 1) if value is not None else None
+                        for name, value in (
+                            ('p50', percentile(latencies, 0.50)),
+                            ('p95', percentile(latencies, 0.95)),
+                            ('p99', percentile(latencies, 0.99)),
+                            ('max', latencies[-1] if latencies else None),
+                        )
+                    },
+                    'total_seconds': round(sum(latencies), 3),
+                    'bytes': stats.bytes,
+                    'status_codes': dict(stats.status_codes),
+                    'retries': stats.retries,
+                    'retry_sleep_seconds': round(stats.retry_sleep, 3),
+                    'readback_confirmed': stats.readback_confirmed,
+                    'readback_failed': stats.readback_failed,
+                }
+
+        totals = {
+            field: sum(entry[field] for entry in endpoints.values())
+            for field in ('requests', 'bytes', 'retries', 'readback_confirmed', 'readback_failed')
+        }
+        totals['total_seconds'] = round(sum(entry['total_seconds'] for entry in endpoints.values()), 3)
+        totals['retry_sleep_seconds'] = round(sum(entry['retry_sleep_seconds'] for entry in endpoints.values()), 3)
+        return {'endpoints': endpoints, 'totals': totals}
+
+
+def format_report_lines(report, max_endpoints=10):
+    """把报告整理成日志行，按累计耗时从高到低排列。"""
+    ranked = sorted(report['endpoints'].items(), key=lambda entry: entry[1]['total_seconds'], reverse=True)
+    lines = []
+    for key, entry in ranked[:max_endpoints]:
+        latency = entry['latency_ms']
+        statuses = ', '.join(f"{status}×{count}" for status, count in sorted(entry['status_codes'].items()))
+        line = (
+            f"{key}: {entry['requests']} 次，耗时 {entry['total_seconds']:.1f} 秒，"
+            f"p50/p95/p99 {latency['p50']}/{latency['p95']}/{latency['p99']} ms，"
+            f"{entry['bytes'] / 1024:.0f} KB，状态码 [{statuses}]"
+        )
+        if entry['retries']:
+            line += f"，重试 {entry['retries']} 次（等待 {entry['retry_sleep_seconds']:.1f} 秒）"
+        if entry['readback_confirmed'] or entry['readback_failed']:
+            line += f"，回读确认 {entry['readback_confirmed']} 次/未确认 {entry['readback_failed']} 次"
+        lines.append(line)
+    omitted = len(ranked) - max_endpoints
+    if omitted > 0:
+        lines.append(f"... 还有 {omitted} 个端点未列出")
+    return lines
+
+
+def write_report(path, report):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
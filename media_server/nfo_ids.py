@@ -0,0 +1,133 @@
+"""
+NFO 中的 provider ID 提取：分块增量解析，只看根元素的一级子元素，
+拿到 tmdbid 且 ID 相关元素结束后立即停止读取，不会为大段 <actor>/<fileinfo> 构建整棵树。
+XML 损坏时用已读取的内容继续做宽松匹配，文件只读一遍。根元素决定条目类型（影片/剧集/单集）。
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+NFO_READ_CHUNK_SIZE = 16 * 1024
+
+# 一级子元素标签 -> provider
+NFO_ID_TAGS = {
+    'tmdbid': 'Tmdb',
+    'imdbid': 'Imdb',
+    'imdb_id': 'Imdb',
+    'tvdbid': 'Tvdb',
+}
+# <uniqueid type="..."> 的 type -> provider
+UNIQUEID_TYPES = {
+    'tmdb': 'Tmdb',
+    'imdb': 'Imdb',
+    'tvdb': 'Tvdb',
+}
+ID_PROVIDERS = frozenset(NFO_ID_TAGS.values())
+# NFO 根元素 -> 服务器条目类型；Tmdb/Tvdb 的影片和剧集 ID 各自编号，查重时必须同类型比较
+NFO_ROOT_TYPES = {
+    'movie': 'Movie',
+    'tvshow': 'Series',
+    'episodedetails': 'Episode',
+}
+
+# 宽松匹配只认缩进不超过两个空格（或一个制表符）的行，避免命中 <set> 等嵌套块里的 tmdbid
+_TOLERANT_TAG_PATTERN = re.compile(
+    r'^(?: {0,2}|\t)<(tmdbid|imdbid|imdb_id|tvdbid)>\s*([^<\s]+)\s*<',
+    re.MULTILINE | re.IGNORECASE,
+)
+_TOLERANT_ROOT_PATTERN = re.compile(r'<(movie|tvshow|episodedetails)\b', re.IGNORECASE)
+_TOLERANT_UNIQUEID_PATTERN = re.compile(
+    r'^(?: {0,2}|\t)<uniqueid\b[^>]*\btype\s*=\s*["\'](\w+)["\'][^>]*>\s*([^<\s]+)\s*<',
+    re.MULTILINE | re.IGNORECASE,
+)
+
+
+def _element_provider(element):
+    tag = element.tag.lower() if isinstance(element.tag, str) else ''
+    if tag == 'uniqueid':
+        return UNIQUEID_TYPES.get(str(element.get('type') or '').strip().lower())
+    return NFO_ID_TAGS.get(tag)
+
+
+def _is_id_tag(element):
+    tag = element.tag.lower() if isinstance(element.tag, str) else ''
+    return tag == 'uniqueid' or tag in NFO_ID_TAGS
+
+
+def _root_type(element):
+    tag = element.tag.lower() if isinstance(element.tag, str) else ''
+    return NFO_ROOT_TYPES.get(tag)
+
+
+def tolerant_media_type(text):
+    """在损坏的 NFO 文本中找第一个已知根元素，返回条目类型，找不到时返回 None。"""
+    match = _TOLERANT_ROOT_PATTERN.search(text)
+    return NFO_ROOT_TYPES[match.group(1).lower()] if match else None
+
+
+def tolerant_extract_ids(text):
+    """在不完整或损坏的 NFO 文本中按行匹配 ID 元素，每个 provider 取第一个值。"""
+    ids = {}
+    for tag, value in _TOLERANT_TAG_PATTERN.findall(text):
+        ids.setdefault(NFO_ID_TAGS[tag.lower()], value)
+    for id_type, value in _TOLERANT_UNIQUEID_PATTERN.findall(text):
+        provider = UNIQUEID_TYPES.get(id_type.lower())
+        if provider:
+            ids.setdefault(provider, value)
+    return ids
+
+
+def extract_nfo_ids(path, chunk_size=NFO_READ_CHUNK_SIZE):
+    """返回 (ids, damaged, parse_error, media_type)。
+
+    ids 形如 {'Tmdb': '603', 'Imdb': 'tt0133093'}；damaged 表示 XML 不完整或无法解析，
+    此时 ids 来自解析器已经得到的值加上宽松匹配；parse_error 为解析异常信息；
+    media_type 为根元素对应的条目类型（Movie/Series/Episode），未知根元素时为 None。读取失败时抛出 OSError。
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    ids = {}
+    media_type = None
+    depth = 0
+    consumed = []
+    parse_error = None
+
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            consumed.append(chunk)
+            try:
+                if chunk:
+                    parser.feed(chunk)
+                else:
+                    parser.close()
+                for event, element in parser.read_events():
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            media_type = _root_type(element)
+                        # tmdbid 已拿到且 ID 元素之后出现了其他一级元素，剩余内容不再读取
+                        if depth == 2 and 'Tmdb' in ids and not _is_id_tag(element):
+                            return ids, False, None, media_type
+                        continue
+                    depth -= 1
+                    if depth != 1:
+                        continue
+                    provider = _element_provider(element)
+                    value = (element.text or '').strip()
+                    # 处理完的一级子元素立即清空，大段 <actor> 不会常驻内存
+                    element.clear()
+                    if provider and value:
+                        ids.setdefault(provider, value)
+                        if ID_PROVIDERS <= ids.keys():
+                            return ids, False, None, media_type
+            except ET.ParseError as err:
+                parse_error = err
+                consumed.append(f.read())
+                break
+            if not chunk:
+                return ids, False, None, media_type
+
+    text = b''.join(consumed).decode('utf-8', errors='replace')
+    for provider, value in tolerant_extract_ids(text).items():
+        ids.setdefault(provider, value)
+    return ids, True, parse_error, media_type or tolerant_media_type(text)
@@ -0,0 +1,103 @@
+"""
+NFO ID 索引：在 SQLite 中按 NFO 路径 + 文件大小 + 修改时间保存提取出的 provider ID、破损标记和条目类型，
+重复查重时只重新解析新增或修改过的 NFO。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 每累计这么多条写入提交一次事务，中断时最多丢失这部分缓存
+NFO_INDEX_COMMIT_INTERVAL = 500
+
+
+class NfoIdIndex:
+    """线程安全的 NFO ID 索引，可被并发读取 NFO 的线程共享。"""
+
+    def __init__(self, path, commit_interval=NFO_INDEX_COMMIT_INTERVAL):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        columns = {row[1] for row in self._connection.execute('PRAGMA table_info(nfo_ids)')}
+        if columns and 'media_type' not in columns:
+            # 旧版索引没有记录条目类型，索引可随时重建，直接丢弃
+            self._connection.execute('DROP TABLE nfo_ids')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS nfo_ids ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+            'ids TEXT NOT NULL, damaged INTEGER NOT NULL, media_type TEXT, indexed_at REAL NOT NULL)'
+        )
+        self._connection.commit()
+        self._pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, stat_result):
+        """文件大小和修改时间都未变化时返回 (ids, damaged, media_type)，否则返回 None。"""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT size, mtime_ns, ids, damaged, media_type FROM nfo_ids WHERE path = ?',
+                (path,),
+            ).fetchone()
+            if row is None or row[0] != stat_result.st_size or row[1] != stat_result.st_mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[2]), bool(row[3]), row[4]
+
+    def put(self, path, stat_result, ids, damaged, media_type=None):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO nfo_ids (path, size, mtime_ns, ids, damaged, media_type, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    path,
+                    stat_result.st_size,
+                    stat_result.st_mtime_ns,
+                    json.dumps(ids, ensure_ascii=False, sort_keys=True),
+                    int(bool(damaged)),
+                    media_type,
+                    time.time(),
+                ),
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_interval:
+                self._connection.commit()
+                self._pending_writes = 0
+
+    def prune(self, root_folder, seen_paths):
+        """删除 root_folder 下本次扫描没有见到的行（文件已删除或移动），返回删除的行数。"""
+        prefix = os.path.join(os.path.abspath(root_folder), '')
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path FROM nfo_ids WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+            stale = [(path,) for (path,) in rows if path not in seen_paths]
+            self._connection.executemany('DELETE FROM nfo_ids WHERE path = ?', stale)
+            self._connection.commit()
+            self._pending_writes = 0
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            rows = self._connection.execute('SELECT COUNT(*) FROM nfo_ids').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'rows': rows,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,94 @@
+"""
+NFO 扫描流水线：后台线程遍历目录产出 NFO 路径，线程池并发提取 ID，
+调用方在单个线程中按完成顺序消费结果（分类、删除等有副作用的操作都在消费端执行）。
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_WALK_DONE = object()
+
+
+class NfoScanPipeline:
+    """遍历 root_folder 下所有 .nfo 并用 extract(path) 并发提取。
+
+    迭代产出 (nfo_path, extract 结果)；discovered 为已发现的 NFO 数，walk_finished 后即为总数。
+    stop_flag 置位后不再派发新文件，已完成的结果不再产出。
+    """
+
+    def __init__(self, root_folder, extract, workers=1, stop_flag=None, max_pending=None, suffix='.nfo'):
+        self.root_folder = root_folder
+        self.extract = extract
+        self.workers = max(1, int(workers))
+        self.stop_flag = stop_flag or threading.Event()
+        self.max_pending = max_pending or self.workers * 4
+        self.suffix = suffix
+        self.discovered = 0
+        self.processed = 0
+        self.walk_finished = False
+        self._closed = threading.Event()
+
+    def _stopped(self):
+        return self.stop_flag.is_set() or self._closed.is_set()
+
+    def _put(self, paths, value):
+        # 消费端停止后队列不会再被读取，带超时放入以便遍历线程及时退出
+        while not self._stopped():
+            try:
+                paths.put(value, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _walk(self, paths):
+        try:
+            for root, _dirs, files in os.walk(self.root_folder):
+                for file in files:
+                    if not file.endswith(self.suffix):
+                        continue
+                    if not self._put(paths, os.path.join(root, file)):
+                        return
+                    self.discovered += 1
+        finally:
+            self.walk_finished = True
+            self._put(paths, _WALK_DONE)
+
+    def __iter__(self):
+        paths = queue.Queue(maxsize=self.max_pending)
+        walker = threading.Thread(target=self._walk, args=(paths,), name='nfo-walker', daemon=True)
+        walker.start()
+        pending = set()
+        walk_done = False
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='nfo-scan')
+        try:
+            while not self.stop_flag.is_set():
+                while not walk_done and len(pending) < self.max_pending:
+                    try:
+                        nfo_path = paths.get(timeout=0 if pending else 0.2)
+                    except queue.Empty:
+                        break
+                    if nfo_path is _WALK_DONE:
+                        walk_done = True
+                        break
+                    pending.add(executor.submit(self._extract_one, nfo_path))
+                if not pending:
+                    if walk_done:
+                        return
+                    continue
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if self.stop_flag.is_set():
+                        return
+                    self.processed += 1
+                    yield future.result()
+        finally:
+            self._closed.set()
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _extract_one(self, nfo_path):
+        return nfo_path, self.extract(nfo_path)
@@ -0,0 +1,88 @@
+"""
+媒体服务器条目列表分页读取：按 StartIndex/Limit 逐页请求并逐条产出条目。
+"""
+
+import time
+
+DEFAULT_PAGE_SIZE = 500
+
+
+class ItemListingError(RuntimeError):
+    """分页读取条目列表失败，失败原因已由读取函数记录到日志。"""
+
+
+class ItemPager:
+    """单个列表接口的分页迭代器。
+
+    fetch_page(start_index, limit) 返回服务器的 JSON 响应（含 Items/TotalRecordCount），
+    读取失败时应抛出 ItemListingError；重试由 fetch_page 自己负责，只重试失败的那一页。
+    """
+
+    def __init__(self, fetch_page, page_size=DEFAULT_PAGE_SIZE, stop_flag=None, on_finish=None):
+        self.fetch_page = fetch_page
+        self.page_size = max(1, int(page_size))
+        self.stop_flag = stop_flag
+        self.on_finish = on_finish
+        self.total_record_count = None
+        self.item_count = 0
+        self.page_count = 0
+        self.bytes_read = 0
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        start_index = 0
+        started_at = time.monotonic()
+        while True:
+            if self.stop_flag is not None and self.stop_flag.is_set():
+                return
+
+            # Items 可能是边下载边解析的迭代器，TotalRecordCount 要等条目读完后再取
+            payload = self.fetch_page(start_index, self.page_size) or {}
+            page_item_count = 0
+            for item in payload.get('Items') or []:
+                page_item_count += 1
+                self.item_count += 1
+                yield item
+
+            total = payload.get('TotalRecordCount')
+            if isinstance(total, int) and total >= 0:
+                self.total_record_count = total
+            self.page_count += 1
+            self.bytes_read += getattr(payload, 'bytes_read', 0)
+            self.elapsed = time.monotonic() - started_at
+
+            start_index += page_item_count
+            if page_item_count == 0:
+                break
+            # 服务器可能限制单页条数或按权限过滤掉部分条目，有 TotalRecordCount 时以它为准，短页不代表结束
+            if self.total_record_count is not None:
+                if start_index >= self.total_record_count:
+                    break
+            # 没有总数时只能按页大小判断：条目数不等于页大小说明已到最后一页，或服务器忽略了分页参数
+            elif page_item_count != self.page_size:
+                break
+
+        if self.on_finish:
+            self.on_finish(self)
+
+
+class ItemStream:
+    """按顺序串联多个 ItemPager（例如 Jellyfin 的多个媒体库视图）。"""
+
+    def __init__(self, pagers):
+        self.pagers = list(pagers)
+
+    @property
+    def total_record_count(self):
+        totals = [pager.total_record_count for pager in self.pagers]
+        if not totals or any(total is None for total in totals):
+            return None
+        return sum(totals)
+
+    @property
+    def item_count(self):
+        return sum(pager.item_count for pager in self.pagers)
+
+    def __iter__(self):
+        for pager in self.pagers:
+            yield from pager
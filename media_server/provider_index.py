@@ -0,0 +1,92 @@
+"""
+Provider ID 索引：从服务器条目的 ProviderIds 一次性建立 Tmdb/Imdb/Tvdb 哈希索引，
+查重时每个 NFO 只需常数次字典查询，并返回命中的 provider。
+"""
+
+# 可识别的 provider 键；num 为番号类刮削器使用的 provider，只用于合并版本
+PROVIDER_KEYS = ('Tmdb', 'Imdb', 'Tvdb', 'num')
+_PROVIDER_BY_LOWER = {key.lower(): key for key in PROVIDER_KEYS}
+# 查重索引的 provider，即 NFO 中能提取到的 ID；查找顺序即优先级，Tmdb 最常见且最可靠
+INDEX_PROVIDERS = ('Tmdb', 'Imdb', 'Tvdb')
+
+
+def canonical_provider(provider):
+    """ProviderIds 的键大小写不统一（Tmdb/TMDB/tmdb），统一为 PROVIDER_KEYS 中的写法。"""
+    return _PROVIDER_BY_LOWER.get(str(provider or '').strip().lower())
+
+
+def normalize_provider_value(provider, value):
+    """规范化 provider 值：数字 ID 去掉前导零，IMDb 统一为小写 tt 前缀，num 转大写。"""
+    text = str(value or '').strip()
+    if not text:
+        return ''
+    provider = canonical_provider(provider)
+    if provider == 'Imdb':
+        text = text.lower()
+        if text.isdigit():
+            text = f"tt{text}"
+        return text
+    if provider in ('Tmdb', 'Tvdb'):
+        return str(int(text)) if text.isdigit() else text
+    if provider == 'num':
+        return text.upper()
+    return text
+
+
+class ProviderIdIndex:
+    """{provider: {规范化值: 条目列表}} 形式的索引。
+
+    Tmdb/Tvdb 的影片和剧集各自编号，同一个值可能分别指向影片和剧集，因此查找时按条目 Type 过滤；
+    没有 Type 的条目（旧版本地快照）与任何类型都匹配。
+    """
+
+    def __init__(self, providers=INDEX_PROVIDERS):
+        self.providers = tuple(providers)
+        self._index = {provider: {} for provider in self.providers}
+        self.item_count = 0
+
+    @classmethod
+    def build(cls, items):
+        index = cls()
+        for item in items:
+            index.add(item)
+        return index
+
+    def add(self, item):
+        self.item_count += 1
+        for provider, value in (item.get('ProviderIds') or {}).items():
+            provider = canonical_provider(provider)
+            if provider not in self._index:
+                continue
+            normalized = normalize_provider_value(provider, value)
+            if normalized:
+                self._index[provider].setdefault(normalized, []).append(item)
+
+    def lookup(self, provider, value, media_type=None):
+        """media_type 为 None 时不按类型过滤。"""
+        provider = canonical_provider(provider)
+        if provider not in self._index:
+            return []
+        items = self._index[provider].get(normalize_provider_value(provider, value), [])
+        if media_type is None:
+            return items
+        return [item for item in items if item.get('Type') in (None, media_type)]
+
+    def match(self, provider_ids, media_type=None):
+        """按 providers 顺序查找，返回 (provider, 规范化值, 命中的条目列表)，都未命中时返回 None。"""
+        normalized_ids = {}
+        for provider, value in (provider_ids or {}).items():
+            provider = canonical_provider(provider)
+            if provider and value:
+                normalized_ids[provider] = value
+        for provider in self.providers:
+            value = normalized_ids.get(provider)
+            if not value:
+                continue
+            items = self.lookup(provider, value, media_type)
+            if items:
+                return provider, normalize_provider_value(provider, value), items
+        return None
+
+    def counts(self):
+        return {provider: len(values) for provider, values in self._index.items()}
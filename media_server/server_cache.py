@@ -0,0 +1,80 @@
+"""
+服务器信息缓存：按服务器地址 + 用户名在本地保存检测到的服务器类型、用户 ID 和可用的 API 前缀，
+定时任务重复启动时无需再探测服务器。
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_SERVER_CACHE_TTL = 24 * 60 * 60
+
+
+class ServerInfoCache:
+    """带过期时间的服务器信息 JSON 缓存，文件损坏或读写失败时按未命中处理。"""
+
+    def __init__(self, path, ttl=DEFAULT_SERVER_CACHE_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(server_url, username):
+        return f"{str(server_url or '').rstrip('/').lower()}|{str(username or '').strip().lower()}"
+
+    def _read_all(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write_all(self, data):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get(self, key):
+        """返回未过期的缓存条目（字典），不存在或已过期时返回空字典。"""
+        with self._lock:
+            entry = self._read_all().get(key)
+        if not isinstance(entry, dict):
+            return {}
+        saved_at = entry.get('saved_at')
+        if not isinstance(saved_at, (int, float)) or self._clock() - saved_at > self.ttl:
+            return {}
+        return entry
+
+    def update(self, key, **values):
+        with self._lock:
+            data = self._read_all()
+            entry = data.get(key) if isinstance(data.get(key), dict) else {}
+            saved_at = entry.get('saved_at')
+            if not isinstance(saved_at, (int, float)) or self._clock() - saved_at > self.ttl:
+                entry = {}
+            entry.update(values)
+            # 过期时间从首次写入算起，避免条目被不断续期
+            entry.setdefault('saved_at', self._clock())
+            data[key] = entry
+            try:
+                self._write_all(data)
+            except OSError:
+                return False
+        return True
+
+    def invalidate(self, key):
+        with self._lock:
+            data = self._read_all()
+            if key not in data:
+                return False
+            data.pop(key)
+            try:
+                self._write_all(data)
+            except OSError:
+                return False
+        return True
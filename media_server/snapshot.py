@@ -0,0 +1,67 @@
+"""
+条目快照：按服务器持久化每个条目的版本（DateLastSaved/Etag）和已处理字段的哈希，
+供 Emby 增量扫描只读取和翻译发生变化的条目。
+"""
+
+import hashlib
+import json
+import os
+
+
+def item_version(item):
+    """条目版本标识；服务器每次保存条目都会更新 DateLastSaved 或 Etag。"""
+    date_last_saved = item.get('DateLastSaved') or ''
+    etag = item.get('Etag') or ''
+    if not date_last_saved and not etag:
+        return None
+    return f"{date_last_saved}|{etag}"
+
+
+def field_hash(values):
+    serialized = json.dumps(values or [], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
+class ItemSnapshot:
+    """单个服务器、单类任务（流派或地区）的条目快照文件。
+
+    entries 形如 {item_id: {'version': ..., 'hash': ...}}；翻译表哈希变化时快照失效。
+    """
+
+    def __init__(self, path, server_key, map_hash):
+        self.path = path
+        self.server_key = server_key
+        self.map_hash = map_hash
+        self.entries = {}
+
+    @classmethod
+    def for_server(cls, cache_dir, kind, server_key, map_hash):
+        file_name = f"item_snapshot_{kind}_{server_key[:16]}.json"
+        return cls(os.path.join(cache_dir, file_name), server_key, map_hash)
+
+    def load(self):
+        """读取快照；文件不存在、损坏或不属于当前服务器/翻译表时返回 False。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict):
+            return False
+        if data.get('server_key') != self.server_key or data.get('map_hash') != self.map_hash:
+            return False
+        entries = data.get('items')
+        if not isinstance(entries, dict):
+            return False
+        self.entries = entries
+        return True
+
+    def save(self, entries):
+        """原子替换快照文件，避免中途退出留下半个文件。"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        data = {'server_key': self.server_key, 'map_hash': self.map_hash, 'items': entries}
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+        self.entries = entries
@@ -0,0 +1,165 @@
+"""
+流式 JSON 解码：边下载边逐个产出响应中 Items 数组的元素，不必先把整个响应体解析成对象树。
+"""
+
+import codecs
+import json
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+_WHITESPACE = ' \t\n\r'
+
+
+def peak_rss_bytes():
+    """当前进程的峰值常驻内存（字节），平台不支持时返回 None。"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StreamingPayload:
+    """增量解析形如 {"Items": [...], "TotalRecordCount": N} 的响应。
+
+    get('Items') 返回逐个产出数组元素的迭代器；读取其他字段时会把剩余内容解析完。
+    chunks 为字节块迭代器（例如 response.iter_content()）；解析出错时先调用 on_error(err)，
+    由调用方记录日志并抛出自己的异常类型。
+    """
+
+    def __init__(self, chunks, array_key='Items', on_error=None):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._state = 'start'
+        self._items_iter = None
+        self.array_key = array_key
+        self.on_error = on_error
+        self.fields = {}
+        self.bytes_read = 0
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(b'', final=True)
+            self._pos = 0
+            self._eof = True
+            return False
+        self.bytes_read += len(chunk)
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('JSON 响应意外结束')
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"JSON 响应格式错误：位置 {self.bytes_read} 附近应为 {char!r}")
+        self._pos += 1
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数字可能恰好被块边界截断，缓冲区用尽时再读一块确认
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _next_member(self):
+        if self._state == 'done':
+            return None
+        if self._state == 'start':
+            self._expect('{')
+            self._state = 'first'
+        if self._peek() == '}':
+            self._pos += 1
+            self._state = 'done'
+            return None
+        if self._state == 'next':
+            self._expect(',')
+        self._state = 'next'
+        key = self._decode_value()
+        if not isinstance(key, str):
+            raise ValueError('JSON 响应格式错误：对象键不是字符串')
+        self._expect(':')
+        return key
+
+    def _iter_array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError('JSON 响应格式错误：数组元素之间缺少逗号')
+
+    def _iter_items(self):
+        while True:
+            key = self._next_member()
+            if key is None:
+                return
+            if key == self.array_key:
+                break
+            self.fields[key] = self._decode_value()
+        yield from self._iter_array()
+
+    def _guarded(self, iterator):
+        try:
+            yield from iterator
+        except ValueError as err:
+            if self.on_error:
+                self.on_error(err)
+            raise
+
+    def _drain(self):
+        if self._items_iter is None:
+            self.fields[self.array_key] = list(self.get(self.array_key))
+        else:
+            for _item in self._items_iter:
+                pass
+
+        def remaining_members():
+            while True:
+                key = self._next_member()
+                if key is None:
+                    return
+                self.fields[key] = self._decode_value()
+                yield
+
+        for _member in self._guarded(remaining_members()):
+            pass
+
+    def get(self, key, default=None):
+        if key == self.array_key and self._items_iter is None:
+            self._items_iter = self._guarded(self._iter_items())
+            return self._items_iter
+        self._drain()
+        return self.fields.get(key, default)
@@ -0,0 +1,164 @@
+"""
+媒体服务器请求限流：客户端内所有请求共享一个令牌桶，并按 AIMD 自适应调整并发上限。
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+DEFAULT_MAX_RETRY_AFTER = 60.0
+DEFAULT_BACKOFF_MAX = 30.0
+RATE_WINDOW_SECONDS = 10.0
+
+
+def parse_retry_after(value, now=None):
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），无法解析时返回 None。"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class AdaptiveLimiter:
+    """令牌桶 + AIMD 并发控制。
+
+    rate 为每秒允许发出的请求数（0 表示不限速），burst 为令牌桶容量；
+    并发上限在 1 到 max_concurrency 之间浮动：请求成功时加性增长，遇到 429/503 时减半，
+    并在 Retry-After 指定的时间内暂停所有新请求。
+    """
+
+    def __init__(
+        self,
+        rate=0,
+        burst=None,
+        max_concurrency=1,
+        max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        clock=time.monotonic,
+    ):
+        self.rate = max(0.0, float(rate or 0))
+        self.burst = max(1.0, float(burst or self.rate or 1))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retry_after = max(0.0, float(max_retry_after))
+        self.backoff_max = max(0.0, float(backoff_max))
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._tokens = self.burst
+        self._refilled_at = clock()
+        self._limit = float(self.max_concurrency)
+        self._last_decrease_at = None
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._sent_at = deque()
+        self.requests = 0
+        self.throttle_events = 0
+
+    @property
+    def concurrency_limit(self):
+        return max(1, int(self._limit))
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _wait_time(self, now):
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= self.concurrency_limit:
+            return None
+        if self.rate and self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        return 0.0
+
+    def acquire(self, stop_flag=None):
+        """等待可以发出请求；stop_flag 置位后不再等待，直接放行。"""
+        with self._condition:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                wait = self._wait_time(now)
+                if wait == 0.0 or (stop_flag is not None and stop_flag.is_set()):
+                    break
+                # 分段等待，以便及时响应停止请求
+                self._condition.wait(0.5 if wait is None else min(wait, 0.5))
+
+            if self.rate:
+                self._tokens = max(0.0, self._tokens - 1)
+            self._in_flight += 1
+            self.requests += 1
+            self._sent_at.append(now)
+            while self._sent_at and now - self._sent_at[0] > RATE_WINDOW_SECONDS:
+                self._sent_at.popleft()
+
+    def release(self, status_code=None, retry_after=None):
+        """请求结束后归还并发名额，并按响应状态调整并发上限。
+
+        返回本次触发的服务器要求等待秒数（未被限流时为 None）。
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            delay = None
+            if status_code in THROTTLE_STATUS_CODES:
+                now = self._clock()
+                self.throttle_events += 1
+                # 同一轮并发里的多个 429 只减半一次
+                if self._last_decrease_at is None or now - self._last_decrease_at >= 1.0:
+                    self._limit = max(1.0, self._limit / 2)
+                    self._last_decrease_at = now
+                delay = parse_retry_after(retry_after)
+                if delay is not None:
+                    delay = min(delay, self.max_retry_after)
+                    self._paused_until = max(self._paused_until, now + delay)
+            elif status_code is not None and status_code < 500:
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+            return delay
+
+    def backoff_delay(self, attempt, base=1.0, retry_after=None):
+        """第 attempt 次重试（从 0 开始）前的等待秒数：优先服从 Retry-After，否则指数退避加随机抖动。"""
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_retry_after)
+        ceiling = min(self.backoff_max, max(0.0, float(base)) * (2 ** max(0, int(attempt))))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def reset_stats(self):
+        """清零请求与限流计数；自适应并发上限和暂停状态反映服务器状况，保留不变。"""
+        with self._condition:
+            self._sent_at.clear()
+            self.requests = 0
+            self.throttle_events = 0
+
+    def metrics(self):
+        with self._condition:
+            now = self._clock()
+            while self._sent_at and now - self._sent_at[0] > RATE_WINDOW_SECONDS:
+                self._sent_at.popleft()
+            return {
+                'rate': len(self._sent_at) / RATE_WINDOW_SECONDS,
+                'rate_limit': self.rate,
+                'concurrency_limit': self.concurrency_limit,
+                'in_flight': self._in_flight,
+                'requests': self.requests,
+                'throttle_events': self.throttle_events,
+            }
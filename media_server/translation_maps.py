@@ -0,0 +1,133 @@
+"""
+翻译表按需加载：首次翻译时才导入内置的流派/地区翻译表，并可叠加 YAML/JSON 覆盖文件。
+合并后的翻译表和由其派生的索引（预编译流派表、地区查找索引）按内容哈希在模块级缓存，
+所有客户端实例共享，同一份内容只编译一次。
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+
+# 覆盖文件中的区段名 -> (内置翻译表模块, 变量名)
+TRANSLATION_SECTIONS = {
+    'movies': ('media_server.genre_maps', 'MOVIE_GENRE_TRANSLATIONS'),
+    'series': ('media_server.genre_maps', 'TV_GENRE_TRANSLATIONS'),
+    'countries': ('media_server.country_maps', 'COUNTRY_TRANSLATIONS'),
+}
+
+_lock = threading.RLock()
+_merged_maps = {}
+_override_files = {}
+_derived_by_id = {}
+_derived_by_hash = {}
+
+
+class TranslationOverrideError(Exception):
+    """覆盖文件无法读取、解析失败或格式不正确"""
+
+
+def mapping_hash(mapping):
+    serialized = json.dumps(mapping, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def builtin_map(section):
+    module_name, attribute = TRANSLATION_SECTIONS[section]
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _parse_override_file(path, raw):
+    if path.lower().endswith(('.yaml', '.yml')):
+        import yaml
+
+        try:
+            data = yaml.safe_load(raw)
+        except yaml.YAMLError as err:
+            raise TranslationOverrideError(f"翻译覆盖文件 {path} 解析失败: {err}") from err
+    else:
+        try:
+            data = json.loads(raw)
+        except ValueError as err:
+            raise TranslationOverrideError(f"翻译覆盖文件 {path} 解析失败: {err}") from err
+
+    data = data or {}
+    if not isinstance(data, dict):
+        raise TranslationOverrideError(f"翻译覆盖文件 {path} 顶层必须是字典")
+    sections = {}
+    for section, entries in data.items():
+        if section not in TRANSLATION_SECTIONS:
+            raise TranslationOverrideError(
+                f"翻译覆盖文件 {path} 包含未知区段 {section}，可用区段: {', '.join(TRANSLATION_SECTIONS)}"
+            )
+        if not isinstance(entries, dict):
+            raise TranslationOverrideError(f"翻译覆盖文件 {path} 的 {section} 区段必须是字典")
+        sections[section] = {str(source): str(target) for source, target in entries.items()}
+    return sections
+
+
+def load_override_file(path):
+    """读取覆盖文件，返回 (内容哈希, {区段: 翻译表})；按文件大小和修改时间缓存解析结果。"""
+    try:
+        stat = os.stat(path)
+    except OSError as err:
+        raise TranslationOverrideError(f"无法读取翻译覆盖文件 {path}: {err}") from err
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        cached = _override_files.get(path)
+        if cached and cached[0] == signature:
+            return cached[1], cached[2]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+    except OSError as err:
+        raise TranslationOverrideError(f"无法读取翻译覆盖文件 {path}: {err}") from err
+    sections = _parse_override_file(path, raw)
+    content_hash = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    with _lock:
+        _override_files[path] = (signature, content_hash, sections)
+    return content_hash, sections
+
+
+def translation_map(section, override_path=None):
+    """返回区段的翻译表；有覆盖文件时返回内置表叠加覆盖条目后的新表，同一内容返回同一个对象。"""
+    base = builtin_map(section)
+    if not override_path:
+        return base
+    content_hash, sections = load_override_file(override_path)
+    overrides = sections.get(section)
+    if not overrides:
+        return base
+    with _lock:
+        merged = _merged_maps.get((section, content_hash))
+        if merged is None:
+            merged = _merged_maps[(section, content_hash)] = {**base, **overrides}
+    return merged
+
+
+def cached_derivative(name, mapping, build, verify=False):
+    """返回由翻译表派生的对象（如预编译表、查找索引），按 (name, 内容哈希) 在模块级缓存。
+
+    平时按对象身份命中，不重复计算哈希；verify=True 时重新计算哈希，翻译表被原地修改后会重新构建。
+    build 接收内容哈希并返回派生对象。
+    """
+    id_key = (name, id(mapping))
+    with _lock:
+        entry = _derived_by_id.get(id_key)
+    if entry and entry[0] is mapping and not verify:
+        return entry[2]
+
+    content_hash = mapping_hash(mapping)
+    if entry and entry[0] is mapping and entry[1] == content_hash:
+        return entry[2]
+    with _lock:
+        value = _derived_by_hash.get((name, content_hash))
+    if value is None:
+        value = build(content_hash)
+        with _lock:
+            value = _derived_by_hash.setdefault((name, content_hash), value)
+    with _lock:
+        _derived_by_id[id_key] = (mapping, content_hash, value)
+    return value
@@ -0,0 +1,75 @@
+"""
+媒体服务器 HTTP 传输层：每个客户端独享一个带连接池的 requests.Session。
+"""
+
+import re
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+
+# Emby 的条目 ID 是数字，Jellyfin 是 32 位十六进制 GUID
+_ID_SEGMENT_PATTERN = re.compile(r'^(?:\d+|[0-9a-fA-F]{32}|[0-9a-fA-F-]{36})$')
+_API_PREFIXES = ('/emby',)
+
+
+def build_session(headers=None, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE):
+    """创建复用 TCP/TLS 连接的 Session。
+
+    重试由客户端自己的重试逻辑负责，因此适配器不做自动重试；
+    pool_block=False 保证并发超过连接池上限时仍然可以临时新建连接而不是阻塞。
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=max(1, int(pool_connections)),
+        pool_maxsize=max(1, int(pool_maxsize)),
+        max_retries=0,
+        pool_block=False,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def connection_stats(session):
+    """汇总 Session 中各连接池的请求数和新建连接数，用于计算连接复用率。"""
+    requests_sent = 0
+    new_connections = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()} if session is not None else {}
+    for adapter in adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        pools = getattr(pool_manager, 'pools', None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += getattr(pool, 'num_requests', 0)
+            new_connections += getattr(pool, 'num_connections', 0)
+
+    reused = max(0, requests_sent - new_connections)
+    return {
+        'requests': requests_sent,
+        'new_connections': new_connections,
+        'reused_connections': reused,
+        'reuse_rate': (reused / requests_sent) if requests_sent else 0.0,
+    }
+
+
+def endpoint_key(method, url, base_path=''):
+    """把请求归一成统计用的端点名，例如 GET /Users/{id}/Items/{id}。"""
+    path = urllib.parse.urlsplit(url).path or '/'
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path) :] or '/'
+    for prefix in _API_PREFIXES:
+        if path.lower().startswith(prefix + '/'):
+            path = path[len(prefix) :]
+            break
+    segments = ['{id}' if _ID_SEGMENT_PATTERN.match(segment) else segment for segment in path.split('/')]
+    return f"{str(method).upper()} {'/'.join(segments)}"
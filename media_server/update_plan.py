@@ -0,0 +1,110 @@
+"""
+离线更新计划：预扫描阶段把每个条目的字段变更写入 JSONL 计划文件，执行阶段按计划提交，
+并把已完成的条目追加到检查点文件，中断后从断点继续；计划可按条目 ID 分片到多次运行执行。
+"""
+
+import json
+import os
+import zlib
+
+PLAN_FORMAT_VERSION = 1
+
+
+def shard_of(item_id, shard_count):
+    """按条目 ID 的稳定哈希分片，同一条目在任何一次运行中都落在同一分片。"""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(str(item_id).encode('utf-8')) % shard_count
+
+
+class UpdatePlanError(Exception):
+    """计划文件不存在、损坏或与当前服务器不匹配"""
+
+
+class UpdatePlan:
+    """一个计划文件及其检查点文件（<计划文件>.done）。
+
+    计划第一行是头信息 {'format', 'kind', 'server_key', 'map_hash', 'created_utc'}，
+    之后每行一个条目 {'Id', 'Name', 'Type', 'Version', 'Changes': {字段: {'old', 'new'}}, 'GenreItems'}；
+    检查点每行 {'Id', 'status'}，只记录不需要再处理的条目。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.checkpoint_path = f"{path}.done"
+        self._checkpoint_file = None
+
+    def write(self, header, entries):
+        """原子写入计划并清除旧检查点，返回写入的条目数。"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        count = 0
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self._dumps({'format': PLAN_FORMAT_VERSION, **header}) + '\n')
+            for entry in entries:
+                f.write(self._dumps(entry) + '\n')
+                count += 1
+        os.replace(temp_path, self.path)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return count
+
+    @staticmethod
+    def _dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+    def read_header(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError) as err:
+            raise UpdatePlanError(f"无法读取更新计划 {self.path}: {err}") from err
+        if not isinstance(header, dict) or header.get('format') != PLAN_FORMAT_VERSION:
+            raise UpdatePlanError(f"更新计划格式不受支持: {self.path}")
+        return header
+
+    def iter_entries(self, shard_index=0, shard_count=1):
+        """按文件顺序产出属于指定分片的条目；损坏的行视为计划损坏。"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                f.readline()
+                for line_number, line in enumerate(f, start=2):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError as err:
+                        raise UpdatePlanError(f"更新计划第 {line_number} 行损坏: {err}") from err
+                    if shard_of(entry.get('Id'), shard_count) == shard_index:
+                        yield entry
+        except OSError as err:
+            raise UpdatePlanError(f"无法读取更新计划 {self.path}: {err}") from err
+
+    def completed(self):
+        """返回检查点中已完成的 {条目 ID: 状态}；进程中断时最后一行可能不完整，直接忽略。"""
+        done = {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and record.get('Id'):
+                        done[record['Id']] = record.get('status')
+        except OSError:
+            pass
+        return done
+
+    def mark_done(self, item_id, status):
+        """追加一条检查点并立即刷盘，保证中断后不会重复提交已完成的条目。"""
+        if self._checkpoint_file is None:
+            self._checkpoint_file = open(self.checkpoint_path, 'a', encoding='utf-8')
+        self._checkpoint_file.write(self._dumps({'Id': item_id, 'status': status}) + '\n')
+        self._checkpoint_file.flush()
+        os.fsync(self._checkpoint_file.fileno())
+
+    def close(self):
+        if self._checkpoint_file is not None:
+            self._checkpoint_file.close()
+            self._checkpoint_file = None
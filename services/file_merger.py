@@ -3,23 +3,29 @@ import os
 import shutil
 import threading
 
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
+
 
 class FileMerger:
     """
     文件合并器 - 将元数据文件夹中的文件合并到视频文件夹中
     """
 
-    def __init__(self, metadata_folder: str, target_folder: str, thread_count=4, logger=None):
+    def __init__(
+        self, metadata_folder: str, target_folder: str, thread_count=4, walk_workers=DEFAULT_WALK_WORKERS, logger=None
+    ):
         """
         初始化FileMerger类
         :param metadata_folder: 元数据文件夹路径（包含 nfo 等元数据文件）
         :param target_folder: 视频文件夹路径
         :param thread_count: 线程数（默认4）
+        :param walk_workers: 扫描文件夹时并发读取目录的线程数
         :param logger: 日志记录器
         """
         self.metadata_folder = metadata_folder
         self.target_folder = target_folder
         self.thread_count = thread_count
+        self.walk_workers = walk_workers
         self.logger = logger or logging.getLogger(__name__)
 
         # 计数器
@@ -57,19 +63,32 @@ class FileMerger:
         if not os.path.exists(folder_path):
             return result
 
-        for root, dirs, files in os.walk(folder_path):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(file_path, folder_path)
-                result.append(
-                    {'name': filename, 'path': file_path, 'rel_path': rel_path, 'stem': os.path.splitext(filename)[0]}
+        walker = ParallelWalker(
+            folder_path, workers=self.walk_workers, stop_flag=self.stop_flag, include_dirs=False
+        )
+        current_dir = None
+        for entry in walker:
+            # 同一目录的条目连续产出，每读完一个目录报告一次进度
+            if entry.parent != current_dir and current_dir is not None:
+                self._report_progress(
+                    callback,
+                    len(result),
+                    None,
+                    f"扫描 {folder_path}：已找到 {len(result)} 个候选文件",
                 )
-            self._report_progress(
-                callback,
-                len(result),
-                None,
-                f"扫描 {folder_path}：已找到 {len(result)} 个候选文件",
+            current_dir = entry.parent
+            rel_path = os.path.relpath(entry.path, folder_path)
+            result.append(
+                {'name': entry.name, 'path': entry.path, 'rel_path': rel_path, 'stem': os.path.splitext(entry.name)[0]}
             )
+        self._report_progress(
+            callback,
+            len(result),
+            None,
+            f"扫描 {folder_path}：已找到 {len(result)} 个候选文件",
+        )
+        # 并发遍历的产出顺序不固定，按相对路径排序保证匹配结果稳定
+        result.sort(key=lambda file_info: file_info['rel_path'])
         return result
 
     def match(self, metadata_files: list, target_files: list) -> list:
@@ -3,6 +3,8 @@ import queue
 import threading
 import time
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
 from utils.service_messages import print_message
 
 
@@ -14,12 +16,18 @@ class MetadataChecker:
         target_folder,
         allowed_extensions,
         thread_count=4,
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,
+        force_full_rescan=False,
     ):
         self.cloud_path = cloud_path
         self.source_folder = source_folder
         self.target_folder = target_folder
         self.allowed_extensions = allowed_extensions
         self.thread_count = thread_count
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
         self.total_num = 0
         self.broken_num = 0
         self.metadata_queue = queue.Queue()
@@ -40,11 +48,23 @@ class MetadataChecker:
             print_message(f"检查元数据时出错: {metadata}, 错误: {e}")
 
     def get_metadata_files(self):
-        for root, dirs, files in os.walk(self.target_folder):
-            for name in files:
-                if name.endswith(self.allowed_extensions):
-                    metadata_path = os.path.join(root, name)
-                    yield metadata_path
+        snapshot = open_dir_snapshot(self.dir_snapshot, print_message)
+        walker = ParallelWalker(
+            self.target_folder,
+            workers=self.walk_workers,
+            include_dirs=False,
+            snapshot=snapshot,
+            force_full=self.force_full_rescan,
+        )
+        try:
+            for entry in walker:
+                if entry.name.endswith(self.allowed_extensions):
+                    yield entry.path
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if snapshot is not None:
+            print_message(walker.snapshot_report())
 
     def process_metadata_in_thread(self, thread_name):
         while True:
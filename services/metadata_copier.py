@@ -6,6 +6,9 @@ import threading
 import time
 from typing import List
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
+
 
 class MetadataCopier:
     def __init__(
@@ -16,6 +19,9 @@ class MetadataCopier:
         thread_count=1,
         only_tvshow_nfo=False,
         overwrite_existing=False,
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,
+        force_full_rescan=False,
         logger=None,
     ):
         """
@@ -26,6 +32,9 @@ class MetadataCopier:
             allowed_extensions: 允许的文件扩展名
             thread_count: 线程数
             overwrite_existing: 已存在元数据文件时是否覆盖
+            walk_workers: 扫描源文件夹时并发读取目录的线程数
+            dir_snapshot: 目录快照文件路径，只重新读取修改时间变化的目录
+            force_full_rescan: 忽略目录快照，全部重新读取
             logger: 日志记录器
         """
         self.source_folders = source_folders
@@ -37,6 +46,9 @@ class MetadataCopier:
         self.file_queue = queue.Queue()
         self.only_tvshow_nfo = only_tvshow_nfo
         self.overwrite_existing = overwrite_existing
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
         self.overwritten_metadatas = 0
         self.logger = logger or logging.getLogger(__name__)
         self._counter_lock = threading.Lock()  # 线程锁保护计数器
@@ -123,67 +135,48 @@ class MetadataCopier:
 
     def get_source_files(self):
         """遍历所有源文件夹获取符合条件的文件"""
-        visited_dirs = set()  # 用于检测循环符号链接
-
-        def scan_directory(directory, root_directory=None):
-            if self.stop_flag.is_set():
-                return iter([])
-
-            if root_directory is None:
-                self.logger.error("scan_directory root_directory 值未设置")
-                return iter([])
 
-            # 获取目录的绝对路径和真实路径（用于检测符号链接）
-            real_path = os.path.realpath(directory)
-            if real_path in visited_dirs:
-                self.logger.warning(f"检测到循环符号链接或重复目录，跳过: {directory}")
-                return iter([])
-            visited_dirs.add(real_path)
+        def has_tvshow_nfo(_directory, entries):
+            # 找到 tvshow.nfo 的目录不需要再检查其中的子文件夹
+            return any(entry.is_file() and entry.name.lower() == "tvshow.nfo" for entry in entries)
 
-            self.logger.info(f"开始扫描文件夹: {directory}")
-
-            files = []  # 用于存储文件条目
-            directories = []  # 用于存储目录条目
-
-            try:
-                with os.scandir(directory) as it:
-                    for entry in it:
-                        if entry.is_file():
-                            files.append(entry)
-                        elif entry.is_dir(follow_symlinks=False):  # 不跟随符号链接
-                            directories.append(entry)
-            except OSError as e:
-                self.logger.error(f"访问目录时发生错误: {e}")
-
-            # 先处理文件
-            for file_entry in files:
-                if self.stop_flag.is_set():
-                    return
-                if self.only_tvshow_nfo and (file_entry.name.lower() == "tvshow.nfo"):
-                    self.logger.info(f"发现文件: {file_entry.path}")
-                    yield file_entry.path, directory, root_directory
-                    return  # 如果找到 tvshow.nfo，直接返回,不需要再检查其他同一级的文件或文件夹
-                elif (not self.only_tvshow_nfo) and (file_entry.name.lower().endswith(self.metadata_extensions)):
-                    yield file_entry.path, directory, root_directory
-            # 再处理目录
-            for dir_entry in directories:
+        snapshot = open_dir_snapshot(self.dir_snapshot, self.logger.warning)
+        try:
+            for source_folder in self.source_folders:
                 if self.stop_flag.is_set():
+                    self.logger.info("元数据扫描已停止")
                     return
-                yield from scan_directory(dir_entry.path, root_directory)
 
-        for source_folder in self.source_folders:
-            if self.stop_flag.is_set():
-                self.logger.info("元数据扫描已停止")
-                return
-
-            if not os.path.exists(source_folder):
-                self.logger.warning(f"源文件夹不存在: {source_folder}")
-                continue
-
-            self.logger.info(f"扫描源文件夹: {source_folder}")
-            visited_dirs.clear()  # 每个源文件夹清空visited集合
-            root_directory = source_folder
-            yield from scan_directory(source_folder, root_directory)
+                if not os.path.exists(source_folder):
+                    self.logger.warning(f"源文件夹不存在: {source_folder}")
+                    continue
+
+                self.logger.info(f"扫描源文件夹: {source_folder}")
+                walker = ParallelWalker(
+                    source_folder,
+                    workers=self.walk_workers,
+                    prune=has_tvshow_nfo if self.only_tvshow_nfo else None,
+                    stop_flag=self.stop_flag,
+                    include_dirs=False,
+                    onerror=lambda e: self.logger.error(f"访问目录时发生错误: {e}"),
+                    snapshot=snapshot,
+                    force_full=self.force_full_rescan,
+                )
+                for entry in walker:
+                    if not entry.is_file():
+                        continue
+                    name = entry.name.lower()
+                    if self.only_tvshow_nfo and name == "tvshow.nfo":
+                        self.logger.info(f"发现文件: {entry.path}")
+                        yield entry.path, entry.parent, source_folder
+                    elif (not self.only_tvshow_nfo) and name.endswith(self.metadata_extensions):
+                        yield entry.path, entry.parent, source_folder
+                self.logger.info(f"已扫描 {walker.dirs_scanned} 个文件夹: {source_folder}")
+                if snapshot is not None:
+                    self.logger.info(walker.snapshot_report())
+        finally:
+            if snapshot is not None:
+                snapshot.close()
 
     def run(self, callback=None):
         def run_meta_copy_check():
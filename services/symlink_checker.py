@@ -4,16 +4,31 @@ import threading
 import time
 import urllib.parse
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
 from utils.service_messages import SYMLINK_NAME_BY_MODE, print_message
 
 
 class SymlinkChecker:
-    def __init__(self, cloud_path, source_folder, target_folder, symlink_mode, thread_count=4):
+    def __init__(
+        self,
+        cloud_path,
+        source_folder,
+        target_folder,
+        symlink_mode,
+        thread_count=4,
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,
+        force_full_rescan=False,
+    ):
         self.cloud_path = cloud_path
         self.source_folder = source_folder
         self.target_folder = target_folder
         self.symlink_mode = symlink_mode
         self.thread_count = thread_count
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
         self.total_num = 0
         self.broken_num = 0
         self.symlink_name = SYMLINK_NAME_BY_MODE.get(self.symlink_mode)
@@ -64,17 +79,30 @@ class SymlinkChecker:
             return False
 
     def get_symlink_files(self):
-        for root, dirs, files in os.walk(self.target_folder):
-            for name in files:
-                link_path = os.path.join(root, name)
+        snapshot = open_dir_snapshot(self.dir_snapshot, print_message)
+        walker = ParallelWalker(
+            self.target_folder,
+            workers=self.walk_workers,
+            include_dirs=False,
+            snapshot=snapshot,
+            force_full=self.force_full_rescan,
+        )
+        try:
+            for entry in walker:
+                link_path = entry.path
                 # symlink模式和strm模式只能留下对应的文件
                 if (self.symlink_mode == "symlink" and link_path.lower().endswith(".strm")) or (
-                    self.symlink_mode == "strm" and os.path.islink(link_path)
+                    self.symlink_mode == "strm" and entry.is_symlink()
                 ):
                     os.remove(link_path)
                     continue
-                if os.path.islink(link_path) or link_path.lower().endswith(".strm"):
+                if entry.is_symlink() or link_path.lower().endswith(".strm"):
                     yield link_path
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if snapshot is not None:
+            print_message(walker.snapshot_report())
 
     def process_symlinks_in_thread(self, thread_name):
         while True:
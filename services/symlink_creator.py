@@ -4,6 +4,8 @@ import threading
 import time
 import urllib.parse
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
 from utils.service_messages import SYMLINK_NAME_BY_MODE
 
 
@@ -29,11 +31,16 @@ class SymlinkCreator:
         cloud_url=None,
         progress_interval=100,
         progress_seconds=2.0,
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,
+        force_full_rescan=False,
         logger=None,
     ):
         """
         初始化 SymlinkCreator
         progress_interval/progress_seconds 控制扫描和创建阶段的进度日志频率。
+        walk_workers 为扫描源文件夹时并发读取目录的线程数。
+        dir_snapshot 为目录快照文件路径，只重新读取修改时间变化的目录；force_full_rescan 时全部重新读取。
         """
         self.link_folders = link_folders or []
         self.target_folder = target_folder
@@ -50,6 +57,9 @@ class SymlinkCreator:
         self.cloud_url = cloud_url
         self.progress_interval = progress_interval
         self.progress_seconds = progress_seconds
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
 
         self.logger = logger or logging.getLogger(__name__)
 
@@ -130,12 +140,22 @@ class SymlinkCreator:
             self._last_scan_total_files = scanned_count
             return result
 
-        for root, dirs, files in os.walk(folder_path):
-            for filename in files:
-                file_path = os.path.join(root, filename)
+        snapshot = open_dir_snapshot(self.dir_snapshot, self.logger.warning)
+        walker = ParallelWalker(
+            folder_path,
+            workers=self.walk_workers,
+            stop_flag=self.stop_flag,
+            include_dirs=False,
+            snapshot=snapshot,
+            force_full=self.force_full_rescan,
+        )
+        try:
+            for entry in walker:
                 # 跳过符号链接
-                if os.path.islink(file_path):
+                if entry.is_symlink():
                     continue
+                filename = entry.name
+                file_path = entry.path
                 scanned_count += 1
                 ext = os.path.splitext(filename)[1].lower()
 
@@ -162,6 +182,13 @@ class SymlinkCreator:
                         None,
                         f"扫描进度: 已扫描 {scanned_count} 个文件，匹配 {len(result)} 个{self.symlink_name}候选",
                     )
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if snapshot is not None:
+            self.logger.info(f"{folder_path} {walker.snapshot_report()}")
+        # 并发遍历的产出顺序不固定，按相对路径排序保证创建顺序稳定
+        result.sort(key=lambda file_info: file_info['rel_path'])
         self._last_scan_total_files = scanned_count
         return result
 
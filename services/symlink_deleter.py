@@ -3,6 +3,8 @@ import os
 import threading
 import time
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
 from utils.service_messages import SYMLINK_NAME_BY_MODE
 
 
@@ -11,8 +13,14 @@ class SymlinkDeleter:
         self,
         target_folder,
         logger=None,  # 添加logger参数
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,  # 目录快照文件路径，只重新读取修改时间变化的目录
+        force_full_rescan=False,
     ):
         self.target_folder = target_folder
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
         self.logger = logger or logging.getLogger(__name__)  # 使用传递的logger
         self.symlink_name = SYMLINK_NAME_BY_MODE.get("symlink")
         self.stop_flag = threading.Event()
@@ -38,20 +46,28 @@ class SymlinkDeleter:
         self.logger.info(f"开始删除{self.symlink_name}...")
 
         # 遍历目录中的所有文件
-        for root, _, files in os.walk(self.target_folder):
-            if self.stop_flag.is_set():
-                self.logger.info(f"删除{self.symlink_name}操作已停止")
-                break
-
-            for file in files:
-                if self.stop_flag.is_set():
-                    self.logger.info(f"删除{self.symlink_name}操作已停止")
-                    break
-
-                file_path = os.path.join(root, file)
+        snapshot = open_dir_snapshot(self.dir_snapshot, self.logger.warning)
+        walker = ParallelWalker(
+            self.target_folder,
+            workers=self.walk_workers,
+            stop_flag=self.stop_flag,
+            include_dirs=False,
+            snapshot=snapshot,
+            force_full=self.force_full_rescan,
+        )
+        try:
+            for entry in walker:
                 # 检查是否为符号链接
-                if os.path.islink(file_path):
-                    links.append(file_path)
+                if entry.is_symlink():
+                    links.append(entry.path)
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if snapshot is not None:
+            self.logger.info(walker.snapshot_report())
+        if self.stop_flag.is_set():
+            self.logger.info(f"删除{self.symlink_name}操作已停止")
+        links.sort()
 
         if callback:
             self._report_progress(callback, 0, len(links), f"开始删除{self.symlink_name}：共 {len(links)} 个")
@@ -4,15 +4,30 @@ import shutil
 import threading
 import time
 
+from utils.dir_snapshot import open_dir_snapshot
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
 from utils.service_messages import print_message
 
 
 class SymlinkDirChecker:
-    def __init__(self, cloud_path, source_root, target_root, thread_count=8, timeout_seconds=300):
+    def __init__(
+        self,
+        cloud_path,
+        source_root,
+        target_root,
+        thread_count=8,
+        timeout_seconds=300,
+        walk_workers=DEFAULT_WALK_WORKERS,
+        dir_snapshot=None,
+        force_full_rescan=False,
+    ):
         self.cloud_path = cloud_path
         self.source_root = source_root
         self.target_root = target_root
         self.thread_count = thread_count
+        self.walk_workers = walk_workers
+        self.dir_snapshot = dir_snapshot
+        self.force_full_rescan = force_full_rescan
         self.timeout_seconds = timeout_seconds
         self.error_dirs_num = 0
         self.total_num = 0
@@ -46,10 +61,22 @@ class SymlinkDirChecker:
             thread.join()
 
     def get_dirs(self):
-        for root, dirnames, __ in os.walk(self.source_root):
-            for dirname in dirnames:
-                dir_path = os.path.join(root, dirname)
-                yield dir_path
+        snapshot = open_dir_snapshot(self.dir_snapshot, print_message)
+        walker = ParallelWalker(
+            self.source_root,
+            workers=self.walk_workers,
+            snapshot=snapshot,
+            force_full=self.force_full_rescan,
+        )
+        try:
+            for entry in walker:
+                if entry.is_dir():
+                    yield entry.path
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if snapshot is not None:
+            print_message(walker.snapshot_report())
 
     def run(self):
         start_time = time.time()
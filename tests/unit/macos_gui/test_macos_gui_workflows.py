@@ -498,6 +498,40 @@ def test_emby_tabs_call_operator_methods(qapp, isolated_config, tmp_path, monkey
     ]
 
 
+def test_genre_tab_plans_and_applies_metadata_updates(qapp, isolated_config, tmp_path, monkeypatch):
+    from macos_gui.genre_update_tab import GenreUpdateTab
+    from media_server.client import MediaServerClient
+    from utils.config import Config
+
+    calls = []
+
+    def fake_plan(self, plan_path, callback=None):
+        calls.append(("plan", plan_path))
+
+    def fake_apply(self, plan_path, callback=None, shard_index=0, shard_count=1):
+        calls.append(("apply", plan_path, shard_index, shard_count))
+
+    monkeypatch.setattr(MediaServerClient, "plan_metadata_update", fake_plan)
+    monkeypatch.setattr(MediaServerClient, "apply_metadata_plan", fake_apply)
+    config = Config()
+    config.set('genre_update', 'plan_shard_count', 2)
+    config.set('genre_update', 'plan_shard_index', 1)
+
+    tab = GenreUpdateTab(str(tmp_path / "logs"))
+    tab.edit_url.setText("http://emby.local")
+    tab.edit_api.setText("api")
+    tab.edit_user.setText("user")
+    tab.plan_metadata()
+    assert wait_until(qapp, lambda: len(calls) >= 1)
+    assert wait_for_tab_idle(qapp, tab)
+    tab.apply_plan()
+    assert wait_until(qapp, lambda: len(calls) >= 2)
+    assert wait_for_tab_idle(qapp, tab)
+
+    plan_path = os.path.join(str(tmp_path), "cache", "metadata_update_plan.jsonl")
+    assert calls == [("plan", plan_path), ("apply", plan_path, 1, 2)]
+
+
 def test_qt_slot_exception_guard_logs_instead_of_raising(qapp, isolated_config, tmp_path, monkeypatch):
     import macos_gui.file_merge_tab as merge_module
     from macos_gui.file_merge_tab import FileMergeTab
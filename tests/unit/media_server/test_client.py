@@ -63,18 +63,28 @@ class FakeResponse:
             raise requests.exceptions.HTTPError(f"status code: {self.status_code}")
 
 
+def patch_session_request(monkeypatch, fake_request):
+    """把客户端连接池 Session 的请求转发给测试桩。"""
+
+    def session_request(_session, method, url, **kwargs):
+        return fake_request(method, url, **kwargs)
+
+    monkeypatch.setattr('media_server.client.requests.Session.request', session_request)
+
+
 class TestMediaServerClientServerType:
     """测试 Emby/Jellyfin 服务器类型选择和校验"""
 
     def test_validate_server_type_stops_on_mismatch(self, monkeypatch):
         from media_server.client import MediaServerClient
 
-        def fake_get(url, timeout=10):
+        def fake_request(method, url, **kwargs):
+            assert method == 'get'
             if url.endswith('/System/Info/Public'):
                 return FakeResponse(payload={'ProductName': 'Jellyfin Server'})
             return FakeResponse(status_code=404)
 
-        monkeypatch.setattr('media_server.client.requests.get', fake_get)
+        patch_session_request(monkeypatch, fake_request)
         operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key', server_type='emby')
 
         with pytest.raises(RuntimeError, match='服务器类型选择不一致'):
@@ -89,7 +99,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key', server_type='jellyfin')
 
         operator.merge_movie_versions(
@@ -115,7 +125,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key', server_type='emby')
 
         operator.merge_movie_versions(
@@ -151,7 +161,7 @@ class TestMediaServerClientServerType:
             {'Id': 'av-2', 'Name': 'AARM-009-C', 'ProviderIds': {'Num': 'AARM-009'}, 'Path': '/path/AARM-009-C.mp4'},
             {'Id': 'solo-1', 'Name': 'Movie B', 'ProviderIds': {'Tmdb': '67890'}, 'Path': '/path/movie-b.mkv'},
         ]
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         result = operator.merge_versions(lambda message: None)
 
@@ -178,14 +188,45 @@ class TestMediaServerClientServerType:
             {'Id': 'tmdb-2', 'Name': 'Movie A 4K', 'ProviderIds': {'Tmdb': '12345'}, 'Path': '/path/movie-a-4k.mkv'},
             {'Id': 'solo-1', 'Name': 'Movie B', 'ProviderIds': {'Tmdb': '67890'}, 'Path': '/path/movie-b.mkv'},
         ]
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         with caplog.at_level('INFO'):
             result = operator.merge_versions(lambda message: None)
 
         assert [request[2]['params']['Ids'] for request in requests_made] == ['tmdb-1,tmdb-2']
         assert [movie['Id'] for movie in result] == ['tmdb-1']
-        assert '未发现 AV 番号数据，跳过 AV 合并' in caplog.text
+        assert '重复分组：1 组' in caplog.text
+        assert '分组大小分布：2 部 × 1' in caplog.text
+
+    def test_merge_versions_merges_items_linked_through_different_providers_once(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        requests_made = []
+
+        def fake_request(method, url, **kwargs):
+            requests_made.append((method, url, kwargs))
+            return FakeResponse(status_code=204)
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            server_type='emby',
+            tuning={'merge_providers': 'Tmdb,Imdb,num'},
+        )
+        operator.validate_server_type = lambda: True
+        operator._start_background_task = lambda target, task_name: target()
+        operator.get_movie_media = lambda: [
+            {'Id': 'a', 'Name': 'Movie', 'ProviderIds': {'Tmdb': '100'}},
+            {'Id': 'b', 'Name': 'Movie 4K', 'ProviderIds': {'Tmdb': '100', 'Imdb': 'tt0100'}},
+            {'Id': 'c', 'Name': 'Movie Remux', 'ProviderIds': {'IMDB': 'tt0100', 'num': 'abc-001'}},
+            {'Id': 'd', 'Name': 'ABC-001-C', 'ProviderIds': {'Num': 'ABC-001'}},
+        ]
+        patch_session_request(monkeypatch, fake_request)
+
+        result = operator.merge_versions(lambda _message: None)
+
+        assert [request[2]['params']['Ids'] for request in requests_made] == ['a,b,c,d']
+        assert [movie['Id'] for movie in result] == ['a']
 
     def test_jellyfin_merge_skips_historical_groups_and_deduplicates_tmdb_and_num(self, monkeypatch):
         from media_server.client import MediaServerClient
@@ -229,7 +270,7 @@ class TestMediaServerClientServerType:
                 'ProviderIds': {'Tmdb': '200', 'Num': 'NEW-200'},
             },
         ]
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         result = operator.merge_versions(lambda _message: None)
 
@@ -245,7 +286,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         MediaServerClient(
             server_url='http://localhost:8096', api_key='test-api-key', server_type='emby'
@@ -266,7 +307,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         MediaServerClient(
             server_url='http://localhost:8096', api_key='test-api-key', server_type='emby'
@@ -291,7 +332,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
 
         item = {
             'Name': 'Movie',
@@ -323,7 +364,7 @@ class TestMediaServerClientServerType:
                 raise requests.exceptions.ReadTimeout('slow update')
             return FakeResponse(status_code=204)
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         monkeypatch.setattr('media_server.client.time.sleep', lambda seconds: None)
 
         response = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')._post_item_update(
@@ -343,7 +384,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             raise requests.exceptions.ReadTimeout('slow update')
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         monkeypatch.setattr('media_server.client.time.sleep', lambda seconds: None)
 
         response = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')._post_item_update(
@@ -395,7 +436,7 @@ class TestMediaServerClientServerType:
                 ]
             )
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         operator = MediaServerClient(
             server_url='http://localhost:8096', api_key='test-api-key', username='wiz', server_type='jellyfin'
         )
@@ -413,7 +454,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             return FakeResponse(payload={'Id': 'movie1', 'Name': 'Movie'})
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         operator = MediaServerClient(
             server_url='http://localhost:8096', api_key='test-api-key', username='wiz', server_type='jellyfin'
         )
@@ -432,7 +473,7 @@ class TestMediaServerClientServerType:
             requests_made.append((method, url, kwargs))
             raise requests.exceptions.ReadTimeout('slow detail')
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         monkeypatch.setattr('media_server.client.time.sleep', lambda seconds: None)
         operator = MediaServerClient(
             server_url='http://localhost:8096', api_key='test-api-key', username='wiz', server_type='jellyfin'
@@ -480,7 +521,7 @@ class TestMediaServerClientServerType:
         def fail_emby_detail(item_id):
             pytest.fail('Jellyfin 更新流派不应该调用 Emby 用户详情接口')
 
-        monkeypatch.setattr('media_server.client.requests.request', fake_request)
+        patch_session_request(monkeypatch, fake_request)
         monkeypatch.setattr(operator, 'emby_get_item_info', fail_emby_detail)
         monkeypatch.setattr(
             operator,
@@ -1139,6 +1180,218 @@ class TestMediaServerClientServerType:
         assert len(requested_params) == 2
         assert {params['MinDateLastSaved'] for params in requested_params} == {'2026-07-15T11:55:00Z'}
 
+    def test_metadata_update_reads_and_posts_each_item_once(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        movies = [
+            {'Id': 'both', 'Name': 'Both', 'Genres': ['Action'], 'GenreItems': [], 'ProductionLocations': ['usa']},
+            {'Id': 'genre', 'Name': 'Genre', 'Genres': ['Drama'], 'GenreItems': [], 'ProductionLocations': ['美国']},
+            {'Id': 'country', 'Name': 'Country', 'Genres': ['剧情'], 'GenreItems': [], 'ProductionLocations': ['jpn']},
+            {'Id': 'clean', 'Name': 'Clean', 'Genres': ['剧情'], 'GenreItems': [], 'ProductionLocations': ['日本']},
+        ]
+        requested_params = []
+        monkeypatch.setattr(
+            operator,
+            '_get_genre_update_items',
+            lambda _item_type, params: requested_params.append(params) or [dict(item) for item in movies],
+        )
+        reads = []
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: reads.append(item_id) or dict(next(item for item in movies if item['Id'] == item_id)),
+        )
+        updates = {}
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: updates.setdefault(item_id, item) and FakeResponse(status_code=204),
+        )
+
+        updated = operator._translate_items_metadata_and_update("影片", 'Movie', {'Action': '动作', 'Drama': '剧情'})
+
+        assert len(requested_params) == 1
+        assert 'ProductionLocations' in requested_params[0]['Fields']
+        assert sorted(reads) == ['both', 'country', 'genre']
+        assert sorted(item['Id'] for item in updated) == ['both', 'country', 'genre']
+        assert updates['both']['Genres'] == ['动作']
+        assert updates['both']['ProductionLocations'] == ['美国']
+        assert updates['genre']['Genres'] == ['剧情']
+        assert updates['country']['ProductionLocations'] == ['日本']
+
+    def test_update_metadata_sync_state_covers_both_maps(self, monkeypatch):
+        from media_server.client import MediaServerClient
+        from media_server.country_maps import COUNTRY_TRANSLATIONS
+        from media_server.genre_maps import MOVIE_GENRE_TRANSLATIONS, TV_GENRE_TRANSLATIONS
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            username='wiz',
+            server_type='jellyfin',
+        )
+        monkeypatch.setattr(operator, 'validate_server_type', lambda: None)
+        requested_params = []
+        monkeypatch.setattr(
+            operator,
+            '_get_genre_update_items',
+            lambda _item_type, params: requested_params.append(params.copy()) or [],
+        )
+        genre_only_state = {
+            'server_key': operator._sync_server_key(),
+            'map_hash': operator._stable_mapping_hash(
+                {'movies': MOVIE_GENRE_TRANSLATIONS, 'series': TV_GENRE_TRANSLATIONS}
+            ),
+            'last_scan_utc': '2026-07-15T12:00:00Z',
+        }
+        saved_states = []
+
+        thread = operator.update_metadata(sync_state=genre_only_state, state_callback=saved_states.append)
+        thread.join(timeout=2)
+
+        assert not thread.is_alive()
+        assert all('MinDateLastSaved' not in params for params in requested_params)
+        assert saved_states[0]['map_hash'] == operator._stable_mapping_hash(
+            {'movies': MOVIE_GENRE_TRANSLATIONS, 'series': TV_GENRE_TRANSLATIONS, 'countries': COUNTRY_TRANSLATIONS}
+        )
+
+        requested_params.clear()
+        thread = operator.update_metadata(sync_state=saved_states[0])
+        thread.join(timeout=2)
+
+        assert len(requested_params) == 2
+        assert all('MinDateLastSaved' in params for params in requested_params)
+
+
+class TestMediaServerClientConcurrentUpdates:
+    """测试流派/地区更新的并发详情读取与提交"""
+
+    def test_concurrent_genre_update_keeps_candidate_order(self, monkeypatch):
+        import threading
+
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 4}
+        )
+        movies = [
+            {'Id': f'movie-{index}', 'Name': f'Movie {index}', 'Genres': ['Action'], 'GenreItems': []}
+            for index in range(20)
+        ]
+        monkeypatch.setattr(operator, '_get_genre_update_items', lambda _item_type, _params: list(movies))
+        worker_threads = set()
+
+        def fake_detail(item_id):
+            worker_threads.add(threading.current_thread().name)
+            time.sleep(0.005 if item_id.endswith('0') else 0)
+            return {'Id': item_id, 'Name': item_id, 'Genres': ['Action'], 'GenreItems': []}
+
+        monkeypatch.setattr(operator, 'get_item_info', fake_detail)
+        posted = []
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: posted.append(item_id) or FakeResponse(status_code=204),
+        )
+
+        updated_movies = operator.emby_movie_translate_genres_and_update_whole_item()
+
+        assert [movie['Id'] for movie in updated_movies] == [movie['Id'] for movie in movies]
+        assert sorted(posted) == sorted(movie['Id'] for movie in movies)
+        assert all(movie['Genres'] == ['动作'] for movie in updated_movies)
+        assert len(worker_threads) > 1
+        assert operator._sync_had_errors is False
+
+    def test_concurrent_country_update_stops_dispatching_after_stop_flag(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 2}
+        )
+        movies = [
+            {'Id': f'movie-{index}', 'Name': f'Movie {index}', 'ProductionLocations': ['Japan']}
+            for index in range(50)
+        ]
+        monkeypatch.setattr(operator, '_get_genre_update_items', lambda _item_type, _params: list(movies))
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: {'Id': item_id, 'Name': item_id, 'ProductionLocations': ['Japan']},
+        )
+        posted = []
+
+        def fake_post(item_id, item):
+            posted.append(item_id)
+            operator.stop_flag.set()
+            return FakeResponse(status_code=204)
+
+        monkeypatch.setattr(operator, '_post_item_update', fake_post)
+
+        updated_movies = operator.emby_movie_translate_countries_and_update_whole_item()
+
+        assert 1 <= len(posted) <= 4
+        assert sorted(movie['Id'] for movie in updated_movies) == sorted(posted)
+
+    def test_concurrent_detail_failures_mark_sync_error(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 3}
+        )
+        movies = [
+            {'Id': f'movie-{index}', 'Name': f'Movie {index}', 'Genres': ['Action'], 'GenreItems': []}
+            for index in range(6)
+        ]
+        monkeypatch.setattr(operator, '_get_genre_update_items', lambda _item_type, _params: list(movies))
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: None
+            if item_id == 'movie-3'
+            else {'Id': item_id, 'Name': item_id, 'Genres': ['Action'], 'GenreItems': []},
+        )
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: FakeResponse(status_code=204),
+        )
+
+        updated_movies = operator.emby_movie_translate_genres_and_update_whole_item()
+
+        assert [movie['Id'] for movie in updated_movies] == ['movie-0', 'movie-1', 'movie-2', 'movie-4', 'movie-5']
+        assert operator._sync_had_errors is True
+
+    def test_concurrent_stale_snapshot_still_triggers_single_rescan(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 4}
+        )
+        stale_movies = [
+            {'Id': f'movie-{index}', 'Name': f'Movie {index}', 'Genres': ['Action'], 'GenreItems': []}
+            for index in range(300)
+        ]
+        listings = []
+        monkeypatch.setattr(
+            operator,
+            '_get_genre_update_items',
+            lambda _item_type, _params: listings.append(1) or list(stale_movies),
+        )
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: {'Id': item_id, 'Name': item_id, 'Genres': ['动作'], 'GenreItems': []},
+        )
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: pytest.fail('详情无需更新时不应提交'),
+        )
+
+        assert operator.emby_movie_translate_genres_and_update_whole_item() == []
+        assert len(listings) == 2
+
 
 class TestMediaServerClientExtractTmdbid:
     """测试 extract_tmdbid_from_nfo 方法"""
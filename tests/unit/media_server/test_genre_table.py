@@ -0,0 +1,112 @@
+"""
+media_server.genre_table 模块单元测试
+"""
+
+import pytest
+
+
+def reference_resolve(client, genre, genres_map, index):
+    """预编译前逐次查表的解析实现，用于验证编译结果与原行为一致。"""
+
+    def lookup_key(current, allow_normalized_index):
+        if current in genres_map:
+            return current
+        normalized = client._normalize_genre_lookup_name(current)
+        if normalized in genres_map:
+            return normalized
+        if not allow_normalized_index:
+            return None
+        return index.get(normalized)
+
+    current = client._clean_genre_name(genre)
+    seen = set()
+    allow_normalized_index = True
+    while True:
+        key = lookup_key(current, allow_normalized_index)
+        if not key or key in seen:
+            return client._normalize_genre_name(current)
+        seen.add(key)
+        translated = client._normalize_genre_name(genres_map[key])
+        if translated == current:
+            return translated
+        current = translated
+        allow_normalized_index = False
+
+
+class TestCompileGenreMap:
+    """测试流派翻译表预编译"""
+
+    @pytest.mark.parametrize('map_name', ['MOVIE_GENRE_TRANSLATIONS', 'TV_GENRE_TRANSLATIONS'])
+    def test_compiled_table_matches_reference_resolution(self, map_name):
+        from media_server import genre_maps
+        from media_server.client import MediaServerClient
+
+        client = MediaServerClient()
+        genres_map = getattr(genre_maps, map_name)
+        table = client._compiled_genre_table(genres_map)
+
+        samples = set()
+        for source in list(genres_map) + list(genres_map.values()):
+            samples.update({source, f"  {source} ", source.upper(), source.lower(), source.replace(' ', '  ')})
+        samples.update({'Unknown Genre', '', '  Sci-Fi   &   Fantasy  '})
+        index = {}
+        for key in genres_map:
+            index.setdefault(client._normalize_genre_lookup_name(key), key)
+
+        for genre in samples:
+            assert table.resolve(genre) == reference_resolve(client, genre, genres_map, index), genre
+
+    def test_chains_are_collapsed_and_cycles_reported(self):
+        from media_server.client import MediaServerClient
+
+        client = MediaServerClient()
+        genres_map = {'Doc': '纪录', '纪录': '纪录片', 'A': 'B', 'B': 'A', 'Sci': '科幻', 'Ｓｃｉ': '科幻片'}
+        table = client._compiled_genre_table(genres_map)
+
+        assert table.resolved['Doc'] == '纪录片'
+        assert table.resolve(' Doc ') == '纪录片'
+        assert table.report['collapsed_chains'] >= 1
+        assert table.report['cycles'] == [['A', 'B']]
+        assert table.report['conflicts'] == [('Ｓｃｉ', 'Sci', '科幻片', '科幻')]
+        assert table.resolve('Ｓｃｉ') == '科幻片'
+        assert table.resolve('Ｓｃｉ ') == '科幻片'
+        assert client._compiled_genre_table(genres_map) is table
+
+
+class TestGenreTranslationMemo:
+    """测试流派与流派列表翻译缓存"""
+
+    def test_bounded_memo_evicts_least_recently_used(self):
+        from media_server.genre_table import BoundedMemo
+
+        memo = BoundedMemo(2)
+        memo.get_or_compute('a', lambda: 1)
+        memo.get_or_compute('b', lambda: 2)
+        memo.get_or_compute('a', lambda: pytest.fail('应命中缓存'))
+        memo.get_or_compute('c', lambda: 3)
+
+        assert len(memo) == 2
+        assert memo.get_or_compute('a', lambda: 'recomputed') == 1
+        assert memo.get_or_compute('b', lambda: 'recomputed') == 'recomputed'
+        assert memo.hits == 2
+        assert memo.misses == 4
+
+    def test_scan_reuses_list_translation_and_drops_cache_when_map_changes(self):
+        from media_server.client import MediaServerClient
+
+        client = MediaServerClient()
+        genres_map = {'Action': '动作', 'Suspense': '悬疑'}
+        items = [{'Id': str(index), 'Genres': ['Action', '动作', 'Drama']} for index in range(10)]
+
+        candidates, changes, _checked, _stopped = client._collect_genre_update_candidates(items, genres_map, '电影')
+
+        assert len(candidates) == 10
+        assert changes == {('Action', '动作'): 10, ('重复或近似流派', '合并去重后的流派列表'): 10}
+        assert client._genre_memo_stats(genres_map)['list_hit_rate'] == pytest.approx(0.9)
+
+        genres_map['Drama'] = '剧情'
+        candidates, changes, _checked, _stopped = client._collect_genre_update_candidates(items, genres_map, '电影')
+
+        assert changes[('Drama', '剧情')] == 10
+        assert client._genre_memo_stats(genres_map)['list_entries'] == 1
+        assert client._translate_genres(['Drama'], genres_map) == ['剧情']
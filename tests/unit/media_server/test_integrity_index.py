@@ -0,0 +1,90 @@
+"""
+media_server.integrity_index 模块单元测试
+"""
+
+import os
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('')
+
+
+class TestStemIndex:
+    """测试单遍目录索引"""
+
+    def test_pairs_videos_and_nfo_in_memory(self, tmp_path):
+        from media_server.client import VIDEO_EXTENSIONS
+        from media_server.integrity_index import StemIndex
+
+        root = str(tmp_path)
+        touch(os.path.join(root, 'a', 'movie.mkv'))
+        touch(os.path.join(root, 'a', 'movie.nfo'))
+        touch(os.path.join(root, 'a', 'extra.MP4'))
+        touch(os.path.join(root, 'b', 'orphan.nfo'))
+        touch(os.path.join(root, 'b', 'tvshow.nfo'))
+        touch(os.path.join(root, 'b', 'c', 'linked.nfo'))
+        os.symlink(os.path.join(root, 'a', 'movie.mkv'), os.path.join(root, 'b', 'c', 'linked.mkv'))
+        touch(os.path.join(root, 'b', 'c', 'broken.nfo'))
+        os.symlink(os.path.join(root, 'missing.mkv'), os.path.join(root, 'b', 'c', 'broken.mkv'))
+
+        index = StemIndex.scan(root)
+
+        assert index.scanned_dirs == 4
+        assert sorted(index.videos(VIDEO_EXTENSIONS)) == [
+            (os.path.join(root, 'a', 'extra.MP4'), False),
+            (os.path.join(root, 'a', 'movie.mkv'), True),
+            (os.path.join(root, 'b', 'c', 'linked.mkv'), True),
+        ]
+        # 失效链接指向的视频不存在，对应的 NFO 按缺少视频报告
+        assert sorted(index.nfo_files(VIDEO_EXTENSIONS)) == [
+            (os.path.join(root, 'a', 'movie.nfo'), True),
+            (os.path.join(root, 'b', 'c', 'broken.nfo'), False),
+            (os.path.join(root, 'b', 'c', 'linked.nfo'), True),
+            (os.path.join(root, 'b', 'orphan.nfo'), False),
+        ]
+
+    def test_snapshot_scan_reports_video_whose_link_target_was_removed(self, tmp_path):
+        from media_server.client import VIDEO_EXTENSIONS
+        from media_server.integrity_index import StemIndex
+        from utils.dir_snapshot import DirectorySnapshot
+
+        root = str(tmp_path / 'lib')
+        touch(os.path.join(tmp_path, 'cloud', 'a.mkv'))
+        touch(os.path.join(root, 'a.nfo'))
+        os.symlink(os.path.join(tmp_path, 'cloud', 'a.mkv'), os.path.join(root, 'a.mkv'))
+        snapshot = DirectorySnapshot(str(tmp_path / 'dir_snapshot.sqlite3'))
+        assert list(StemIndex.scan(root, snapshot=snapshot).nfo_files(VIDEO_EXTENSIONS)) == [
+            (os.path.join(root, 'a.nfo'), True)
+        ]
+
+        os.remove(os.path.join(tmp_path, 'cloud', 'a.mkv'))
+        assert list(StemIndex.scan(root, snapshot=snapshot).nfo_files(VIDEO_EXTENSIONS)) == [
+            (os.path.join(root, 'a.nfo'), False)
+        ]
+        snapshot.close()
+
+    def test_check_metadata_integrity_walks_tree_once(self, tmp_path, monkeypatch):
+        from media_server.client import MediaServerClient
+        from media_server.integrity_index import StemIndex
+
+        root = str(tmp_path)
+        touch(os.path.join(root, 'a', 'movie.mkv'))
+        touch(os.path.join(root, 'b', 'orphan.nfo'))
+        scans = []
+        original_scan = StemIndex.scan.__func__
+
+        def counting_scan(cls, root_folder, *args, **kwargs):
+            scans.append(root_folder)
+            return original_scan(cls, root_folder, *args, **kwargs)
+
+        monkeypatch.setattr(StemIndex, 'scan', classmethod(counting_scan))
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        messages = []
+
+        operator.check_metadata_integrity(root, messages.append).join(timeout=5)
+
+        assert scans == [root]
+        assert '其中有 1 个视频文件没有找到对应的.nfo文件' in messages[-1]
+        assert '其中有 1 个nfo文件没有找到对应的视频文件' in messages[-1]
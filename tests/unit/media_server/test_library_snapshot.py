@@ -0,0 +1,127 @@
+"""
+media_server.library_snapshot 模块单元测试
+"""
+
+import os
+
+
+class TestLibrarySnapshot:
+    """测试媒体库快照的读写与合并"""
+
+    def test_round_trip_and_upsert(self, tmp_path):
+        from media_server.library_snapshot import LibrarySnapshot
+
+        snapshot = LibrarySnapshot.for_server(str(tmp_path), 'a' * 64)
+        assert snapshot.load() is False
+
+        snapshot.replace([{'Id': '1', 'Name': 'A', 'Type': 'Movie', 'ProviderIds': {'Tmdb': '10'}}, {'Name': '无 ID'}])
+        snapshot.save(100.0, '2026-07-15T12:00:00Z', full=True)
+
+        loaded = LibrarySnapshot.for_server(str(tmp_path), 'a' * 64)
+        assert loaded.load() is True
+        assert loaded.upsert([{'Id': '2', 'Name': 'B', 'Type': 'Series', 'ProviderIds': {'Imdb': 'tt2'}}]) == 1
+        assert loaded.media() == [
+            {'Id': '1', 'Name': 'A', 'Type': 'Movie', 'ProviderIds': {'Tmdb': '10'}},
+            {'Id': '2', 'Name': 'B', 'Type': 'Series', 'ProviderIds': {'Imdb': 'tt2'}},
+        ]
+        assert loaded.full_synced_at == 100.0
+        assert LibrarySnapshot.for_server(str(tmp_path), 'b' * 64).load() is False
+
+
+class TestMediaServerClientLibrarySnapshot:
+    """测试查重使用本地媒体库快照"""
+
+    def make_client(self, tmp_path, server_type='jellyfin', **tuning):
+        from media_server.client import MediaServerClient
+
+        return MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            username='wiz',
+            server_type=server_type,
+            cache_dir=str(tmp_path / 'cache'),
+            tuning=tuning,
+        )
+
+    def test_refreshes_incrementally_and_skips_server_within_ttl(self, tmp_path, monkeypatch):
+        requests_made = []
+
+        def fake_iter_items(include_item_types, fields, extra_params=None):
+            requests_made.append(extra_params)
+            if extra_params:
+                return iter([{'Id': '2', 'Name': 'New', 'ProviderIds': {'Tmdb': '20'}}])
+            return iter([{'Id': '1', 'Name': 'Old', 'ProviderIds': {'Tmdb': '10'}}])
+
+        first = self.make_client(tmp_path)
+        monkeypatch.setattr(first, '_iter_items', fake_iter_items)
+        assert [item['Id'] for item in first._library_media_for_duplicates()] == ['1']
+
+        second = self.make_client(tmp_path)
+        monkeypatch.setattr(second, '_iter_items', fake_iter_items)
+        assert sorted(item['Id'] for item in second._library_media_for_duplicates()) == ['1', '2']
+        assert requests_made[0] is None
+        assert 'MinDateLastSaved' in requests_made[1]
+
+        cached = self.make_client(tmp_path, library_snapshot_ttl=600)
+        monkeypatch.setattr(cached, '_iter_items', lambda *args: (_ for _ in ()).throw(AssertionError('不应访问服务器')))
+        assert len(cached._library_media_for_duplicates()) == 2
+
+    def test_emby_refresh_reads_newest_items_until_snapshot_time(self, tmp_path, monkeypatch):
+        requests_made = []
+        pages = [
+            {'Id': '3', 'Name': 'Newest', 'DateCreated': '2099-01-02T00:00:00.0000000Z', 'ProviderIds': {'Tmdb': '30'}},
+            {'Id': '1', 'Name': 'Old', 'DateCreated': '2000-01-01T00:00:00.0000000Z', 'ProviderIds': {'Tmdb': '10'}},
+        ]
+
+        def fake_iter_items(include_item_types, fields, extra_params=None):
+            requests_made.append(extra_params)
+            if extra_params:
+                yield from pages
+                raise AssertionError('读到早于快照时间的条目后不应继续分页')
+            yield {'Id': '1', 'Name': 'Old', 'ProviderIds': {'Tmdb': '10'}}
+
+        first = self.make_client(tmp_path, server_type='emby')
+        monkeypatch.setattr(first, '_iter_items', fake_iter_items)
+        first._library_media_for_duplicates()
+
+        second = self.make_client(tmp_path, server_type='emby')
+        monkeypatch.setattr(second, '_iter_items', fake_iter_items)
+        assert sorted(item['Id'] for item in second._library_media_for_duplicates()) == ['1', '3']
+        assert requests_made[1] == {'SortBy': 'DateCreated,Id', 'SortOrder': 'Descending'}
+
+    def test_check_duplicates_reads_snapshot_flag_from_tuning(self, tmp_path, monkeypatch):
+        calls = []
+        client = self.make_client(tmp_path, use_library_snapshot=True)
+        monkeypatch.setattr(client, '_library_media_for_duplicates', lambda: calls.append('snapshot') or [])
+        monkeypatch.setattr(client, 'get_all_media', lambda: calls.append('server') or [])
+
+        client.check_duplicates(str(tmp_path), lambda message: None).join(timeout=5)
+        assert calls == ['snapshot']
+
+        client.use_library_snapshot = False
+        client.check_duplicates(str(tmp_path), lambda message: None).join(timeout=5)
+        assert calls == ['snapshot', 'server']
+
+    def test_falls_back_to_snapshot_when_server_unreachable(self, tmp_path, monkeypatch):
+        from media_server.paging import ItemListingError
+
+        online = self.make_client(tmp_path)
+        monkeypatch.setattr(
+            online, '_iter_items', lambda *args: iter([{'Id': '1', 'ProviderIds': {'Tmdb': '42'}}])
+        )
+        online._library_media_for_duplicates()
+
+        def unreachable(*_args):
+            raise ItemListingError('读取 Movie,Series 条目列表')
+
+        staging = tmp_path / 'staging' / 'movie'
+        staging.mkdir(parents=True)
+        (staging / 'movie.nfo').write_text('<movie><tmdbid>42</tmdbid></movie>', encoding='utf-8')
+        offline = self.make_client(tmp_path)
+        monkeypatch.setattr(offline, '_iter_items', unreachable)
+        messages = []
+
+        offline.check_duplicates(str(tmp_path / 'staging'), messages.append, use_library_snapshot=True).join(timeout=5)
+
+        assert '发现重复影剧: 1' in messages[0]
+        assert os.path.exists(staging / 'movie.nfo')
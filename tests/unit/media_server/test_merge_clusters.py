@@ -0,0 +1,46 @@
+"""
+media_server.merge_clusters 模块单元测试
+"""
+
+
+class TestClusterMovies:
+    """测试按 provider ID 聚类"""
+
+    def test_unions_across_providers_and_picks_stable_identity(self):
+        from media_server.merge_clusters import cluster_movies, cluster_size_stats
+
+        movies = [
+            {'Id': '1', 'ProviderIds': {'num': 'abc-001'}},
+            {'Id': '2', 'ProviderIds': {'Imdb': 'tt01', 'Num': 'ABC-001'}},
+            {'Id': '3', 'ProviderIds': {'Tmdb': '0042', 'Imdb': 'TT01'}},
+            {'Id': '4', 'ProviderIds': {'Tmdb': '7'}},
+            {'Id': '5', 'ProviderIds': {'Tmdb': '8'}},
+            {'Id': '6', 'ProviderIds': {'Tmdb': '8'}},
+            {'Id': '7', 'ProviderIds': {}},
+        ]
+
+        clusters = cluster_movies(movies, ('Tmdb', 'Imdb', 'num'))
+
+        assert {identity: [movie['Id'] for movie in members] for identity, members in clusters.items()} == {
+            'TMDB:42': ['1', '2', '3'],
+            'TMDB:8': ['5', '6'],
+        }
+        assert cluster_size_stats(clusters) == {2: 1, 3: 1}
+
+    def test_only_configured_providers_link_items(self):
+        from media_server.merge_clusters import cluster_movies
+
+        movies = [
+            {'Id': '1', 'ProviderIds': {'Tmdb': '1', 'Imdb': 'tt9'}},
+            {'Id': '2', 'ProviderIds': {'Tmdb': '2', 'Imdb': 'tt9'}},
+        ]
+
+        assert cluster_movies(movies, ('Tmdb', 'num')) == {}
+
+    def test_parse_merge_providers(self):
+        from media_server.merge_clusters import DEFAULT_MERGE_PROVIDERS, parse_merge_providers
+
+        assert parse_merge_providers('tmdb, IMDB,num,tmdb') == ('Tmdb', 'Imdb', 'num')
+        assert parse_merge_providers(['Tmdb', 'Douban']) == ('Tmdb', 'Douban')
+        assert parse_merge_providers('') == DEFAULT_MERGE_PROVIDERS
+        assert parse_merge_providers(None) == DEFAULT_MERGE_PROVIDERS
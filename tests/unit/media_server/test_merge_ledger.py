@@ -0,0 +1,131 @@
+"""
+media_server.merge_ledger 模块单元测试
+"""
+
+import threading
+import time
+
+
+class FakeResponse:
+    def __init__(self, status_code=204, text=''):
+        self.status_code = status_code
+        self.text = text
+
+
+class TestMergeLedger:
+    """测试合并记录的读写与判断"""
+
+    def test_round_trip_and_membership(self, tmp_path):
+        from media_server.merge_ledger import MergeLedger
+
+        ledger = MergeLedger.for_server(str(tmp_path), 'a' * 64)
+        assert ledger.load() is False
+        ledger.record(MergeLedger.identity('TMDB', '603'), ['2', '1'], 100.0)
+        ledger.save()
+
+        loaded = MergeLedger.for_server(str(tmp_path), 'a' * 64)
+        assert loaded.load() is True
+        assert loaded.entries == {'TMDB:603': {'ids': ['1', '2'], 'merged_at': 100.0}}
+        assert loaded.is_merged('TMDB:603', {'1', '2'}) is True
+        assert loaded.is_merged('TMDB:603', {'1'}) is True
+        assert loaded.is_merged('TMDB:603', {'1', '2', '3'}) is False
+        assert loaded.is_merged('TMDB:604', {'1', '2'}) is False
+        assert MergeLedger.for_server(str(tmp_path), 'b' * 64).load() is False
+
+
+class TestMediaServerClientMergeLedger:
+    """测试合并版本使用合并记录跳过已合并分组"""
+
+    def make_client(self, tmp_path, movies, requests_made, **tuning):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            username='wiz',
+            server_type='emby',
+            cache_dir=str(tmp_path / 'cache'),
+            tuning=tuning,
+        )
+        operator.validate_server_type = lambda: True
+        operator._start_background_task = lambda target, task_name: target()
+        operator.get_movie_media = lambda: movies
+
+        def fake_request(method, path, **kwargs):
+            requests_made.append(kwargs['params']['Ids'])
+            return FakeResponse()
+
+        operator._request = fake_request
+        return operator
+
+    def test_skips_merged_groups_and_resubmits_changed_membership(self, tmp_path):
+        movies = [
+            {'Id': '1', 'Name': 'Movie A', 'ProviderIds': {'Tmdb': '100'}},
+            {'Id': '2', 'Name': 'Movie A 4K', 'ProviderIds': {'Tmdb': '100'}},
+            {'Id': '3', 'Name': 'Movie B', 'ProviderIds': {'Tmdb': '200'}},
+            {'Id': '4', 'Name': 'Movie B 4K', 'ProviderIds': {'Tmdb': '200'}},
+        ]
+        requests_made = []
+        self.make_client(tmp_path, movies, requests_made).merge_versions(None)
+        assert sorted(requests_made) == ['1,2', '3,4']
+
+        requests_made.clear()
+        self.make_client(tmp_path, movies, requests_made).merge_versions(None)
+        assert requests_made == []
+
+        movies.append({'Id': '5', 'Name': 'Movie B Remux', 'ProviderIds': {'Tmdb': '200'}})
+        self.make_client(tmp_path, movies, requests_made).merge_versions(None)
+        assert requests_made == ['3,4,5']
+
+    def test_dispatches_merges_concurrently_in_group_order(self, tmp_path):
+        from media_server.client import MediaServerClient
+
+        movies = []
+        for group in range(6):
+            movies.append({'Id': f'{group}-a', 'Name': f'Movie {group}', 'ProviderIds': {'Tmdb': str(group)}})
+            movies.append({'Id': f'{group}-b', 'Name': f'Movie {group} 4K', 'ProviderIds': {'Tmdb': str(group)}})
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 3})
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_request(method, path, **kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return FakeResponse()
+
+        operator._request = fake_request
+        merged = operator.merge_movie_versions(operator.group_movies_by_tmdbid(movies))
+
+        assert [movie['Id'] for movie in merged] == [f'{group}-a' for group in range(6)]
+        assert 1 < max(peak) <= 3
+
+    def test_request_error_in_one_group_keeps_other_merges_recorded(self, tmp_path):
+        import requests
+
+        from media_server.merge_ledger import MergeLedger
+
+        movies = []
+        for group in range(3):
+            movies.append({'Id': f'{group}-a', 'Name': f'Movie {group}', 'ProviderIds': {'Tmdb': str(group)}})
+            movies.append({'Id': f'{group}-b', 'Name': f'Movie {group} 4K', 'ProviderIds': {'Tmdb': str(group)}})
+        requests_made = []
+        operator = self.make_client(tmp_path, movies, requests_made, concurrency=2)
+
+        def flaky_request(method, path, **kwargs):
+            requests_made.append(kwargs['params']['Ids'])
+            if kwargs['params']['Ids'] == '0-a,0-b':
+                raise requests.exceptions.ConnectionError('连接被重置')
+            return FakeResponse()
+
+        operator._request = flaky_request
+        operator.merge_versions(None)
+
+        assert sorted(requests_made) == ['0-a,0-b', '1-a,1-b', '2-a,2-b']
+        ledger = MergeLedger.for_server(str(tmp_path / 'cache'), operator._sync_server_key())
+        assert ledger.load() is True
+        assert sorted(ledger.entries) == ['TMDB:1', 'TMDB:2']
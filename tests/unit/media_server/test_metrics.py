@@ -0,0 +1,75 @@
+"""
+media_server.metrics 模块单元测试
+"""
+
+import json
+from types import SimpleNamespace
+
+
+class TestRequestMetrics:
+    """测试按端点的请求统计"""
+
+    def test_report_contains_percentiles_status_codes_and_retries(self):
+        from media_server.metrics import RequestMetrics, format_report_lines
+
+        metrics = RequestMetrics()
+        for index in range(1, 101):
+            metrics.record_response('GET /Items', index / 1000, 200, 10)
+        metrics.record_response('POST /Items/{id}', 0.5, 503)
+        metrics.record_response('POST /Items/{id}', 0.2, 'ReadTimeout')
+        metrics.record_retry('POST /Items/{id}', 1.5)
+        metrics.record_readback('POST /Items/{id}', True)
+        metrics.add_bytes('GET /Items', 24)
+
+        report = metrics.report()
+
+        items = report['endpoints']['GET /Items']
+        assert items['requests'] == 100
+        assert items['latency_ms'] == {'p50': 50.0, 'p95': 95.0, 'p99': 99.0, 'max': 100.0}
+        assert items['bytes'] == 1024
+        posts = report['endpoints']['POST /Items/{id}']
+        assert posts['status_codes'] == {'503': 1, 'ReadTimeout': 1}
+        assert posts['retries'] == 1
+        assert posts['retry_sleep_seconds'] == 1.5
+        assert posts['readback_confirmed'] == 1
+        assert report['totals']['requests'] == 102
+        assert json.loads(json.dumps(report)) == report
+        assert format_report_lines(report)[0].startswith('GET /Items: 100 次')
+
+
+class TestMediaServerClientRequestReport:
+    """测试后台任务结束时生成请求统计报告"""
+
+    def test_background_task_reports_retries_and_readback(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        responses = [
+            SimpleNamespace(status_code=503, content=b'busy', text='busy', headers={}),
+            SimpleNamespace(status_code=204, content=b'', text='', headers={}),
+        ]
+        monkeypatch.setattr(
+            'media_server.client.requests.Session.request',
+            lambda session, method, url, **kwargs: responses.pop(0),
+        )
+        monkeypatch.setattr('media_server.client.time.sleep', lambda _seconds: None)
+        report_path = tmp_path / 'reports' / 'requests.json'
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            tuning={'metrics_report_file': str(report_path)},
+        )
+        monkeypatch.setattr(operator, 'get_item_info', lambda item_id: {'Id': item_id, 'Genres': ['Action']})
+
+        def target():
+            operator._post_item_update('42', {'Id': '42', 'Name': 'Movie', 'Genres': ['动作']})
+
+        operator._start_background_task(target, '测试任务').join(timeout=2)
+
+        report = operator.last_request_report
+        post = report['endpoints']['POST /Items/{id}']
+        assert report['task'] == '测试任务'
+        assert post['requests'] == 2
+        assert post['status_codes'] == {'503': 1, '204': 1}
+        assert post['retries'] == 1
+        assert post['readback_failed'] == 1
+        assert json.loads(report_path.read_text(encoding='utf-8'))['totals']['requests'] == 2
@@ -0,0 +1,82 @@
+"""
+media_server.nfo_ids 模块单元测试
+"""
+
+
+def write_nfo(tmp_path, content, name='movie.nfo'):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+class TestExtractNfoIds:
+    """测试流式提取 NFO 中的 provider ID"""
+
+    def test_collects_all_ids_in_one_pass(self, tmp_path):
+        from media_server.nfo_ids import extract_nfo_ids
+
+        path = write_nfo(
+            tmp_path,
+            '<?xml version="1.0" encoding="utf-8"?>\n<movie>\n  <title>Matrix</title>\n'
+            '  <set><name>Matrix</name><tmdbid>2344</tmdbid></set>\n'
+            '  <uniqueid type="imdb">tt0133093</uniqueid>\n  <tmdbid> 603 </tmdbid>\n  <tvdbid>81189</tvdbid>\n'
+            '</movie>',
+        )
+
+        assert extract_nfo_ids(path) == (
+            {'Imdb': 'tt0133093', 'Tmdb': '603', 'Tvdb': '81189'},
+            False,
+            None,
+            'Movie',
+        )
+
+    def test_stops_reading_after_id_block(self, tmp_path):
+        from media_server.nfo_ids import extract_nfo_ids
+
+        actors = ''.join(f'  <actor><name>Actor {index}</name></actor>\n' for index in range(20000))
+        path = write_nfo(tmp_path, f'<movie>\n  <tmdbid>603</tmdbid>\n{actors}<<< 文件尾部损坏')
+
+        ids, damaged, _error, _media_type = extract_nfo_ids(path, chunk_size=1024)
+
+        assert ids == {'Tmdb': '603'}
+        assert damaged is False
+
+    def test_damaged_xml_falls_back_to_tolerant_match(self, tmp_path):
+        from media_server.nfo_ids import extract_nfo_ids
+
+        path = write_nfo(
+            tmp_path,
+            '<movie>\n  <title>A & B</title>\n  <uniqueid type="tmdb" default="true">42</uniqueid>\n'
+            '    <tmdbid>7</tmdbid>\n  <imdbid>tt0000042</imdbid>\n',
+        )
+
+        ids, damaged, error, media_type = extract_nfo_ids(path, chunk_size=8)
+
+        assert ids == {'Tmdb': '42', 'Imdb': 'tt0000042'}
+        assert damaged is True
+        assert error is not None
+        assert media_type == 'Movie'
+
+    def test_media_type_follows_root_element(self, tmp_path):
+        from media_server.nfo_ids import extract_nfo_ids, tolerant_media_type
+
+        show = write_nfo(tmp_path, '<tvshow><tvdbid>81189</tvdbid></tvshow>', name='tvshow.nfo')
+        episode = write_nfo(tmp_path, '<episodedetails><tmdbid>1</tmdbid></episodedetails>', name='e01.nfo')
+        other = write_nfo(tmp_path, '<musicvideo><tmdbid>1</tmdbid></musicvideo>', name='mv.nfo')
+
+        assert extract_nfo_ids(show)[3] == 'Series'
+        assert extract_nfo_ids(episode)[3] == 'Episode'
+        assert extract_nfo_ids(other)[3] is None
+        assert tolerant_media_type('<?xml version="1.0"?>\n<TVShow>\n  <title>x') == 'Series'
+
+
+class TestMediaServerClientExtractNfoIds:
+    """测试客户端按多个 provider 查重"""
+
+    def test_extract_nfo_ids_returns_empty_for_unreadable_file(self, tmp_path):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+
+        assert operator.extract_nfo_ids(str(tmp_path / 'missing.nfo')) == ({}, False, None)
+        assert operator.extract_nfo_ids(write_nfo(tmp_path, '<movie><title>x')) == ({}, False, 'Movie')
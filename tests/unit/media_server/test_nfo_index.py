@@ -0,0 +1,97 @@
+"""
+media_server.nfo_index 模块单元测试
+"""
+
+import os
+
+
+class TestNfoIdIndex:
+    """测试按路径、大小和修改时间缓存 NFO 解析结果"""
+
+    def test_hit_requires_same_size_and_mtime(self, tmp_path):
+        from media_server.nfo_index import NfoIdIndex
+
+        nfo_path = tmp_path / 'movie.nfo'
+        nfo_path.write_text('<movie/>', encoding='utf-8')
+        index = NfoIdIndex(str(tmp_path / 'cache' / 'nfo_index.sqlite3'))
+        stat_result = os.stat(nfo_path)
+
+        assert index.get(str(nfo_path), stat_result) is None
+        index.put(str(nfo_path), stat_result, {'Tmdb': '1'}, True, 'Movie')
+        assert index.get(str(nfo_path), stat_result) == ({'Tmdb': '1'}, True, 'Movie')
+
+        os.utime(nfo_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        assert index.get(str(nfo_path), os.stat(nfo_path)) is None
+        assert index.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3, 'rows': 1}
+        index.close()
+
+    def test_index_without_media_type_column_is_rebuilt(self, tmp_path):
+        import sqlite3
+
+        from media_server.nfo_index import NfoIdIndex
+
+        path = str(tmp_path / 'nfo_index.sqlite3')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE nfo_ids (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+            'ids TEXT NOT NULL, damaged INTEGER NOT NULL, indexed_at REAL NOT NULL)'
+        )
+        connection.execute("INSERT INTO nfo_ids VALUES ('/a.nfo', 1, 1, '{}', 0, 0)")
+        connection.commit()
+        connection.close()
+
+        index = NfoIdIndex(path)
+
+        assert index.stats()['rows'] == 0
+        index.close()
+
+    def test_prune_removes_unseen_rows_under_root_only(self, tmp_path):
+        from media_server.nfo_index import NfoIdIndex
+
+        stat_result = os.stat(tmp_path)
+        index = NfoIdIndex(str(tmp_path / 'nfo_index.sqlite3'))
+        root = os.path.join(str(tmp_path), 'staging')
+        for path in (os.path.join(root, 'a.nfo'), os.path.join(root, 'b.nfo'), os.path.join(root + '2', 'c.nfo')):
+            index.put(path, stat_result, {}, False)
+
+        assert index.prune(root, {os.path.join(root, 'a.nfo')}) == 1
+        assert index.stats()['rows'] == 2
+        index.close()
+
+
+class TestMediaServerClientNfoIdIndex:
+    """测试重复查重时只解析新增或修改过的 NFO"""
+
+    def test_second_check_reuses_index(self, tmp_path, monkeypatch):
+        import media_server.client as client_module
+        from media_server.client import MediaServerClient
+
+        staging = tmp_path / 'staging'
+        for index in range(3):
+            folder = staging / f'movie-{index}'
+            folder.mkdir(parents=True)
+            (folder / 'movie.nfo').write_text(f'<movie><tmdbid>{index}</tmdbid></movie>', encoding='utf-8')
+        parsed = []
+        original_extract = client_module.extract_nfo_ids
+        monkeypatch.setattr(
+            client_module,
+            'extract_nfo_ids',
+            lambda path, *args: parsed.append(path) or original_extract(path, *args),
+        )
+
+        def run_check():
+            operator = MediaServerClient(
+                server_url='http://localhost:8096', api_key='test-api-key', cache_dir=str(tmp_path / 'cache')
+            )
+            monkeypatch.setattr(operator, 'get_all_media', lambda: [{'ProviderIds': {'Tmdb': '1'}}])
+            messages = []
+            operator.check_duplicates(str(staging), messages.append).join(timeout=5)
+            return messages[0]
+
+        assert '发现重复影剧: 1' in run_check()
+        assert len(parsed) == 3
+
+        parsed.clear()
+        (staging / 'movie-2' / 'movie.nfo').write_text('<movie><tmdbid>1</tmdbid></movie>  ', encoding='utf-8')
+        assert '发现重复影剧: 2' in run_check()
+        assert parsed == [str(staging / 'movie-2' / 'movie.nfo')]
@@ -0,0 +1,88 @@
+"""
+media_server.nfo_scan 模块单元测试
+"""
+
+import os
+import threading
+
+
+def make_tree(root, count, per_folder=1):
+    paths = []
+    for index in range(count):
+        folder = os.path.join(root, f'movie-{index // per_folder}')
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'{index}.nfo')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'<movie>\n  <tmdbid>{index}</tmdbid>\n</movie>')
+        paths.append(path)
+        with open(os.path.join(folder, f'{index}.mkv'), 'w', encoding='utf-8') as f:
+            f.write('')
+    return paths
+
+
+class TestNfoScanPipeline:
+    """测试遍历与并发提取流水线"""
+
+    def test_yields_every_nfo_once_with_totals(self, tmp_path):
+        from media_server.nfo_scan import NfoScanPipeline
+
+        paths = make_tree(str(tmp_path), 60)
+        threads = set()
+
+        def extract(path):
+            threads.add(threading.current_thread().name)
+            return os.path.basename(path)
+
+        pipeline = NfoScanPipeline(str(tmp_path), extract, workers=4, max_pending=8)
+        results = dict(pipeline)
+
+        assert sorted(results) == sorted(paths)
+        assert all(results[path] == os.path.basename(path) for path in paths)
+        assert pipeline.walk_finished and pipeline.discovered == pipeline.processed == 60
+        assert all(name.startswith('nfo-scan') for name in threads)
+
+    def test_stop_flag_stops_dispatch(self, tmp_path):
+        from media_server.nfo_scan import NfoScanPipeline
+
+        make_tree(str(tmp_path), 50)
+        stop_flag = threading.Event()
+        pipeline = NfoScanPipeline(str(tmp_path), lambda path: path, workers=2, stop_flag=stop_flag, max_pending=4)
+
+        consumed = 0
+        for _result in pipeline:
+            consumed += 1
+            if consumed == 3:
+                stop_flag.set()
+
+        assert consumed == 3
+        assert pipeline.processed < 50
+
+
+class TestMediaServerClientParallelCheckDuplicates:
+    """测试并发查重的分类、删除和进度"""
+
+    def test_parallel_check_deletes_duplicate_folders_once(self, tmp_path, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        make_tree(str(tmp_path), 20, per_folder=2)
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            delete_nfo_folder=True,
+            tuning={'nfo_scan_workers': 4},
+        )
+        library = [{'ProviderIds': {'Tmdb': str(index)}} for index in range(0, 20, 4)]
+        monkeypatch.setattr(operator, 'get_all_media', lambda: library)
+        messages = []
+        progress = []
+
+        errors = []
+        monkeypatch.setattr(operator.logger, 'error', errors.append)
+
+        operator.check_duplicates(str(tmp_path), messages.append, progress.append).join(timeout=5)
+
+        assert '共查询影剧数: 20个，发现重复影剧: 5' in messages[0]
+        assert sorted(os.listdir(tmp_path)) == [f'movie-{index}' for index in range(10) if index % 2]
+        assert progress[-1]['current'] == progress[-1]['total'] == 20
+        assert progress[-1]['percent'] == 100
+        assert errors == []
@@ -0,0 +1,196 @@
+"""
+media_server.paging 模块单元测试
+"""
+
+import threading
+
+import pytest
+import requests
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, text=''):
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {}
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class TestItemPager:
+    """测试分页迭代器"""
+
+    def test_walks_pages_until_short_page(self):
+        from media_server.paging import ItemPager
+
+        items = [{'Id': str(index)} for index in range(5)]
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append((start_index, limit))
+            return {'Items': items[start_index : start_index + limit], 'TotalRecordCount': len(items)}
+
+        pager = ItemPager(fetch_page, page_size=2)
+
+        assert [item['Id'] for item in pager] == ['0', '1', '2', '3', '4']
+        assert requested == [(0, 2), (2, 2), (4, 2)]
+        assert pager.total_record_count == 5
+        assert pager.page_count == 3
+
+    def test_stops_at_total_record_count_on_exact_page_boundary(self):
+        from media_server.paging import ItemPager
+
+        items = [{'Id': str(index)} for index in range(4)]
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append(start_index)
+            return {'Items': items[start_index : start_index + limit], 'TotalRecordCount': 4}
+
+        assert len(list(ItemPager(fetch_page, page_size=2))) == 4
+        assert requested == [0, 2]
+
+    def test_short_pages_continue_until_total_record_count(self):
+        from media_server.paging import ItemPager
+
+        items = [{'Id': str(index)} for index in range(5)]
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append(start_index)
+            # 服务器把单页上限压到 2 条，低于请求的页大小
+            return {'Items': items[start_index : start_index + min(limit, 2)], 'TotalRecordCount': 5}
+
+        assert [item['Id'] for item in ItemPager(fetch_page, page_size=3)] == ['0', '1', '2', '3', '4']
+        assert requested == [0, 2, 4]
+
+    def test_empty_page_ends_listing_before_total_record_count(self):
+        from media_server.paging import ItemPager
+
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append(start_index)
+            items = [{'Id': str(index)} for index in range(3)][start_index : start_index + limit]
+            return {'Items': items, 'TotalRecordCount': 10}
+
+        assert len(list(ItemPager(fetch_page, page_size=2))) == 3
+        assert requested == [0, 2, 3]
+
+    def test_server_ignoring_limit_is_treated_as_complete_listing(self):
+        from media_server.paging import ItemPager
+
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append(start_index)
+            return {'Items': [{'Id': str(index)} for index in range(5)]}
+
+        assert len(list(ItemPager(fetch_page, page_size=2))) == 5
+        assert requested == [0]
+
+    def test_stop_flag_prevents_next_page(self):
+        from media_server.paging import ItemPager
+
+        stop_flag = threading.Event()
+        requested = []
+
+        def fetch_page(start_index, limit):
+            requested.append(start_index)
+            return {'Items': [{'Id': f'{start_index}-{index}'} for index in range(limit)]}
+
+        consumed = []
+        for item in ItemPager(fetch_page, page_size=2, stop_flag=stop_flag):
+            consumed.append(item)
+            stop_flag.set()
+
+        assert requested == [0]
+        assert len(consumed) == 2
+
+    def test_item_stream_chains_pagers_and_sums_totals(self):
+        from media_server.paging import ItemPager, ItemStream
+
+        def make_fetch(prefix, count):
+            return lambda start, limit: {
+                'Items': [{'Id': f'{prefix}{index}'} for index in range(count)],
+                'TotalRecordCount': count,
+            }
+
+        stream = ItemStream([ItemPager(make_fetch('a', 1), page_size=5), ItemPager(make_fetch('b', 2), page_size=5)])
+
+        assert stream.total_record_count is None
+        assert [item['Id'] for item in stream] == ['a0', 'b0', 'b1']
+        assert stream.total_record_count == 3
+        assert stream.item_count == 3
+
+
+class TestMediaServerClientPaging:
+    """测试客户端按页读取条目列表"""
+
+    def test_emby_genre_update_pages_and_retries_only_failed_page(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'page_size': 2}
+        )
+        movies = [
+            {'Id': 'movie1', 'Name': 'Movie 1', 'Genres': ['Action'], 'GenreItems': []},
+            {'Id': 'movie2', 'Name': 'Movie 2', 'Genres': ['动作'], 'GenreItems': []},
+            {'Id': 'movie3', 'Name': 'Movie 3', 'Genres': ['Suspense'], 'GenreItems': []},
+        ]
+        page_requests = []
+
+        def fake_request(method, path, params=None, **_kwargs):
+            assert path == '/Items'
+            assert 'Limit' in params and params['Limit'] == 2
+            assert params['SortBy'] == 'SortName,Id' and params['SortOrder'] == 'Ascending'
+            page_requests.append(params['StartIndex'])
+            if page_requests == [0, 2]:
+                raise requests.exceptions.ReadTimeout('slow page')
+            start = params['StartIndex']
+            return FakeResponse(payload={'Items': movies[start : start + 2], 'TotalRecordCount': 3})
+
+        monkeypatch.setattr(operator, '_request', fake_request)
+        monkeypatch.setattr('media_server.client.time.sleep', lambda _seconds: None)
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: next(dict(movie) for movie in movies if movie['Id'] == item_id),
+        )
+        updates = []
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: updates.append((item_id, item['Genres'])) or FakeResponse(status_code=204),
+        )
+
+        operator.emby_movie_translate_genres_and_update_whole_item()
+
+        assert page_requests == [0, 2, 2]
+        assert updates == [('movie1', ['动作']), ('movie3', ['悬疑'])]
+
+    def test_failed_page_aborts_update_and_marks_sync_error(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'page_size': 1}
+        )
+
+        def fake_request(method, path, params=None, **_kwargs):
+            if params['StartIndex'] == 0:
+                return FakeResponse(
+                    payload={'Items': [{'Id': 'movie1', 'Genres': ['Action'], 'GenreItems': []}]}
+                )
+            return FakeResponse(status_code=500, text='boom')
+
+        monkeypatch.setattr(operator, '_request', fake_request)
+        monkeypatch.setattr('media_server.client.time.sleep', lambda _seconds: None)
+        monkeypatch.setattr(
+            operator,
+            '_post_item_update',
+            lambda item_id, item: pytest.fail('列表读取失败时不应提交更新'),
+        )
+
+        assert operator.emby_movie_translate_genres_and_update_whole_item() == []
+        assert operator._sync_had_errors is True
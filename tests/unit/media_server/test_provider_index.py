@@ -0,0 +1,108 @@
+"""
+media_server.provider_index 模块单元测试
+"""
+
+import os
+
+
+class TestProviderIdIndex:
+    """测试 Provider ID 索引的规范化与查找"""
+
+    def test_normalizes_values_and_provider_key_case(self):
+        from media_server.provider_index import ProviderIdIndex
+
+        index = ProviderIdIndex.build(
+            [
+                {'Id': 'a', 'ProviderIds': {'TMDB': '0603', 'IMDB': 'TT0133093'}},
+                {'Id': 'b', 'ProviderIds': {'Num': 'abc-123', 'Tvdb': ' 81189 '}},
+                {'Id': 'c', 'ProviderIds': {'Douban': '1291843', 'Tmdb': ''}},
+            ]
+        )
+
+        assert [item['Id'] for item in index.lookup('tmdb', '603')] == ['a']
+        assert [item['Id'] for item in index.lookup('Imdb', '0133093')] == ['a']
+        assert [item['Id'] for item in index.lookup('Tvdb', '81189')] == ['b']
+        # NFO 中提取不到番号，查重索引不收录 num
+        assert index.lookup('num', 'ABC-123') == []
+        assert index.lookup('Douban', '1291843') == []
+        assert index.counts() == {'Tmdb': 1, 'Imdb': 1, 'Tvdb': 1}
+
+    def test_match_reports_provider_in_priority_order(self):
+        from media_server.provider_index import ProviderIdIndex
+
+        index = ProviderIdIndex.build(
+            [
+                {'Id': 'a', 'ProviderIds': {'Imdb': 'tt1'}},
+                {'Id': 'b', 'ProviderIds': {'Tmdb': '2'}},
+            ]
+        )
+
+        assert index.match({'tmdb': '2', 'imdb': 'tt1'})[:2] == ('Tmdb', '2')
+        assert index.match({'Tmdb': '999', 'Imdb': 'TT1'})[:2] == ('Imdb', 'tt1')
+        assert index.match({'Tmdb': '999'}) is None
+
+    def test_match_filters_by_item_type(self):
+        from media_server.provider_index import ProviderIdIndex
+
+        index = ProviderIdIndex.build(
+            [
+                {'Id': 'movie', 'Type': 'Movie', 'ProviderIds': {'Tmdb': '100', 'Tvdb': '7'}},
+                {'Id': 'series', 'Type': 'Series', 'ProviderIds': {'Tmdb': '100'}},
+                {'Id': 'legacy', 'ProviderIds': {'Imdb': 'tt5'}},
+            ]
+        )
+
+        assert [item['Id'] for item in index.match({'Tmdb': '100'}, 'Series')[2]] == ['series']
+        assert [item['Id'] for item in index.match({'Tmdb': '100'}, 'Movie')[2]] == ['movie']
+        assert index.match({'Tvdb': '7'}, 'Series') is None
+        assert index.match({'Tmdb': '100'}, 'Episode') is None
+        assert index.match({'Imdb': 'tt5'}, 'Series')[:2] == ('Imdb', 'tt5')
+        assert len(index.match({'Tmdb': '100'})[2]) == 2
+
+
+class TestMediaServerClientCheckDuplicatesIndex:
+    """测试查重使用索引并报告命中的 provider"""
+
+    def test_check_duplicates_reports_matched_provider(self, temp_dir, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        for name, tmdbid in (('dup', '0042'), ('new', '77')):
+            folder = os.path.join(temp_dir, name)
+            os.makedirs(folder)
+            with open(os.path.join(folder, 'movie.nfo'), 'w', encoding='utf-8') as f:
+                f.write(f'<movie>\n  <tmdbid>{tmdbid}</tmdbid>\n</movie>')
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        monkeypatch.setattr(operator, 'get_all_media', lambda: [{'Name': 'Dup', 'ProviderIds': {'Tmdb': '42'}}])
+        monkeypatch.setattr(
+            operator,
+            'query_movies_by_tmdbid',
+            lambda *_args: (_ for _ in ()).throw(AssertionError('查重不应线性扫描媒体库')),
+        )
+        messages = []
+
+        operator.check_duplicates(temp_dir, messages.append).join(timeout=2)
+
+        assert '重复影剧 : ' + os.path.join(temp_dir, 'dup', 'movie.nfo') + '（Tmdb 匹配）' in messages[0]
+        assert '新影剧  : ' + os.path.join(temp_dir, 'new', 'movie.nfo') in messages[0]
+
+    def test_check_duplicates_does_not_match_series_against_movie(self, temp_dir, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        folder = os.path.join(temp_dir, 'show')
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'tvshow.nfo'), 'w', encoding='utf-8') as f:
+            f.write('<tvshow>\n  <tvdbid>81189</tvdbid>\n</tvshow>')
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key', delete_nfo_folder=True)
+        monkeypatch.setattr(
+            operator,
+            'get_all_media',
+            lambda: [{'Name': 'Movie', 'Type': 'Movie', 'ProviderIds': {'Tvdb': '81189'}}],
+        )
+        messages = []
+
+        operator.check_duplicates(temp_dir, messages.append).join(timeout=2)
+
+        assert '新影剧  : ' + os.path.join(folder, 'tvshow.nfo') in messages[0]
+        assert os.path.isdir(folder)
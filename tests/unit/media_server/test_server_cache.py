@@ -0,0 +1,103 @@
+"""
+media_server.server_cache 模块单元测试
+"""
+
+from types import SimpleNamespace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestServerInfoCache:
+    """测试服务器信息缓存的读写与过期"""
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        from media_server.server_cache import ServerInfoCache
+
+        clock = FakeClock()
+        cache = ServerInfoCache(str(tmp_path / 'server_info.json'), ttl=60, clock=clock)
+        key = ServerInfoCache.cache_key('http://Emby:8096/', 'Wiz')
+
+        cache.update(key, server_type='emby')
+        cache.update(key, user_id='user-1')
+        assert cache.get(key)['server_type'] == 'emby'
+        assert cache.get(key)['user_id'] == 'user-1'
+        assert key == 'http://emby:8096|wiz'
+
+        clock.now += 61
+        assert cache.get(key) == {}
+
+    def test_invalidate_and_corrupt_file(self, tmp_path):
+        from media_server.server_cache import ServerInfoCache
+
+        path = tmp_path / 'server_info.json'
+        cache = ServerInfoCache(str(path))
+        cache.update('key', server_type='emby')
+
+        assert cache.invalidate('key') is True
+        assert cache.get('key') == {}
+
+        path.write_text('{broken', encoding='utf-8')
+        assert cache.get('key') == {}
+
+
+class TestMediaServerClientServerCache:
+    """测试客户端启动时复用缓存的服务器类型和用户 ID"""
+
+    def test_warm_start_makes_no_discovery_requests(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        calls = []
+
+        def fake_request(session, method, url, **kwargs):
+            calls.append(url)
+            if url.endswith('/System/Info/Public'):
+                return SimpleNamespace(status_code=200, json=lambda: {'ProductName': 'Emby Server'}, text='')
+            if url.endswith('/Users/Public'):
+                return SimpleNamespace(status_code=200, json=lambda: [{'Name': 'wiz', 'Id': 'user-1'}], text='')
+            return SimpleNamespace(status_code=200, json=lambda: {}, text='')
+
+        monkeypatch.setattr('media_server.client.requests.Session.request', fake_request)
+
+        def make_client():
+            return MediaServerClient(
+                server_url='http://localhost:8096',
+                api_key='test-api-key',
+                username='wiz',
+                cache_dir=str(tmp_path),
+            )
+
+        cold = make_client()
+        cold.validate_server_type()
+        assert cold._ensure_user_id() == 'user-1'
+        assert len(calls) == 2
+
+        calls.clear()
+        warm = make_client()
+        warm.validate_server_type()
+        assert warm._ensure_user_id() == 'user-1'
+        assert calls == []
+
+    def test_unauthorized_response_invalidates_cache(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        monkeypatch.setattr(
+            'media_server.client.requests.Session.request',
+            lambda session, method, url, **kwargs: SimpleNamespace(status_code=401, text='', headers={}),
+        )
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            username='wiz',
+            cache_dir=str(tmp_path),
+        )
+        operator._update_server_cache(server_type='emby', user_id='user-1')
+
+        operator._request('get', '/Items')
+
+        assert operator._cached_server_info() == {}
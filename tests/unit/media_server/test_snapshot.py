@@ -0,0 +1,125 @@
+"""
+media_server.snapshot 模块单元测试
+"""
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, text=''):
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {}
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class TestItemSnapshot:
+    """测试条目快照文件"""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        from media_server.snapshot import ItemSnapshot
+
+        snapshot = ItemSnapshot.for_server(str(tmp_path / 'cache'), 'genre', 'a' * 64, 'map-1')
+        snapshot.save({'movie1': {'version': 'v1', 'hash': 'h1'}})
+
+        reloaded = ItemSnapshot.for_server(str(tmp_path / 'cache'), 'genre', 'a' * 64, 'map-1')
+        assert reloaded.load() is True
+        assert reloaded.entries == {'movie1': {'version': 'v1', 'hash': 'h1'}}
+
+    def test_map_change_or_corrupt_file_invalidates_snapshot(self, tmp_path):
+        from media_server.snapshot import ItemSnapshot
+
+        ItemSnapshot.for_server(str(tmp_path), 'genre', 'a' * 64, 'map-1').save({})
+
+        assert ItemSnapshot.for_server(str(tmp_path), 'genre', 'a' * 64, 'map-2').load() is False
+        corrupt = ItemSnapshot.for_server(str(tmp_path), 'country', 'a' * 64, 'map-1')
+        with open(corrupt.path, 'w', encoding='utf-8') as f:
+            f.write('{broken')
+        assert corrupt.load() is False
+
+
+class TestMediaServerClientSnapshotSync:
+    """测试 Emby 基于条目快照的增量扫描"""
+
+    def test_second_run_only_reads_changed_items(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        library = {
+            'movie1': {'Id': 'movie1', 'Name': 'Movie 1', 'Genres': ['Action'], 'DateLastSaved': 't1'},
+            'movie2': {'Id': 'movie2', 'Name': 'Movie 2', 'Genres': ['剧情'], 'DateLastSaved': 't1'},
+            'movie3': {'Id': 'movie3', 'Name': 'Movie 3', 'Genres': ['喜剧'], 'DateLastSaved': 't1'},
+        }
+        requests_seen = []
+
+        def fake_request(method, path, params=None, **_kwargs):
+            requests_seen.append(dict(params))
+            if 'Ids' in params:
+                ids = params['Ids'].split(',')
+                return FakeResponse(payload={'Items': [dict(library[item_id]) for item_id in ids]})
+            if params['Fields'] == 'DateLastSaved,Etag':
+                listing = [{'Id': item['Id'], 'DateLastSaved': item['DateLastSaved']} for item in library.values()]
+                return FakeResponse(payload={'Items': listing, 'TotalRecordCount': len(listing)})
+            items = [dict(item) for item in library.values()]
+            return FakeResponse(payload={'Items': items, 'TotalRecordCount': len(items)})
+
+        def post_update(item_id, item):
+            library[item_id] = dict(item, DateLastSaved='t2')
+            return FakeResponse(status_code=204)
+
+        def run_sync():
+            operator = MediaServerClient(
+                server_url='http://localhost:8096', api_key='test-api-key', cache_dir=str(tmp_path)
+            )
+            monkeypatch.setattr(operator, '_request', fake_request)
+            monkeypatch.setattr(operator, 'get_item_info', lambda item_id: dict(library[item_id]))
+            monkeypatch.setattr(operator, '_post_item_update', post_update)
+            mapping = {'movies': {'Action': '动作'}}
+            operator._begin_metadata_sync(mapping, snapshot_kind='genre')
+            updated = operator._translate_items_genres_and_update('电影', 'Movie', {'Action': '动作'})
+            operator._finish_metadata_sync()
+            return updated
+
+        assert [item['Id'] for item in run_sync()] == ['movie1']
+        assert all(params['Fields'] != 'DateLastSaved,Etag' for params in requests_seen)
+
+        library['movie3'] = dict(library['movie3'], Genres=['Action'], DateLastSaved='t3')
+        requests_seen.clear()
+
+        assert [item['Id'] for item in run_sync()] == ['movie3']
+        assert requests_seen[0]['Fields'] == 'DateLastSaved,Etag'
+        assert [params['Ids'] for params in requests_seen if 'Ids' in params] == ['movie1,movie3']
+
+        requests_seen.clear()
+        assert run_sync() == []
+        assert [params['Ids'] for params in requests_seen if 'Ids' in params] == ['movie3']
+
+    def test_aborted_rescan_does_not_record_unprocessed_candidates(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        # 列表中的流派已过期：详情显示已经翻译过，连续 200 个候选无需更新会触发重扫并再次中止
+        listing = [
+            {'Id': f'movie{index}', 'Name': f'Movie {index}', 'Genres': ['Action'], 'DateLastSaved': 't1'}
+            for index in range(250)
+        ]
+
+        def fake_request(method, path, params=None, **_kwargs):
+            return FakeResponse(payload={'Items': [dict(item) for item in listing], 'TotalRecordCount': len(listing)})
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', cache_dir=str(tmp_path)
+        )
+        monkeypatch.setattr(operator, '_request', fake_request)
+        monkeypatch.setattr(
+            operator,
+            'get_item_info',
+            lambda item_id: {'Id': item_id, 'Name': item_id, 'Genres': ['动作'], 'DateLastSaved': 't1'},
+        )
+        monkeypatch.setattr(operator, '_post_item_update', lambda item_id, item: FakeResponse(status_code=204))
+        operator._begin_metadata_sync({'movies': {'Action': '动作'}}, snapshot_kind='genre')
+
+        assert operator._translate_items_genres_and_update('电影', 'Movie', {'Action': '动作'}) == []
+
+        recorded = operator._snapshot_records
+        assert len(recorded) == 200
+        assert 'movie0' in recorded and 'movie199' in recorded
+        assert 'movie200' not in recorded and 'movie249' not in recorded
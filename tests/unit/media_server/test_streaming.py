@@ -0,0 +1,125 @@
+"""
+media_server.streaming 模块单元测试
+"""
+
+import json
+
+import pytest
+
+
+def split_bytes(text, size):
+    data = text.encode('utf-8')
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class TestStreamingPayload:
+    """测试增量 JSON 解码"""
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 7, 4096])
+    def test_decodes_items_and_trailing_fields_across_chunk_boundaries(self, chunk_size):
+        from media_server.streaming import StreamingPayload
+
+        document = {
+            'Items': [{'Id': '1', 'Name': '动作片'}, {'Id': '2', 'Genres': ['Drama', 'Crime']}],
+            'TotalRecordCount': 12345,
+            'StartIndex': 0,
+        }
+        payload = StreamingPayload(split_bytes(json.dumps(document, ensure_ascii=False, indent=1), chunk_size))
+
+        assert list(payload.get('Items')) == document['Items']
+        assert payload.get('TotalRecordCount') == 12345
+        assert payload.get('StartIndex') == 0
+        assert payload.bytes_read == len(json.dumps(document, ensure_ascii=False, indent=1).encode('utf-8'))
+
+    def test_yields_items_before_reading_the_rest_of_the_response(self):
+        from media_server.streaming import StreamingPayload
+
+        consumed_chunks = []
+
+        def chunks():
+            for chunk in [b'{"Items":[{"Id":"1"},', b'{"Id":"2"}', b'],"TotalRecordCount":2}']:
+                consumed_chunks.append(chunk)
+                yield chunk
+
+        items = StreamingPayload(chunks()).get('Items')
+
+        assert next(items) == {'Id': '1'}
+        assert len(consumed_chunks) == 1
+
+    def test_fields_before_items_and_empty_array(self):
+        from media_server.streaming import StreamingPayload
+
+        payload = StreamingPayload([b'{"TotalRecordCount":0,"Items":[]}'])
+
+        assert list(payload.get('Items')) == []
+        assert payload.get('TotalRecordCount') == 0
+
+    def test_reading_other_field_first_keeps_items(self):
+        from media_server.streaming import StreamingPayload
+
+        payload = StreamingPayload([b'{"Items":[1,2],"TotalRecordCount":2}'])
+
+        assert payload.get('TotalRecordCount') == 2
+        assert payload.fields['Items'] == [1, 2]
+
+    def test_malformed_response_calls_on_error(self):
+        from media_server.streaming import StreamingPayload
+
+        errors = []
+
+        def on_error(err):
+            errors.append(err)
+            raise RuntimeError('listing failed') from err
+
+        payload = StreamingPayload([b'{"Items":[{"Id":"1"} {"Id":"2"}]}'], on_error=on_error)
+
+        with pytest.raises(RuntimeError):
+            list(payload.get('Items'))
+        assert len(errors) == 1
+
+
+class FakeStreamResponse:
+    def __init__(self, document, chunk_size=5):
+        self.status_code = 200
+        self.text = ''
+        self._chunks = split_bytes(json.dumps(document), chunk_size)
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        yield from self._chunks
+
+    def close(self):
+        self.closed = True
+
+    def json(self):
+        raise AssertionError('流式模式不应整体解析响应')
+
+
+class TestMediaServerClientStreamingListing:
+    """测试客户端流式读取条目列表"""
+
+    def test_pager_streams_items_and_logs_transfer_stats(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            tuning={'stream_json': True, 'page_size': 2},
+        )
+        movies = [{'Id': str(index), 'Name': f'Movie {index}'} for index in range(3)]
+        responses = []
+
+        def fake_request(method, path, params=None, stream=False, **_kwargs):
+            assert stream is True
+            start = params['StartIndex']
+            response = FakeStreamResponse({'Items': movies[start : start + 2], 'TotalRecordCount': 3})
+            responses.append(response)
+            return response
+
+        monkeypatch.setattr(operator, '_request', fake_request)
+        messages = []
+        monkeypatch.setattr(operator.logger, 'info', messages.append)
+
+        assert [movie['Id'] for movie in operator._iter_items('Movie', 'Genres')] == ['0', '1', '2']
+        assert all(response.closed for response in responses)
+        assert any('读取统计: 3 条，2 页' in message for message in messages)
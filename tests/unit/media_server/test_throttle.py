@@ -0,0 +1,153 @@
+"""
+media_server.throttle 模块单元测试
+"""
+
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestParseRetryAfter:
+    """测试 Retry-After 解析"""
+
+    def test_parses_seconds_and_http_date(self):
+        from media_server.throttle import parse_retry_after
+
+        now = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Mon, 01 Jan 2024 00:00:05 GMT', now=now) == 5.0
+        assert parse_retry_after('Mon, 01 Jan 2023 00:00:05 GMT', now=now) == 0.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+
+class TestAdaptiveLimiter:
+    """测试令牌桶与 AIMD 并发控制"""
+
+    def test_throttle_halves_concurrency_once_per_burst_and_recovers_additively(self):
+        from media_server.throttle import AdaptiveLimiter
+
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(max_concurrency=8, clock=clock)
+
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(429)
+        limiter.release(503)
+        assert limiter.concurrency_limit == 4
+        assert limiter.throttle_events == 2
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(200)
+        assert limiter.concurrency_limit == 5
+
+        clock.now += 2
+        limiter.acquire()
+        limiter.release(429)
+        assert limiter.concurrency_limit == 2
+
+    def test_retry_after_pauses_new_requests(self):
+        from media_server.throttle import AdaptiveLimiter
+
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(max_concurrency=2, max_retry_after=10, clock=clock)
+
+        limiter.acquire()
+        assert limiter.release(429, '30') == 10
+
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.2)
+
+        clock.now += 10
+        assert acquired.wait(2)
+        thread.join()
+
+    def test_token_bucket_limits_request_rate(self):
+        from media_server.throttle import AdaptiveLimiter
+
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(rate=2, burst=1, max_concurrency=4, clock=clock)
+
+        limiter.acquire()
+        limiter.release(200)
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.2)
+
+        clock.now += 0.5
+        assert acquired.wait(2)
+        thread.join()
+        assert limiter.metrics()['in_flight'] == 1
+        assert limiter.metrics()['requests'] == 2
+
+    def test_backoff_prefers_retry_after_then_jittered_exponential(self):
+        from media_server.throttle import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(max_retry_after=5, backoff_max=6)
+
+        assert limiter.backoff_delay(0, 1, '2') == 2
+        assert limiter.backoff_delay(0, 1, '120') == 5
+        assert 0.5 <= limiter.backoff_delay(0, 1) <= 1
+        assert 2 <= limiter.backoff_delay(2, 1) <= 4
+        assert 3 <= limiter.backoff_delay(5, 1) <= 6
+
+
+class TestMediaServerClientThrottle:
+    """测试客户端请求经过共享限流器"""
+
+    def test_retry_honours_retry_after_and_records_throttle(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        responses = [
+            SimpleNamespace(status_code=429, headers={'Retry-After': '0'}, text='slow down'),
+            SimpleNamespace(status_code=200, headers={}, text=''),
+        ]
+        monkeypatch.setattr(
+            'media_server.client.requests.Session.request',
+            lambda session, method, url, **kwargs: responses.pop(0),
+        )
+        sleeps = []
+        monkeypatch.setattr('media_server.client.time.sleep', lambda seconds: sleeps.append(seconds))
+        operator = MediaServerClient(
+            server_url='http://localhost:8096', api_key='test-api-key', tuning={'concurrency': 4}
+        )
+
+        response = operator._request_with_retries('get', '/Items', retries=2, retry_status_codes={429})
+
+        assert response.status_code == 200
+        assert sleeps == [0]
+        metrics = operator.throttle_metrics()
+        assert metrics['throttle_events'] == 1
+        assert metrics['requests'] == 2
+        assert metrics['in_flight'] == 0
+
+    def test_throttle_stats_are_reset_for_each_background_task(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        monkeypatch.setattr(
+            'media_server.client.requests.Session.request',
+            lambda session, method, url, **kwargs: SimpleNamespace(status_code=200, headers={}, text=''),
+        )
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        logged = []
+        monkeypatch.setattr(operator.logger, 'info', logged.append)
+
+        for _ in range(2):
+            operator._start_background_task(lambda: operator._request('get', '/Items'), '测试任务').join(timeout=5)
+
+        throttle_logs = [message for message in logged if '限流统计' in message]
+        assert len(throttle_logs) == 2
+        assert all('请求 1 次' in message for message in throttle_logs)
@@ -0,0 +1,96 @@
+"""
+media_server.translation_maps 模块单元测试
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+class TestTranslationMaps:
+    """测试翻译表按需加载、覆盖文件与模块级缓存"""
+
+    def test_client_import_does_not_load_builtin_maps(self):
+        code = (
+            "import sys, media_server.client; "
+            "print('media_server.genre_maps' in sys.modules, 'media_server.country_maps' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == 'False False'
+
+    @pytest.mark.parametrize('suffix', ['.json', '.yaml'])
+    def test_override_file_merges_into_builtin_map(self, tmp_path, suffix):
+        from media_server.translation_maps import builtin_map, translation_map
+
+        path = tmp_path / f'overrides{suffix}'
+        if suffix == '.json':
+            path.write_text(json.dumps({'movies': {'Action': '动作片'}}), encoding='utf-8')
+        else:
+            path.write_text('movies:\n  Action: 动作片\n', encoding='utf-8')
+
+        merged = translation_map('movies', str(path))
+
+        assert merged['Action'] == '动作片'
+        assert merged['Drama'] == builtin_map('movies')['Drama']
+        assert translation_map('movies', str(path)) is merged
+        assert translation_map('series', str(path)) is builtin_map('series')
+
+    def test_invalid_override_file_raises(self, tmp_path):
+        from media_server.translation_maps import TranslationOverrideError, translation_map
+
+        path = tmp_path / 'overrides.json'
+        path.write_text(json.dumps({'genres': {'Action': '动作片'}}), encoding='utf-8')
+
+        with pytest.raises(TranslationOverrideError):
+            translation_map('movies', str(path))
+        with pytest.raises(TranslationOverrideError):
+            translation_map('movies', str(tmp_path / 'missing.yaml'))
+
+    def test_cached_derivative_rebuilds_only_when_content_changes(self):
+        from media_server.translation_maps import cached_derivative
+
+        builds = []
+        mapping = {'test-derivative': 'a'}
+
+        def build(map_hash):
+            builds.append(map_hash)
+            return object()
+
+        first = cached_derivative('test', mapping, build)
+        assert cached_derivative('test', dict(mapping), build) is first
+        assert cached_derivative('test', mapping, build, verify=True) is first
+
+        mapping['other'] = 'b'
+        assert cached_derivative('test', mapping, build) is first
+        assert cached_derivative('test', mapping, build, verify=True) is not first
+        assert len(builds) == 2
+
+
+class TestMediaServerClientTranslationMaps:
+    """测试客户端共享编译结果并读取覆盖文件"""
+
+    def test_clients_share_compiled_tables_and_indexes(self):
+        from media_server.client import MediaServerClient
+
+        first = MediaServerClient()
+        second = MediaServerClient()
+        movies = first._translation_map('movies')
+
+        assert second._translation_map('movies') is movies
+        assert first._genre_translation_state(movies) is second._genre_translation_state(movies)
+        assert first._country_lookup_index() is second._country_lookup_index()
+
+    def test_client_applies_overrides_and_falls_back_on_error(self, tmp_path):
+        from media_server.client import MediaServerClient
+
+        path = tmp_path / 'overrides.yaml'
+        path.write_text('countries:\n  USA: 美利坚\n', encoding='utf-8')
+
+        client = MediaServerClient(tuning={'translation_overrides': str(path)})
+        assert client._translate_production_locations(['usa', 'Japan']) == ['美利坚', '日本']
+
+        broken = MediaServerClient(tuning={'translation_overrides': str(tmp_path / 'missing.yaml')})
+        assert broken._translate_production_locations(['usa']) == ['美国']
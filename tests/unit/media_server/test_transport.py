@@ -0,0 +1,144 @@
+"""
+media_server.transport 模块单元测试
+"""
+
+from types import SimpleNamespace
+
+from requests.adapters import HTTPAdapter
+
+
+class TestBuildSession:
+    """测试连接池 Session 的构建"""
+
+    def test_session_mounts_sized_adapter_with_default_headers(self):
+        from media_server.transport import build_session
+
+        session = build_session(headers={'X-Emby-Token': 'token'}, pool_connections=2, pool_maxsize=8)
+
+        adapter = session.get_adapter('http://localhost:8096/emby/Items')
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter is session.get_adapter('https://emby.example.com')
+        assert adapter._pool_maxsize == 8
+        assert adapter._pool_connections == 2
+        assert adapter.max_retries.total == 0
+        assert session.headers['X-Emby-Token'] == 'token'
+
+    def test_connection_stats_counts_reused_connections(self):
+        from media_server.transport import build_session, connection_stats
+
+        session = build_session()
+        adapter = session.get_adapter('http://localhost')
+        adapter.poolmanager.pools['key'] = SimpleNamespace(num_requests=10, num_connections=2)
+
+        stats = connection_stats(session)
+
+        assert stats == {
+            'requests': 10,
+            'new_connections': 2,
+            'reused_connections': 8,
+            'reuse_rate': 0.8,
+        }
+
+    def test_connection_stats_without_session(self):
+        from media_server.transport import connection_stats
+
+        assert connection_stats(None)['requests'] == 0
+
+
+class TestMediaServerClientSession:
+    """测试 MediaServerClient 复用同一个 Session"""
+
+    def test_client_reuses_session_and_applies_tuning(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        calls = []
+
+        def fake_request(session, method, url, **kwargs):
+            calls.append((session, method, url, kwargs))
+            return SimpleNamespace(status_code=200, json=lambda: [], text='')
+
+        monkeypatch.setattr('media_server.client.requests.Session.request', fake_request)
+        operator = MediaServerClient(
+            server_url='http://localhost:8096',
+            api_key='test-api-key',
+            tuning={'pool_maxsize': 32, 'read_timeout': 90, 'unknown': 'ignored'},
+        )
+
+        operator._request('get', '/Items')
+        operator._request('post', '/Items/1', timeout=(5, 45))
+
+        assert calls[0][0] is calls[1][0]
+        assert calls[0][0].headers['X-Emby-Token'] == 'test-api-key'
+        assert operator.session.get_adapter('http://localhost:8096')._pool_maxsize == 32
+        assert calls[0][3]['timeout'] == (30, 90)
+        assert calls[1][3]['timeout'] == (5, 90)
+
+    def test_close_drops_session(self):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        first_session = operator.session
+        operator.close()
+
+        assert operator.session is not first_session
+
+    def test_background_task_keeps_session_while_other_tasks_run(self):
+        import threading
+
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        release_long_task = threading.Event()
+        long_task = operator._start_background_task(lambda: release_long_task.wait(5), "长任务")
+        shared_session = operator.session
+
+        operator._start_background_task(lambda: None, "短任务").join(5)
+
+        assert operator._session is shared_session
+        release_long_task.set()
+        long_task.join(5)
+        assert operator._session is None
+
+
+class TestEndpointKey:
+    """测试端点归一化"""
+
+    def test_replaces_item_ids_and_strips_api_prefix(self):
+        from media_server.transport import endpoint_key
+
+        assert endpoint_key('get', 'http://host:8096/emby/Users/12/Items/345?api_key=x') == 'GET /Users/{id}/Items/{id}'
+        assert (
+            endpoint_key('post', 'http://host/jf/Items/0123456789abcdef0123456789abcdef', base_path='/jf')
+            == 'POST /Items/{id}'
+        )
+        assert endpoint_key('get', 'http://host/System/Info/Public') == 'GET /System/Info/Public'
+
+
+class TestMediaServerClientResponseBytes:
+    """测试列表字段裁剪与按端点统计响应字节"""
+
+    def test_listing_disables_expensive_defaults_and_counts_bytes(self, monkeypatch):
+        from media_server.client import MediaServerClient
+
+        calls = []
+
+        def fake_request(session, method, url, **kwargs):
+            calls.append(kwargs['params'])
+            return SimpleNamespace(
+                status_code=200,
+                content=b'{"Items": [], "TotalRecordCount": 0}',
+                json=lambda: {'Items': [], 'TotalRecordCount': 0},
+                text='',
+                headers={},
+            )
+
+        monkeypatch.setattr('media_server.client.requests.Session.request', fake_request)
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+
+        assert operator.get_all_media() == []
+
+        assert calls[0]['EnableImages'] == 'false'
+        assert calls[0]['EnableUserData'] == 'false'
+        assert calls[0]['ImageTypeLimit'] == 0
+        assert calls[0]['Fields'] == 'ProviderIds'
+        assert operator.response_bytes_by_endpoint() == {'GET /Items': {'bytes': 36, 'responses': 1}}
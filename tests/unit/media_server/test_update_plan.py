@@ -0,0 +1,116 @@
+"""
+media_server.update_plan 模块单元测试
+"""
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, status_code=204):
+        self.status_code = status_code
+        self.text = ''
+
+
+class TestUpdatePlan:
+    """测试计划文件、检查点与分片"""
+
+    def test_shards_partition_entries(self, tmp_path):
+        from media_server.update_plan import UpdatePlan
+
+        plan = UpdatePlan(str(tmp_path / 'plan.jsonl'))
+        plan.write({'kind': 'metadata'}, ({'Id': f'item-{index}'} for index in range(50)))
+
+        shards = [[entry['Id'] for entry in plan.iter_entries(index, 3)] for index in range(3)]
+
+        assert sorted(sum(shards, [])) == sorted(f'item-{index}' for index in range(50))
+        assert all(shards)
+        assert shards == [[entry['Id'] for entry in plan.iter_entries(index, 3)] for index in range(3)]
+
+    def test_checkpoint_ignores_truncated_line_and_is_cleared_on_rewrite(self, tmp_path):
+        from media_server.update_plan import UpdatePlan
+
+        plan = UpdatePlan(str(tmp_path / 'plan.jsonl'))
+        plan.write({'kind': 'metadata'}, [{'Id': 'a'}, {'Id': 'b'}])
+        plan.mark_done('a', 'applied')
+        plan.close()
+        with open(plan.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write('{"Id": "b", "sta')
+
+        assert plan.completed() == {'a': 'applied'}
+
+        plan.write({'kind': 'metadata'}, [{'Id': 'a'}])
+        assert plan.completed() == {}
+
+    def test_corrupt_plan_raises(self, tmp_path):
+        from media_server.update_plan import UpdatePlan, UpdatePlanError
+
+        path = tmp_path / 'plan.jsonl'
+        path.write_text('{"format": 1}\n{broken\n', encoding='utf-8')
+
+        with pytest.raises(UpdatePlanError):
+            list(UpdatePlan(str(path)).iter_entries())
+        with pytest.raises(UpdatePlanError):
+            UpdatePlan(str(tmp_path / 'missing.jsonl')).read_header()
+
+
+class TestMediaServerClientUpdatePlan:
+    """测试生成计划后分多次执行并从检查点继续"""
+
+    def test_plan_then_resume_apply(self, monkeypatch, tmp_path):
+        from media_server.client import MediaServerClient
+
+        operator = MediaServerClient(server_url='http://localhost:8096', api_key='test-api-key')
+        monkeypatch.setattr(operator, 'validate_server_type', lambda: None)
+        library = {
+            'Movie': {
+                'm1': {'Id': 'm1', 'Name': 'M1', 'Genres': ['Action'], 'GenreItems': [], 'ProductionLocations': []},
+                'm2': {'Id': 'm2', 'Name': 'M2', 'Genres': ['剧情'], 'GenreItems': [], 'ProductionLocations': ['usa']},
+                'm3': {'Id': 'm3', 'Name': 'M3', 'Genres': ['Drama'], 'GenreItems': [], 'ProductionLocations': []},
+                'm4': {'Id': 'm4', 'Name': 'M4', 'Genres': ['剧情'], 'GenreItems': [], 'ProductionLocations': []},
+            },
+            'Series': {
+                's1': {'Id': 's1', 'Name': 'S1', 'Genres': ['剧情'], 'GenreItems': [], 'ProductionLocations': ['jpn']},
+            },
+        }
+        items_by_id = {**library['Movie'], **library['Series']}
+        monkeypatch.setattr(
+            operator,
+            '_get_genre_update_items',
+            lambda item_type, _params: [dict(item) for item in library[item_type].values()],
+        )
+        monkeypatch.setattr(operator, 'get_item_info', lambda item_id: dict(items_by_id[item_id]))
+        posted = []
+
+        def post(item_id, item):
+            posted.append(item_id)
+            items_by_id[item_id] = dict(item)
+            if len(posted) == 2:
+                operator.request_stop()
+            return FakeResponse()
+
+        monkeypatch.setattr(operator, '_post_item_update', post)
+        plan_path = str(tmp_path / 'plan.jsonl')
+
+        operator.plan_metadata_update(plan_path).join(timeout=2)
+        assert posted == []
+
+        # 生成计划后条目被其他途径修改，执行时按冲突跳过
+        items_by_id['m3']['Genres'] = ['喜剧']
+        operator.apply_metadata_plan(plan_path).join(timeout=2)
+        assert posted == ['m1', 'm2']
+
+        operator.apply_metadata_plan(plan_path).join(timeout=2)
+
+        assert posted == ['m1', 'm2', 's1']
+        assert items_by_id['m2']['ProductionLocations'] == ['美国']
+        assert items_by_id['s1']['ProductionLocations'] == ['日本']
+        assert items_by_id['m3']['Genres'] == ['喜剧']
+
+        from media_server.update_plan import UpdatePlan
+
+        assert UpdatePlan(plan_path).completed() == {
+            'm1': 'applied',
+            'm2': 'applied',
+            'm3': 'conflict',
+            's1': 'applied',
+        }
@@ -58,6 +58,13 @@ class TestConfigSingleton:
         assert config.get('genre_update', 'scan_mode') == 'incremental'
         assert config.get('genre_update', 'sync_state') == {}
         assert config.get('country_update', 'scan_mode') == 'incremental'
+        # 媒体服务器的并发、限速等优化默认关闭，由用户按需开启
+        assert config.get('media_server', 'concurrency') == 1
+        assert config.get('media_server', 'nfo_scan_workers') == 1
+        assert config.get('media_server', 'rate_limit') == 0
+        assert config.get('media_server', 'stream_json') is False
+        assert config.get('media_server', 'use_library_snapshot') is False
+        assert config.get('media_server', 'merge_providers') == 'Tmdb,num'
 
 
 class TestConfigGetSet:
@@ -132,6 +139,34 @@ class TestConfigGetSet:
         value = config.get('symlink_export', 'enable_replace_path')
         assert value == True
 
+    def test_dir_snapshot_options(self, isolated_config, temp_dir):
+        """测试目录快照参数默认关闭，开启后指向缓存目录"""
+        config = isolated_config()
+
+        assert config.dir_snapshot_options() == {'dir_snapshot': None, 'force_full_rescan': False}
+
+        config.set('dir_snapshot', 'enabled', True)
+        config.set('dir_snapshot', 'force_full_rescan', True)
+        assert config.dir_snapshot_options() == {
+            'dir_snapshot': os.path.join(temp_dir, 'cache', 'dir_snapshot.sqlite3'),
+            'force_full_rescan': True,
+        }
+
+    def test_metadata_plan_options(self, isolated_config, temp_dir):
+        """测试更新计划默认放在缓存目录且不分片，分片序号超出范围时收回到最后一个分片"""
+        config = isolated_config()
+
+        assert config.metadata_plan_options() == {
+            'plan_path': os.path.join(temp_dir, 'cache', 'metadata_update_plan.jsonl'),
+            'shard_index': 0,
+            'shard_count': 1,
+        }
+
+        config.set('genre_update', 'plan_file', '/data/plan.jsonl')
+        config.set('genre_update', 'plan_shard_count', 3)
+        config.set('genre_update', 'plan_shard_index', 5)
+        assert config.metadata_plan_options() == {'plan_path': '/data/plan.jsonl', 'shard_index': 2, 'shard_count': 3}
+
 
 class TestConfigMerge:
     """测试配置合并功能"""
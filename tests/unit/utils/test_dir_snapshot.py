@@ -0,0 +1,130 @@
+"""
+utils.dir_snapshot 模块单元测试
+"""
+
+import os
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('')
+
+
+def bump_mtime(path, seconds=10):
+    # 避免同一时间片内的修改因时间戳精度看不出差别
+    stat_result = os.stat(path)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + seconds * 1_000_000_000))
+
+
+class TestDirectorySnapshot:
+    """测试按目录修改时间复用列表"""
+
+    def walk(self, root, snapshot, **options):
+        from utils.parallel_walk import ParallelWalker
+
+        walker = ParallelWalker(root, workers=2, snapshot=snapshot, **options)
+        return walker, sorted(entry.path for entry in walker)
+
+    def test_rereads_only_changed_directories(self, temp_dir, tmp_path):
+        from utils.dir_snapshot import DirectorySnapshot
+
+        root = str(tmp_path / 'library')
+        for folder in ('a', 'b', 'c'):
+            touch(os.path.join(root, folder, 'movie.mkv'))
+        snapshot = DirectorySnapshot(os.path.join(temp_dir, 'dir_snapshot.sqlite3'))
+
+        first, first_paths = self.walk(root, snapshot)
+        assert (first.dirs_reused, first.dirs_reread) == (0, 4)
+
+        touch(os.path.join(root, 'b', 'extra.nfo'))
+        bump_mtime(os.path.join(root, 'b'))
+        second, second_paths = self.walk(root, snapshot)
+
+        assert (second.dirs_reused, second.dirs_reread) == (3, 1)
+        assert second_paths == sorted(first_paths + [os.path.join(root, 'b', 'extra.nfo')])
+        assert second.snapshot_report() == '目录快照（增量扫描）：跳过未变化目录 3 个，重新读取 1 个'
+
+        forced, forced_paths = self.walk(root, snapshot, force_full=True)
+        assert (forced.dirs_reused, forced.dirs_reread) == (0, 4)
+        assert forced_paths == second_paths
+        snapshot.close()
+
+    def test_reused_entries_keep_types_and_removed_dirs_are_pruned(self, temp_dir, tmp_path):
+        import shutil
+
+        from utils.dir_snapshot import DirectorySnapshot
+
+        root = str(tmp_path / 'library')
+        touch(os.path.join(root, 'a', 'movie.mkv'))
+        touch(os.path.join(root, 'b', 'movie.mkv'))
+        os.symlink(os.path.join(root, 'a', 'movie.mkv'), os.path.join(root, 'link.mkv'))
+        snapshot = DirectorySnapshot(os.path.join(temp_dir, 'dir_snapshot.sqlite3'))
+        self.walk(root, snapshot)
+
+        from utils.parallel_walk import ParallelWalker
+
+        entries = {entry.name: entry for entry in ParallelWalker(root, snapshot=snapshot) if entry.parent == root}
+        assert entries['a'].is_dir() and not entries['a'].is_symlink()
+        assert entries['link.mkv'].is_symlink() and entries['link.mkv'].is_file()
+
+        shutil.rmtree(os.path.join(root, 'b'))
+        bump_mtime(root)
+        self.walk(root, snapshot)
+        assert snapshot.lookup(os.path.join(root, 'b'), 0) is None
+        rows = snapshot._connection.execute('SELECT path FROM dirs ORDER BY path').fetchall()
+        assert [path for (path,) in rows] == [root, os.path.join(root, 'a')]
+        snapshot.close()
+
+    def test_reused_symlink_is_resolved_again_when_target_disappears(self, temp_dir, tmp_path):
+        from utils.dir_snapshot import DirectorySnapshot
+        from utils.parallel_walk import ParallelWalker
+
+        root = str(tmp_path / 'library')
+        cloud = str(tmp_path / 'cloud')
+        touch(os.path.join(cloud, 'a.mkv'))
+        touch(os.path.join(root, 'a.nfo'))
+        os.symlink(os.path.join(cloud, 'a.mkv'), os.path.join(root, 'a.mkv'))
+        snapshot = DirectorySnapshot(os.path.join(temp_dir, 'dir_snapshot.sqlite3'))
+        self.walk(root, snapshot)
+
+        # 删除链接目标不改变链接所在目录的修改时间，目录列表仍从快照复用
+        os.remove(os.path.join(cloud, 'a.mkv'))
+        walker = ParallelWalker(root, snapshot=snapshot)
+        entries = {entry.name: entry for entry in walker}
+
+        assert walker.dirs_reused == 1
+        assert entries['a.mkv'].is_symlink()
+        assert not entries['a.mkv'].is_file() and not entries['a.mkv'].is_dir()
+        assert entries['a.nfo'].is_file()
+        snapshot.close()
+
+    def test_open_dir_snapshot_is_optional(self, temp_dir):
+        from utils.dir_snapshot import open_dir_snapshot
+
+        warnings = []
+        assert open_dir_snapshot('', warnings.append) is None
+        blocker = os.path.join(temp_dir, 'blocker')
+        touch(blocker)
+        assert open_dir_snapshot(os.path.join(blocker, 'dir_snapshot.sqlite3'), warnings.append) is None
+        assert len(warnings) == 1 and '无法打开目录快照' in warnings[0]
+
+
+class TestServicesUseDirectorySnapshot:
+    """测试服务接入目录快照"""
+
+    def test_symlink_creator_scan_reports_snapshot_usage(self, temp_dir, tmp_path, caplog):
+        from services.symlink_creator import SymlinkCreator
+
+        root = str(tmp_path / 'source')
+        touch(os.path.join(root, 'a', 'movie.mkv'))
+        touch(os.path.join(root, 'b', 'show.mp4'))
+        snapshot_path = os.path.join(temp_dir, 'dir_snapshot.sqlite3')
+        creator = SymlinkCreator(link_folders=[root], target_folder=temp_dir, dir_snapshot=snapshot_path)
+
+        first = creator.scan(root)
+        with caplog.at_level('INFO'):
+            second = creator.scan(root)
+
+        assert [item['rel_path'] for item in second] == [item['rel_path'] for item in first]
+        assert '跳过未变化目录 3 个，重新读取 0 个' in caplog.text
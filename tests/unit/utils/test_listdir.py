@@ -4,10 +4,17 @@ utils.listdir 模块单元测试
 
 import os
 
+import pytest
+
 
 class TestListFiles:
     """测试 list_files 函数"""
 
+    @pytest.fixture(autouse=True)
+    def isolated_cwd(self, tmp_path, monkeypatch):
+        """list_files 把结果写入 当前目录/mergeLog，切换到临时目录避免在仓库中留下文件"""
+        monkeypatch.chdir(tmp_path)
+
     def test_list_files_basic(self, temp_dir, create_test_file_structure):
         """测试基本的文件列表功能"""
         from utils.listdir import list_files
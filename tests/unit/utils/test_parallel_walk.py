@@ -0,0 +1,108 @@
+"""
+utils.parallel_walk 模块单元测试
+"""
+
+import os
+import threading
+
+import pytest
+
+
+def make_tree(root, depth=3, width=3, files=2):
+    paths = []
+    if depth == 0:
+        return paths
+    for index in range(width):
+        folder = os.path.join(root, f'dir-{index}')
+        os.makedirs(folder, exist_ok=True)
+        paths.append(folder)
+        for file_index in range(files):
+            path = os.path.join(folder, f'file-{file_index}.nfo')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('')
+            paths.append(path)
+        paths.extend(make_tree(folder, depth - 1, width, files))
+    return paths
+
+
+class TestParallelWalker:
+    """测试并发目录遍历"""
+
+    def test_yields_same_entries_as_os_walk(self, temp_dir):
+        from utils.parallel_walk import ParallelWalker
+
+        expected = make_tree(temp_dir)
+        os.symlink(os.path.join(temp_dir, 'dir-0', 'file-0.nfo'), os.path.join(temp_dir, 'link.nfo'))
+        os.symlink(os.path.join(temp_dir, 'missing.nfo'), os.path.join(temp_dir, 'broken.nfo'))
+        walker = ParallelWalker(temp_dir, workers=4)
+
+        entries = {entry.path: entry for entry in walker}
+
+        expected += [os.path.join(temp_dir, 'link.nfo'), os.path.join(temp_dir, 'broken.nfo')]
+        assert sorted(entries) == sorted(expected)
+        assert walker.dirs_scanned == 1 + 3 + 9 + 27
+        link = entries[os.path.join(temp_dir, 'link.nfo')]
+        assert link.is_symlink() and link.is_file() and not link.is_dir()
+        broken = entries[os.path.join(temp_dir, 'broken.nfo')]
+        assert broken.is_symlink() and not broken.is_file() and not broken.is_dir()
+        assert entries[os.path.join(temp_dir, 'dir-1')].is_dir()
+        assert entries[os.path.join(temp_dir, 'dir-1', 'file-0.nfo')].parent == os.path.join(temp_dir, 'dir-1')
+
+    def test_prune_and_include_dirs(self, temp_dir):
+        from utils.parallel_walk import ParallelWalker
+
+        make_tree(temp_dir, depth=2, width=2, files=1)
+
+        def prune(directory, entries):
+            assert all(entry.parent == directory for entry in entries)
+            return os.path.basename(directory) == 'dir-0'
+
+        paths = sorted(entry.path for entry in ParallelWalker(temp_dir, workers=2, prune=prune, include_dirs=False))
+
+        assert paths == [
+            os.path.join(temp_dir, 'dir-0', 'file-0.nfo'),
+            os.path.join(temp_dir, 'dir-1', 'dir-0', 'file-0.nfo'),
+            os.path.join(temp_dir, 'dir-1', 'dir-1', 'file-0.nfo'),
+            os.path.join(temp_dir, 'dir-1', 'file-0.nfo'),
+        ]
+
+    def test_follow_symlinks_skips_loops(self, temp_dir):
+        from utils.parallel_walk import ParallelWalker
+
+        os.makedirs(os.path.join(temp_dir, 'a', 'b'))
+        os.symlink(temp_dir, os.path.join(temp_dir, 'a', 'b', 'loop'))
+
+        not_followed = ParallelWalker(temp_dir, workers=2)
+        assert len(list(not_followed)) == 3
+        followed = ParallelWalker(temp_dir, workers=2, follow_symlinks=True)
+        assert len(list(followed)) == 3
+        assert followed.loops_skipped == 1
+
+    def test_stop_flag_ends_iteration(self, temp_dir):
+        from utils.parallel_walk import ParallelWalker
+
+        make_tree(temp_dir, depth=3, width=4)
+        stop_flag = threading.Event()
+        consumed = 0
+        for _entry in ParallelWalker(temp_dir, workers=2, stop_flag=stop_flag, max_pending=1):
+            consumed += 1
+            if consumed == 5:
+                stop_flag.set()
+
+        assert consumed == 5
+
+    def test_prune_errors_propagate_and_missing_root_is_empty(self, temp_dir):
+        from utils.parallel_walk import ParallelWalker
+
+        make_tree(temp_dir, depth=2, width=2, files=0)
+
+        def prune(_directory, _entries):
+            raise ValueError('prune failed')
+
+        with pytest.raises(ValueError, match='prune failed'):
+            list(ParallelWalker(temp_dir, workers=2, prune=prune))
+
+        errors = []
+        walker = ParallelWalker(os.path.join(temp_dir, 'missing'), onerror=errors.append)
+        assert list(walker) == []
+        assert walker.errors == 1 and isinstance(errors[0], FileNotFoundError)
@@ -3,6 +3,10 @@ import sys
 
 import yaml
 
+from utils.dir_snapshot import DIR_SNAPSHOT_FILE
+
+METADATA_PLAN_FILE = 'metadata_update_plan.jsonl'
+
 SECTION_RENAMES = {
     'export_symlink': 'symlink_export',
     'delete_symlink': 'symlink_delete',
@@ -71,6 +75,33 @@ class Config:
         # 加载配置
         self._load_config()
 
+    @property
+    def cache_dir(self):
+        """快照、索引等可随时重建的本地缓存目录，与配置文件放在一起"""
+        return os.path.join(self.config_dir, 'cache')
+
+    def dir_snapshot_options(self):
+        """传给遍历目录的服务的目录快照参数（dir_snapshot/force_full_rescan）"""
+        enabled = bool(self.get('dir_snapshot', 'enabled', False))
+        return {
+            'dir_snapshot': os.path.join(self.cache_dir, DIR_SNAPSHOT_FILE) if enabled else None,
+            'force_full_rescan': bool(self.get('dir_snapshot', 'force_full_rescan', False)),
+        }
+
+    def metadata_plan_options(self):
+        """离线更新计划的文件路径和分片参数（plan_path/shard_index/shard_count）"""
+        plan_file = str(self.get('genre_update', 'plan_file', '') or '').strip()
+        try:
+            shard_count = max(1, int(self.get('genre_update', 'plan_shard_count', 1)))
+            shard_index = min(max(0, int(self.get('genre_update', 'plan_shard_index', 0))), shard_count - 1)
+        except (TypeError, ValueError):
+            shard_index, shard_count = 0, 1
+        return {
+            'plan_path': plan_file or os.path.join(self.cache_dir, METADATA_PLAN_FILE),
+            'shard_index': shard_index,
+            'shard_count': shard_count,
+        }
+
     def _get_default_config(self):
         """获取默认配置"""
         return {
@@ -120,6 +151,10 @@ class Config:
                 'server_type': 'emby',
                 'scan_mode': 'incremental',
                 'sync_state': {},
+                # 离线更新计划：文件为空时放在缓存目录；分片数大于 1 时每次只执行其中一个分片
+                'plan_file': '',
+                'plan_shard_index': 0,
+                'plan_shard_count': 1,
             },
             'country_update': {
                 'server_url': '',
@@ -129,7 +164,29 @@ class Config:
                 'scan_mode': 'incremental',
                 'sync_state': {},
             },
+            'media_server': {
+                'pool_connections': 4,
+                'pool_maxsize': 16,
+                'connect_timeout': 0,
+                'read_timeout': 0,
+                'page_size': 500,
+                'concurrency': 1,
+                'stream_json': False,
+                'server_cache_ttl': 86400,
+                'metrics_report_file': '',
+                'translation_overrides': '',
+                'nfo_scan_workers': 1,
+                'library_snapshot_ttl': 300,
+                'use_library_snapshot': False,
+                'merge_providers': 'Tmdb,num',
+                'rate_limit': 0,
+                'rate_burst': 0,
+                'max_retry_after': 60,
+                'backoff_max': 30,
+            },
             'tree_mirror': {'tree_file': '', 'export_folder': '', 'fix_garbled_text': False},
+            # 目录快照：只重新读取修改时间变化的目录；挂载不维护目录修改时间时不要开启
+            'dir_snapshot': {'enabled': False, 'force_full_rescan': False},
             'ui_state': {'selected_tab_index': 0},
         }
 
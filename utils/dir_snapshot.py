@@ -0,0 +1,92 @@
+"""
+目录快照：在 SQLite 中保存每个目录的修改时间和目录项，
+再次遍历时修改时间未变的目录直接使用上次的列表，只重新读取有变化的目录。
+
+目录的修改时间只在其直接子项增删改名时变化，文件内容变化不影响列表，正好满足遍历需要。
+部分云盘挂载不维护目录修改时间，这种情况下应关闭快照或强制完整扫描。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DIR_SNAPSHOT_FILE = 'dir_snapshot.sqlite3'
+# 每累计这么多条写入提交一次事务，中断时最多丢失这部分快照
+DIR_SNAPSHOT_COMMIT_INTERVAL = 200
+
+
+class DirectorySnapshot:
+    """线程安全的目录快照，可被并发遍历的线程共享。
+
+    目录项保存为 [名称, is_dir, is_file, is_symlink]，类型判断与 utils.parallel_walk.WalkEntry 相同；
+    符号链接的 is_dir/is_file 取决于链接目标，复用时由遍历方重新判断。
+    """
+
+    def __init__(self, path, commit_interval=DIR_SNAPSHOT_COMMIT_INTERVAL):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS dirs ('
+            'path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, entries TEXT NOT NULL, scanned_at REAL NOT NULL)'
+        )
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def lookup(self, path, mtime_ns):
+        """修改时间未变化时返回保存的目录项列表，否则返回 None。"""
+        with self._lock:
+            row = self._connection.execute('SELECT mtime_ns, entries FROM dirs WHERE path = ?', (path,)).fetchone()
+        if row is None or row[0] != mtime_ns:
+            return None
+        return json.loads(row[1])
+
+    def store(self, path, mtime_ns, entries):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO dirs (path, mtime_ns, entries, scanned_at) VALUES (?, ?, ?, ?)',
+                (path, mtime_ns, json.dumps(entries, ensure_ascii=False, separators=(',', ':')), time.time()),
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_interval:
+                self._connection.commit()
+                self._pending_writes = 0
+
+    def prune(self, root_folder, seen_paths):
+        """删除 root_folder（含）下本次遍历没有经过的目录（已删除、移动或被剪枝），返回删除的行数。"""
+        root_folder = os.path.abspath(root_folder)
+        prefix = os.path.join(root_folder, '')
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT path FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?',
+                (root_folder, len(prefix), prefix),
+            ).fetchall()
+            stale = [(path,) for (path,) in rows if path not in seen_paths]
+            self._connection.executemany('DELETE FROM dirs WHERE path = ?', stale)
+            self._connection.commit()
+            self._pending_writes = 0
+        return len(stale)
+
+    def close(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+
+
+def open_dir_snapshot(path, warn=None):
+    """path 为空时返回 None（不使用快照）；打开失败时用 warn 输出提示并返回 None，遍历照常完整读取。"""
+    if not path:
+        return None
+    try:
+        return DirectorySnapshot(path)
+    except (OSError, sqlite3.Error) as e:
+        if warn is not None:
+            warn(f"无法打开目录快照 {path}: {e}")
+        return None
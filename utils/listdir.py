@@ -2,6 +2,8 @@ import logging
 import os
 import time
 
+from utils.parallel_walk import DEFAULT_WALK_WORKERS, ParallelWalker
+
 
 def generate_output_filename(folder_path: str) -> str:
     """
@@ -16,7 +18,7 @@ def generate_output_filename(folder_path: str) -> str:
     return f"{folder_name}_files_{timestamp}.txt"
 
 
-def list_files(folder_path: str, output_path="", logger=None) -> tuple[int, str]:
+def list_files(folder_path: str, output_path="", logger=None, walk_workers=DEFAULT_WALK_WORKERS) -> tuple[int, str]:
 
     list_files_logger = logger or logging.getLogger(__name__)  # 使用传递的logger
     """
@@ -24,6 +26,7 @@ def list_files(folder_path: str, output_path="", logger=None) -> tuple[int, str]
     :param folder_path: 要遍历的文件夹路径
     :param output_path: 输出文件路径
     :param logger: 日志记录器
+    :param walk_workers: 并发读取目录的线程数
     :return: (文件数量, 文件路径列表, 输出文件路径)
     """
 
@@ -52,11 +55,11 @@ def list_files(folder_path: str, output_path="", logger=None) -> tuple[int, str]
             return 0, ""
 
         file_paths = []
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                abs_path = os.path.join(root, file)
-                file_paths.append(abs_path)
-                list_files_logger.debug(f"找到文件: {abs_path}")
+        for entry in ParallelWalker(folder_path, workers=walk_workers, include_dirs=False):
+            file_paths.append(entry.path)
+            list_files_logger.debug(f"找到文件: {entry.path}")
+        # 并发遍历的产出顺序不固定，排序后写入
+        file_paths.sort()
 
         if not file_paths:
             list_files_logger.info(f"文件夹为空: {folder_path}")
@@ -85,8 +88,7 @@ def get_file_count(folder_path: str) -> int:
     :return: 文件总数
     """
     try:
-        count = sum(len(files) for _, _, files in os.walk(folder_path))
-        return count
+        return sum(1 for _entry in ParallelWalker(folder_path, include_dirs=False))
     except Exception:
         # logging.error(f"获取文件数量时出错: {str(e)}")
         return 0
@@ -0,0 +1,288 @@
+"""
+并发目录遍历：多个线程同时执行 scandir，以流的形式产出目录项。
+云盘挂载（CloudDrive2/rclone）上每次 readdir 都要几十到几百毫秒，串行 os.walk 的耗时主要花在等待上。
+
+每个线程优先处理自己发现的子目录（后进先出，内存占用接近深度优先），
+空闲线程从其他线程队列的另一端窃取目录。产出顺序不固定，需要稳定顺序的调用方自行排序。
+提供目录快照（utils.dir_snapshot）时，修改时间未变化的目录直接使用快照中的列表，只需一次 stat。
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+
+DEFAULT_WALK_WORKERS = 8
+
+_WALK_DONE = object()
+
+
+class WalkEntry:
+    """与 os.DirEntry 用法相同的目录项快照，类型判断在遍历线程中完成，消费端不会再访问文件系统。
+
+    is_dir()/is_file() 与 os.walk 一致跟随符号链接（失效链接两者都为 False），is_symlink() 不跟随。
+    """
+
+    __slots__ = ('name', 'path', 'parent', '_is_dir', '_is_file', '_is_symlink')
+
+    def __init__(self, name, path, parent, is_dir, is_file, is_symlink):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self._is_dir = is_dir
+        self._is_file = is_file
+        self._is_symlink = is_symlink
+
+    @classmethod
+    def from_dir_entry(cls, entry, parent):
+        is_symlink = entry.is_symlink()
+        try:
+            is_dir = entry.is_dir()
+            is_file = not is_dir and entry.is_file()
+        except OSError:
+            is_dir = is_file = False
+        return cls(entry.name, entry.path, parent, is_dir, is_file, is_symlink)
+
+    def is_dir(self):
+        return self._is_dir
+
+    def is_file(self):
+        return self._is_file
+
+    def is_symlink(self):
+        return self._is_symlink
+
+    def __repr__(self):
+        return f"<WalkEntry {self.path!r}>"
+
+
+class _WalkFailure:
+    def __init__(self, error):
+        self.error = error
+
+
+class ParallelWalker:
+    """并发遍历 root_folder，迭代产出 WalkEntry（不含 root_folder 本身）。每个实例只能迭代一次。
+
+    :param workers: 同时执行 scandir 的线程数
+    :param prune: prune(目录路径, 该目录下的 WalkEntry 列表) 返回 True 时不再进入该目录的子目录，
+                  在遍历线程中调用，需要线程安全
+    :param stop_flag: threading.Event，置位后不再读取新目录，迭代随即结束
+    :param follow_symlinks: 是否进入目录符号链接；开启时按 (st_dev, st_ino) 跳过已访问目录，避免循环
+    :param include_dirs: 是否产出目录项
+    :param onerror: 读取目录失败时以 OSError 调用，默认忽略（与 os.walk 相同）
+    :param snapshot: DirectorySnapshot，为 None 时每个目录都重新读取
+    :param force_full: 忽略快照中的列表，全部重新读取并刷新快照
+    """
+
+    def __init__(
+        self,
+        root_folder,
+        workers=DEFAULT_WALK_WORKERS,
+        prune=None,
+        stop_flag=None,
+        follow_symlinks=False,
+        include_dirs=True,
+        onerror=None,
+        max_pending=None,
+        snapshot=None,
+        force_full=False,
+    ):
+        self.root_folder = os.fspath(root_folder)
+        self.workers = max(1, int(workers or 1))
+        self.prune = prune
+        self.stop_flag = stop_flag or threading.Event()
+        self.follow_symlinks = follow_symlinks
+        self.include_dirs = include_dirs
+        self.onerror = onerror
+        self.max_pending = max_pending or self.workers * 4
+        self.snapshot = snapshot
+        self.force_full = force_full
+        self.dirs_scanned = 0
+        self.dirs_reused = 0
+        self.dirs_reread = 0
+        self.completed = False
+        self.errors = 0
+        self.loops_skipped = 0
+        self._closed = threading.Event()
+        self._condition = threading.Condition()
+        self._deques = [deque() for _ in range(self.workers)]
+        self._outstanding = 0
+        self._visited = set()
+        self._seen_dirs = set()
+
+    def _stopped(self):
+        return self.stop_flag.is_set() or self._closed.is_set()
+
+    def _put(self, results, value):
+        # 消费端停止后结果队列不再被读取，带超时放入以便遍历线程及时退出
+        while not self._stopped():
+            try:
+                results.put(value, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_directory(self, worker_index):
+        own = self._deques[worker_index]
+        with self._condition:
+            while not self._stopped():
+                if own:
+                    return own.pop()
+                for offset in range(1, self.workers):
+                    victim = self._deques[(worker_index + offset) % self.workers]
+                    if victim:
+                        return victim.popleft()
+                if self._outstanding == 0:
+                    return None
+                self._condition.wait(0.2)
+        return None
+
+    def _directory_key(self, path, entry=None):
+        try:
+            stat_result = entry.stat() if entry is not None else os.stat(path)
+        except OSError:
+            return None
+        return stat_result.st_dev, stat_result.st_ino
+
+    def _descend(self, record, dir_entry):
+        if not record.is_dir():
+            return False
+        if record.is_symlink() and not self.follow_symlinks:
+            return False
+        if not self.follow_symlinks:
+            return True
+        key = self._directory_key(record.path, dir_entry)
+        with self._condition:
+            if key is None or key in self._visited:
+                self.loops_skipped += 1
+                return False
+            self._visited.add(key)
+        return True
+
+    def _read_directory(self, directory):
+        """返回 [(WalkEntry, os.DirEntry 或 None)]；读取失败时抛出 OSError。"""
+        if self.snapshot is None:
+            with os.scandir(directory) as entries:
+                return [(WalkEntry.from_dir_entry(entry, directory), entry) for entry in entries]
+
+        snapshot_key = os.path.abspath(directory)
+        # 先取修改时间再读取列表，读取期间发生的变化会在下次遍历时发现
+        mtime_ns = os.stat(directory).st_mtime_ns
+        cached = None if self.force_full else self.snapshot.lookup(snapshot_key, mtime_ns)
+        if cached is not None:
+            pairs = [(self._cached_entry(directory, *record), None) for record in cached]
+        else:
+            with os.scandir(directory) as entries:
+                pairs = [(WalkEntry.from_dir_entry(entry, directory), entry) for entry in entries]
+            self.snapshot.store(
+                snapshot_key,
+                mtime_ns,
+                [[record.name, record.is_dir(), record.is_file(), record.is_symlink()] for record, _entry in pairs],
+            )
+        with self._condition:
+            self._seen_dirs.add(snapshot_key)
+            if cached is not None:
+                self.dirs_reused += 1
+            else:
+                self.dirs_reread += 1
+        return pairs
+
+    @staticmethod
+    def _cached_entry(directory, name, is_dir, is_file, is_symlink):
+        """由快照记录还原目录项。符号链接目标的删除不改变链接所在目录的修改时间，链接类型每次重新判断。"""
+        path = os.path.join(directory, name)
+        if is_symlink:
+            is_dir = os.path.isdir(path)
+            is_file = not is_dir and os.path.isfile(path)
+        return WalkEntry(name, path, directory, is_dir, is_file, is_symlink)
+
+    def _scan(self, directory):
+        try:
+            pairs = self._read_directory(directory)
+        except OSError as err:
+            with self._condition:
+                self.errors += 1
+            if self.onerror is not None:
+                self.onerror(err)
+            return [], []
+        records = []
+        subdirs = []
+        for record, dir_entry in pairs:
+            records.append(record)
+            if self._descend(record, dir_entry):
+                subdirs.append(record.path)
+        if subdirs and self.prune is not None and self.prune(directory, records):
+            subdirs = []
+        if not self.include_dirs:
+            records = [record for record in records if not record.is_dir()]
+        return records, subdirs
+
+    def _work(self, worker_index, results):
+        while True:
+            directory = self._next_directory(worker_index)
+            if directory is None:
+                return
+            try:
+                records, subdirs = self._scan(directory)
+            except Exception as err:
+                self._put(results, _WalkFailure(err))
+                self._closed.set()
+                return
+            if records and not self._put(results, records):
+                return
+            with self._condition:
+                self.dirs_scanned += 1
+                self._deques[worker_index].extend(subdirs)
+                self._outstanding += len(subdirs) - 1
+                finished = self._outstanding == 0
+                self._condition.notify_all()
+            if finished:
+                self._put(results, _WALK_DONE)
+                return
+
+    def __iter__(self):
+        results = queue.Queue(maxsize=self.max_pending)
+        with self._condition:
+            self._outstanding = 1
+            self._deques[0].append(self.root_folder)
+            if self.follow_symlinks:
+                key = self._directory_key(self.root_folder)
+                if key is not None:
+                    self._visited.add(key)
+        threads = [
+            threading.Thread(target=self._work, args=(index, results), name=f'walk-{index + 1}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while not self.stop_flag.is_set():
+                try:
+                    batch = results.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if batch is _WALK_DONE:
+                    self.completed = True
+                    # 完整遍历后删除快照中已不存在的目录；中途停止时保留
+                    if self.snapshot is not None:
+                        self.snapshot.prune(self.root_folder, self._seen_dirs)
+                    return
+                if isinstance(batch, _WalkFailure):
+                    raise batch.error
+                for record in batch:
+                    if self.stop_flag.is_set():
+                        return
+                    yield record
+        finally:
+            self._closed.set()
+            with self._condition:
+                self._condition.notify_all()
+            for thread in threads:
+                thread.join()
+
+    def snapshot_report(self):
+        """目录快照的复用情况，供服务写入日志。"""
+        mode = "强制完整扫描" if self.force_full else "增量扫描"
+        return f"目录快照（{mode}）：跳过未变化目录 {self.dirs_reused} 个，重新读取 {self.dirs_reread} 个"
@@ -149,6 +149,8 @@ class CountryUpdateTab(BaseTab):
             username=username,
             server_type=server_type,
             logger=self.logger,
+            tuning=self.config.get('media_server'),
+            cache_dir=self.config.cache_dir,
         )
 
         try:
@@ -111,7 +111,9 @@ class FolderToolsTab(BaseTab):
 
         def task():
             self.logger.info(f"开始删除软链接: {target_folder}")
-            deleter = self.track_worker(SymlinkDeleter(target_folder=target_folder, logger=self.logger))
+            deleter = self.track_worker(SymlinkDeleter(
+                target_folder=target_folder, logger=self.logger, **self.config.dir_snapshot_options()
+            ))
             time_taken, _ = deleter.run()
             self.logger.info(f"删除软链接完成\n总耗时: {time_taken:.2f} 秒\n")
 
@@ -145,7 +147,9 @@ class FolderToolsTab(BaseTab):
         def task():
             self.logger.info(f"开始检查刮削数据完整性: {target_folder}")
             media_server_client = self.track_worker(MediaServerClient(logger=self.logger))
-            worker_thread = media_server_client.check_metadata_integrity(target_folder)
+            worker_thread = media_server_client.check_metadata_integrity(
+                target_folder, **self.config.dir_snapshot_options()
+            )
             if worker_thread:
                 worker_thread.join()
 
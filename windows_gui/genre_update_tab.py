@@ -128,6 +128,15 @@ class GenreUpdateTab(BaseTab):
         self.update_genres_btn = ttk.Button(btn_frame, text="更新所有流派为中文", command=self.update_genres)
         self.update_genres_btn.pack(side='left', padx=5)
 
+        self.update_metadata_btn = ttk.Button(btn_frame, text="同时更新流派和地区", command=self.update_metadata)
+        self.update_metadata_btn.pack(side='left', padx=5)
+
+        self.plan_metadata_btn = ttk.Button(btn_frame, text="生成更新计划", command=self.plan_metadata)
+        self.plan_metadata_btn.pack(side='left', padx=5)
+
+        self.apply_plan_btn = ttk.Button(btn_frame, text="执行更新计划", command=self.apply_plan)
+        self.apply_plan_btn.pack(side='left', padx=5)
+
         self.stop_genres_btn = ttk.Button(btn_frame, text="停止", command=self.stop_update, state=tk.DISABLED)
         self.stop_genres_btn.pack(side='left', padx=5)
 
@@ -143,6 +152,45 @@ class GenreUpdateTab(BaseTab):
         self.logger = setup_logger('genre_update', self.log_text, log_file)
 
     def update_genres(self):
+        self._start_update('update_genres', "流派", 'sync_state')
+
+    def update_metadata(self):
+        # 合并任务的翻译表哈希覆盖流派和地区两张表，增量基线单独保存
+        self._start_update('update_metadata', "流派和地区", 'metadata_sync_state')
+
+    def plan_metadata(self):
+        # 只预扫描并写入计划文件，不修改服务器；检查计划后再执行
+        plan_path = self.config.metadata_plan_options()['plan_path']
+        self._start_task("生成更新计划", lambda client, callback: client.plan_metadata_update(plan_path, callback))
+
+    def apply_plan(self):
+        # 已完成的条目记录在检查点文件中，中断后再次执行会从断点继续
+        options = self.config.metadata_plan_options()
+        self._start_task(
+            "执行更新计划",
+            lambda client, callback: client.apply_metadata_plan(
+                options['plan_path'],
+                callback,
+                shard_index=options['shard_index'],
+                shard_count=options['shard_count'],
+            ),
+        )
+
+    def _start_update(self, task_method, task_label, state_key):
+        full_scan = self.scan_mode_var.get() == 'full'
+        sync_state = self.config.get('genre_update', state_key, {})
+        self._start_task(
+            f"更新{task_label}",
+            lambda client, callback: getattr(client, task_method)(
+                callback,
+                full_scan=full_scan,
+                sync_state=sync_state,
+                state_callback=lambda state: self.save_sync_state(state, state_key),
+            ),
+        )
+
+    def _start_task(self, task_title, start):
+        """start(客户端, 回调) 启动客户端的后台任务并返回线程"""
         if self.active_task and self.active_task.is_alive():
             self.logger.warning("已有流派更新任务正在运行")
             return
@@ -151,14 +199,12 @@ class GenreUpdateTab(BaseTab):
         api_key = self.api_key_entry.get().strip()
         username = self.username_entry.get().strip()
         server_type = self.server_type_var.get()
-        full_scan = self.scan_mode_var.get() == 'full'
-        sync_state = self.config.get('genre_update', 'sync_state', {})
 
         if not server_url or not api_key or not username:
             self.logger.warning("服务器地址、用户名或API密钥为空")
             return
 
-        self.logger.info(f"开始更新流派: 服务器类型={server_type}, URL={server_url}, 用户名={username}")
+        self.logger.info(f"开始{task_title}: 服务器类型={server_type}, URL={server_url}, 用户名={username}")
 
         media_server_client = MediaServerClient(
             server_url=server_url,
@@ -166,19 +212,16 @@ class GenreUpdateTab(BaseTab):
             username=username,
             server_type=server_type,
             logger=self.logger,  # 传递logger
+            tuning=self.config.get('media_server'),
+            cache_dir=self.config.cache_dir,
         )
 
         def on_check_complete(message):
-            self.logger.info("更新流派结束")
+            self.logger.info(f"{task_title}结束")
 
         try:
-            task = media_server_client.update_genres(
-                on_check_complete,
-                full_scan=full_scan,
-                sync_state=sync_state,
-                state_callback=self.save_sync_state,
-            )
-        except RuntimeError as e:
+            task = start(media_server_client, on_check_complete)
+        except (RuntimeError, ValueError) as e:
             self.logger.error(str(e))
             return
 
@@ -196,12 +239,15 @@ class GenreUpdateTab(BaseTab):
         else:
             self.logger.warning("当前没有正在运行的流派更新任务")
 
-    def save_sync_state(self, state):
-        self.config.set('genre_update', 'sync_state', state)
+    def save_sync_state(self, state, state_key='sync_state'):
+        self.config.set('genre_update', state_key, state)
         self.config.save()
 
     def _set_running(self, running):
         self.update_genres_btn.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.update_metadata_btn.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.plan_metadata_btn.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.apply_plan_btn.config(state=tk.DISABLED if running else tk.NORMAL)
         self.stop_genres_btn.config(state=tk.NORMAL if running else tk.DISABLED)
         if running:
             self.progress_bar.start(10)
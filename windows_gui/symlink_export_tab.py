@@ -382,6 +382,7 @@ class SymlinkExportTab(BaseTab):
                         allowed_extensions=allowed_extensions,
                         thread_count=thread_count,
                         only_tvshow_nfo=only_tvshow_nfo,
+                        **self.config.dir_snapshot_options(),
                         logger=self.logger,
                     )
                 )
@@ -470,6 +471,7 @@ class SymlinkExportTab(BaseTab):
             enable_replace_path=enable_replace_path,
             original_path=original_path,
             replace_path=replace_path,
+            **self.config.dir_snapshot_options(),
             logger=self.logger,  # 传递logger
         ))
 
@@ -520,6 +522,7 @@ class SymlinkExportTab(BaseTab):
             allowed_extensions=allowed_extensions,
             thread_count=thread_count,
             only_tvshow_nfo=self.only_tvshow_nfo_var.get(),
+            **self.config.dir_snapshot_options(),
             logger=self.logger,  # 传递logger
         ))
 